@@ -1,5 +1,6 @@
 import click
 from .superuser import create_superuser
+from .invite import invite_users
 
 @click.group()
 def auth_group():
@@ -7,3 +8,4 @@ def auth_group():
     pass
 
 auth_group.add_command(create_superuser, name='create-superuser')
+auth_group.add_command(invite_users, name='invite-users')
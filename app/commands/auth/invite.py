@@ -0,0 +1,57 @@
+import csv
+import json
+import click
+from app.db.database import db
+from app.db.models import User
+from app.services.invitations import SEND_INVITATIONS, batch_status, create_invitations
+from app.services.jobs import JobWorker
+
+def _read_invites(path):
+    """Invitees from a CSV (username,email[,is_admin][,personal_message]) or JSON list."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        invites = []
+        for row in csv.DictReader(f):
+            row["is_admin"] = str(row.get("is_admin") or "").strip().lower() in ("1", "true", "yes")
+            invites.append(row)
+        return invites
+
+@click.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--inviter', 'inviter_username', required=True, help='Username of the admin sending the invitations.')
+@click.option('--expiry-hours', type=int, default=48, show_default=True, help='Hours until the invitations expire.')
+@click.option('--message', 'personal_message', default=None, help='Personal message included in every invitation.')
+@click.option('--send-now', is_flag=True, help='Send the emails from this process instead of leaving them to job workers.')
+def invite_users(path, inviter_username, expiry_hours, personal_message, send_now):
+    """Invite the users listed in a CSV or JSON file."""
+    session = db.get_session()
+    try:
+        inviter = session.query(User).filter_by(username=inviter_username).first()
+        if not inviter:
+            raise click.ClickException(f"User {inviter_username} not found")
+
+        batch = create_invitations(
+            session,
+            _read_invites(path),
+            invited_by=inviter.id,
+            inviter_name=inviter.full_name or inviter.username,
+            expiry_hours=expiry_hours,
+            personal_message=personal_message
+        )
+        for rejected in batch["rejected"]:
+            click.echo(f"Skipped {rejected['username']} <{rejected['email']}>: {rejected['error']}", err=True)
+        if not batch["job"]:
+            click.echo("No invitations created.")
+            return
+        click.echo(f"Created {batch['invited']} invitations in batch {batch['batch_id']} (job {batch['job'].id}).")
+
+        if send_now:
+            JobWorker(kinds=[SEND_INVITATIONS]).run_once()
+            report = batch_status(session, batch["batch_id"])
+            click.echo("Delivery: " + ", ".join(f"{count} {state}" for state, count in sorted(report["counts"].items())))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
@@ -0,0 +1,25 @@
+import click
+from .comments import bench_comments
+from .teams import bench_teams
+from .search import bench_search
+from .versions import bench_versions
+from .imports import bench_imports
+from .emails import bench_emails
+from .middleware import bench_middleware
+from .request_logging import bench_logging
+from .detail_logging import bench_detail_logging
+
+@click.group()
+def bench_group():
+    """Benchmarks run against the configured database (all data is rolled back)."""
+    pass
+
+bench_group.add_command(bench_comments, name='comments')
+bench_group.add_command(bench_teams, name='teams')
+bench_group.add_command(bench_search, name='search')
+bench_group.add_command(bench_versions, name='versions')
+bench_group.add_command(bench_imports, name='imports')
+bench_group.add_command(bench_emails, name='emails')
+bench_group.add_command(bench_middleware, name='middleware')
+bench_group.add_command(bench_logging, name='logging')
+bench_group.add_command(bench_detail_logging, name='detail-logging')
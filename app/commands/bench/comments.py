@@ -0,0 +1,73 @@
+import click
+
+from app.db.models import Comment, Reply
+from app.managers.comment_manager import CommentManager
+from .utils import rollback_session, seed_users, seed_project, seed_prompt, measure, report
+
+
+@click.command()
+@click.option('--comments', 'comment_count', default=300, show_default=True, help='Comments on the prompt')
+@click.option('--replies', 'reply_count', default=5, show_default=True, help='Replies per comment')
+@click.option('--authors', default=25, show_default=True, help='Distinct comment authors')
+@click.option('--per-page', default=50, show_default=True, help='Comments per thread window')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per case')
+def bench_comments(comment_count, reply_count, authors, per_page, runs):
+    """Compare per-comment loading with the batched thread loader."""
+    with rollback_session() as session:
+        users = seed_users(session, authors)
+        project = seed_project(session, users[0])
+        prompt = seed_prompt(session, project, users[0])
+
+        comments = [
+            Comment(
+                content=f"Comment {i}",
+                prompt_id=prompt.id,
+                created_by=users[i % authors].id,
+                updated_by=users[i % authors].id
+            )
+            for i in range(comment_count)
+        ]
+        session.add_all(comments)
+        session.flush()
+        session.add_all([
+            Reply(
+                content=f"Reply {j}",
+                comment_id=comment.id,
+                created_by=users[(i + j) % authors].id,
+                updated_by=users[(i + j) % authors].id
+            )
+            for i, comment in enumerate(comments)
+            for j in range(reply_count)
+        ])
+        session.flush()
+        click.echo(f"Seeded {comment_count} comments with {reply_count} replies each")
+
+        manager = CommentManager(session)
+
+        def per_comment():
+            page = manager.get_prompt_comments(prompt.id)[:per_page]
+            return [
+                dict(
+                    manager.format_comment_data(comment, replies_count=len(comment.replies)),
+                    replies=[manager.format_reply_data(reply) for reply in manager.get_comment_replies(comment.id)]
+                )
+                for comment in page
+            ]
+
+        def batched():
+            return manager.get_prompt_thread(prompt.id, limit=per_page)
+
+        first_window = manager.get_prompt_thread(prompt.id, limit=per_page)
+
+        def next_window():
+            return manager.get_prompt_thread(prompt.id, cursor=first_window["next_cursor"], limit=per_page)
+
+        def poll_new():
+            return manager.get_new_comments(prompt.id, since=first_window["since"])
+
+        report({
+            "per-comment": measure(per_comment, runs, setup=session.expire_all),
+            "batched thread": measure(batched, runs, setup=session.expire_all),
+            "next window (cursor)": measure(next_window, runs, setup=session.expire_all),
+            "poll new comments": measure(poll_new, runs, setup=session.expire_all),
+        })
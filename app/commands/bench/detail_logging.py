@@ -0,0 +1,145 @@
+import cProfile
+import io
+import logging
+import pstats
+
+import click
+
+from app.db.models import Prompt
+from app.managers.prompt_manager import PromptManager
+from app.managers.user_manager import UsernameResolver
+from app.routers.projects.web import version_history
+from app.utils.format_date import format_relative_time
+from .utils import rollback_session, seed_users, seed_project, measure, report
+
+logger = logging.getLogger("app.routers.projects.web")
+
+
+def legacy_version_history(prompt, prompt_uuid, usernames):
+    """The detail page's version history with its debug logging as eager f-strings, as it was before."""
+    versions = []
+    if hasattr(prompt, "versions") and prompt.versions:
+        logger.info(
+            f"Processing {len(prompt.versions)} versions for prompt {prompt_uuid}"
+        )
+        for i, version in enumerate(prompt.versions):
+            logger.debug(
+                f"Version {i+1}: id={version.id}, version={version.version}, "
+                + f"parent_id={version.parent_id if hasattr(version, 'parent_id') else 'N/A'}, "
+                + f"name={version.name}, is_active={getattr(version, 'is_active', None)}"
+            )
+            versions.append(
+                {
+                    "id": str(version.id),
+                    "version": version.version,
+                    "name": version.name,
+                    "created_at": format_relative_time(version.created_at),
+                    "created_by": usernames.get(version.created_by),
+                    "updated_at": (
+                        format_relative_time(version.updated_at)
+                        if version.updated_at
+                        else None
+                    ),
+                    "updated_by": usernames.get(version.updated_by, None),
+                    "is_active": (
+                        version.is_active if hasattr(version, "is_active") else False
+                    ),
+                }
+            )
+        versions.sort(key=lambda v: v["version"], reverse=True)
+        logger.debug(f"Sorted {len(versions)} versions by version number")
+        logger.debug(
+            f"prompt.versions count: {len(prompt.versions)}, processed versions count: {len(versions)}"
+        )
+        logger.debug(f"Versions in array: {[v['version'] for v in versions]}")
+    else:
+        logger.info(f"No versions found for prompt {prompt_uuid}")
+    return versions
+
+
+class RecordCollector(logging.Handler):
+    """Keep the formatted messages of every record"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def profile(func, top):
+    """cProfile `func` once and return the `top` entries by own time"""
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(top)
+    return out.getvalue()
+
+
+@click.command()
+@click.option('--versions', 'version_count', default=500, show_default=True, help='Versions in the prompt family')
+@click.option('--renders', default=200, show_default=True, help='Version histories built per run')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per case')
+@click.option('--profile', 'profile_top', default=0, show_default=True, help='Print the top N functions of a cProfile run per case')
+def bench_detail_logging(version_count, renders, runs, profile_top):
+    """Compare eager f-string and lazy debug logging on the version-heavy prompt detail page."""
+    with rollback_session() as session:
+        user = seed_users(session, 1)[0]
+        project = seed_project(session, user)
+        parent = None
+        for v in range(1, version_count + 1):
+            prompt = Prompt(
+                name="Bench family",
+                key="bench-family" if v == 1 else f"bench-family_v{v}",
+                user_prompt=f"Version {v}",
+                version=v,
+                is_active=v == version_count,
+                project_id=project.id,
+                created_by=user.id
+            )
+            prompt.parent_id = parent.id if parent else None
+            session.add(prompt)
+            session.flush()
+            parent = prompt
+        session.expunge_all()
+
+        prompt = PromptManager(session).get_prompt(parent.id)
+        usernames = UsernameResolver(session).add_from(prompt.versions).resolve()
+        click.echo(f"Seeded a prompt with {len(prompt.versions)} versions")
+
+        def run(history):
+            def render():
+                for _ in range(renders):
+                    history(prompt, prompt.id, usernames)
+            return render
+
+        level = logger.level
+        collectors = {"old": RecordCollector(), "new": RecordCollector()}
+        try:
+            logger.setLevel(logging.INFO)
+            results = {
+                f"eager f-strings, INFO x{renders}": measure(run(legacy_version_history), runs),
+                f"lazy logging, INFO x{renders}": measure(run(version_history), runs),
+            }
+            if profile_top:
+                click.echo(profile(run(legacy_version_history), profile_top))
+                click.echo(profile(run(version_history), profile_top))
+
+            # With DEBUG on, both versions must log exactly the same messages
+            logger.setLevel(logging.DEBUG)
+            for name, history in (("old", legacy_version_history), ("new", version_history)):
+                logger.addHandler(collectors[name])
+                try:
+                    history(prompt, prompt.id, usernames)
+                finally:
+                    logger.removeHandler(collectors[name])
+        finally:
+            logger.setLevel(level)
+
+    report(results)
+    same = collectors["old"].messages == collectors["new"].messages
+    click.echo(
+        f"DEBUG output: {len(collectors['new'].messages)} records, "
+        f"{'identical to' if same else 'DIFFERENT from'} the eager f-string version"
+    )
@@ -0,0 +1,84 @@
+import re
+import tempfile
+
+import click
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from app.config import settings
+from app.services.template import render_template, render_text_template, templates_path
+from app.services.template.config import TEMPLATE_CONFIGS
+from .utils import measure, report
+
+
+def sample_context(template: str) -> dict:
+    """Placeholder values for every variable the template requires."""
+    return {
+        name: f"https://example.com/{name}" if name.endswith("url") else f"Sample {name.replace('_', ' ')}"
+        for name in TEMPLATE_CONFIGS[template].required_variables or ()
+    }
+
+
+def make_env(bytecode_cache=None) -> Environment:
+    """An environment configured like the email template service, with nothing compiled yet."""
+    env = Environment(
+        loader=FileSystemLoader(templates_path),
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache
+    )
+    env.globals["settings"] = settings
+    return env
+
+
+def legacy_text(html_content: str) -> str:
+    """HTML to text conversion of each rendered email, as done before text templates were derived."""
+    text_content = html_content.replace('<br>', '\n').replace('<br/>', '\n')
+    text_content = text_content.replace('<p>', '\n\n').replace('</p>', '\n\n')
+    text_content = text_content.replace('<h1>', '\n\n# ').replace('</h1>', '\n\n')
+    text_content = text_content.replace('<h2>', '\n\n## ').replace('</h2>', '\n\n')
+    text_content = text_content.replace('<h3>', '\n\n### ').replace('</h3>', '\n\n')
+    text_content = text_content.replace('<ul>', '\n').replace('</ul>', '\n')
+    text_content = text_content.replace('<li>', '- ').replace('</li>', '\n')
+    text_content = text_content.replace('<a href="', '').replace('">', ': ').replace('</a>', '')
+    text_content = re.sub(r'<[^>]+>', '', text_content)
+    return re.sub(r'\n\s*\n', '\n\n', text_content).strip()
+
+
+@click.command()
+@click.option('--messages', default=10000, show_default=True, help='Emails rendered per run')
+@click.option('--template', 'template_type', default='invitation', show_default=True,
+              type=click.Choice(sorted(TEMPLATE_CONFIGS)), help='Email template to render')
+@click.option('--runs', default=3, show_default=True, help='Timed runs per case')
+def bench_emails(messages, template_type, runs):
+    """Compare per-message template loading and HTML conversion with compiled email templates."""
+    config = TEMPLATE_CONFIGS[template_type]
+    context = sample_context(template_type)
+    legacy_env = make_env()
+    has_text = config.text_path in legacy_env.loader.list_templates()
+
+    def legacy():
+        for _ in range(messages):
+            html = legacy_env.get_template(config.html_path).render(**context)
+            if has_text:
+                legacy_env.get_template(config.text_path).render(**context)
+            else:
+                legacy_text(html)
+
+    def compiled():
+        for _ in range(messages):
+            render_template(template_type, **context)
+            render_text_template(template_type, **context)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        warm = FileSystemBytecodeCache(cache_dir)
+        make_env(warm).get_template(config.html_path)
+
+        results = {
+            f"legacy render x{messages}": measure(legacy, runs),
+            f"compiled render x{messages}": measure(compiled, runs),
+            "first compile": measure(lambda: make_env().get_template(config.html_path), runs),
+            "load from bytecode cache": measure(lambda: make_env(warm).get_template(config.html_path), runs)
+        }
+    report(results)
+    click.echo(f"Text version: {'text template' if has_text else 'derived from HTML'} ({template_type})")
@@ -0,0 +1,76 @@
+import io
+import json
+import random
+import uuid
+
+import click
+
+from app.managers.prompt_manager import PromptManager
+from app.services.prompt_import import import_bundle
+from .utils import rollback_session, seed_users, seed_project, measure, report
+
+WORDS = "summarize translate classify extract the text below into concise clear bullet points for a reader".split()
+
+
+def make_bundle(project_key, prompts, versions, words, rng):
+    """An NDJSON bundle of `prompts` families with `versions` versions each."""
+    lines = [json.dumps({"key": project_key, "name": project_key})]
+    tag = uuid.uuid4().hex[:6]
+    for i in range(prompts):
+        text = [rng.choice(WORDS) for _ in range(words)]
+        history = []
+        for v in range(versions):
+            text[rng.randrange(words)] = rng.choice(WORDS)
+            history.append({"system_prompt": "You are a careful assistant.", "user_prompt": " ".join(text)})
+        lines.append(json.dumps({"project": project_key, "key": f"p{tag}-{i}", "name": f"Prompt {i}", "versions": history}))
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option('--prompts', default=50000, show_default=True, help='Prompts in the bulk import')
+@click.option('--versions', 'version_count', default=1, show_default=True, help='Versions per prompt')
+@click.option('--words', default=60, show_default=True, help='Words per prompt text')
+@click.option('--batch-size', default=1000, show_default=True, help='Prompts per import batch')
+@click.option('--baseline', default=500, show_default=True, help='Prompts created one by one for comparison')
+@click.option('--runs', default=1, show_default=True, help='Timed runs per case')
+def bench_imports(prompts, version_count, words, batch_size, baseline, runs):
+    """Compare the bulk importer with creating prompts one by one."""
+    rng = random.Random(42)
+    with rollback_session() as session:
+        user = seed_users(session, 1)[0]
+        project = seed_project(session, user)
+        manager = PromptManager(session)
+
+        def one_by_one():
+            tag = uuid.uuid4().hex[:6]
+            for i in range(baseline):
+                manager.create_prompt(
+                    project_id=project.id,
+                    key=f"o{tag}-{i}",
+                    name=f"Prompt {i}",
+                    description=None,
+                    system_prompt="You are a careful assistant.",
+                    user_prompt=" ".join(rng.choice(WORDS) for _ in range(words)),
+                    created_by=user.id
+                )
+
+        def bulk(count):
+            def run():
+                bundle = make_bundle(project.key, count, version_count, words, rng)
+                result = import_bundle(session, io.StringIO(bundle), user.id, fmt="ndjson", batch_size=batch_size)
+                if result["errors_total"]:
+                    raise click.ClickException(f"Import rejected rows: {result['errors'][:3]}")
+            return run
+
+        results = {
+            f"create_prompt x{baseline}": measure(one_by_one, runs),
+            f"bulk import x{baseline}": measure(bulk(baseline), runs),
+            f"bulk import x{prompts}": measure(bulk(prompts), runs),
+        }
+        report(results)
+
+        per_prompt = results[f"create_prompt x{baseline}"]["median_ms"] / max(baseline, 1)
+        click.echo(
+            f"\ncreate_prompt extrapolated to {prompts} prompts: {per_prompt * prompts / 1000:.1f} s; "
+            f"bulk import: {results[f'bulk import x{prompts}']['median_ms'] / 1000:.1f} s"
+        )
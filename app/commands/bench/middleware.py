@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+
+import click
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.middleware import AuthRedirectMiddleware, LoggingMiddleware, SettingsContextMiddleware
+
+
+def request_details(request: Request) -> dict:
+    """The per-request details the logging middleware collected before it became pure ASGI."""
+    return {
+        "request_id": str(uuid.uuid4()),
+        "client_correlation_id": request.headers.get("X-Correlation-ID"),
+        "method": request.method,
+        "url": str(request.url),
+        "path": request.url.path,
+        "query_params": dict(request.query_params),
+        "client_host": request.client.host if request.client else None,
+        "user_agent": request.headers.get("user-agent"),
+        "referer": request.headers.get("referer"),
+        "content_type": request.headers.get("content-type"),
+        "accept": request.headers.get("accept"),
+        "content_length": request.headers.get("content-length"),
+        "x_forwarded_for": request.headers.get("x-forwarded-for"),
+        "x_real_ip": request.headers.get("x-real-ip"),
+        "session_id": None,
+        "user_id": None,
+    }
+
+
+def log_request_info(request: Request, response=None, error=None):
+    """Plain text request logging as it was before requests were logged as structured events."""
+    logger = logging.getLogger("app.request")
+    if error:
+        logger.error(f"Exception during request processing: {str(error)}")
+        return
+    if response:
+        logger.info(f"Request processed successfully")
+    else:
+        logger.info(f"Request received: {request.method} {request.url.path}")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The request logging middleware as it was before it became pure ASGI."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        details = request_details(request)
+        request.state.request_id = details["request_id"]
+        log_request_info(request)
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = details["request_id"]
+        if details["client_correlation_id"]:
+            response.headers["X-Correlation-ID"] = details["client_correlation_id"]
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        log_request_info(request, response=response)
+        return response
+
+
+class LegacyAuthRedirectMiddleware(BaseHTTPMiddleware):
+    """The login redirect middleware as it was before it became pure ASGI."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        location = response.headers.get("Location")
+        if response.status_code == 307 and location and location.startswith("/login"):
+            return RedirectResponse(url=location, status_code=303)
+        return response
+
+
+class LegacySettingsContextMiddleware(BaseHTTPMiddleware):
+    """The settings middleware as it was before it became pure ASGI."""
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.settings = settings
+        return await call_next(request)
+
+
+def make_app(middleware) -> FastAPI:
+    """A trivial route behind the given middleware classes, innermost first as in app.main."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    for cls in middleware:
+        app.add_middleware(cls)
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> dict:
+    """Send `requests` GETs with `concurrency` in flight; returns throughput and latency percentiles."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count):
+            for _ in range(count):
+                started = time.perf_counter()
+                response = await client.get("/ping", headers={"X-Correlation-ID": str(uuid.uuid4())})
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        per_worker = requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1]
+    }
+
+
+@click.command()
+@click.option('--requests', 'request_count', default=5000, show_default=True, help='Requests per run')
+@click.option('--concurrency', default=16, show_default=True, help='Requests in flight')
+@click.option('--runs', default=3, show_default=True, help='Runs per case (best is reported)')
+def bench_middleware(request_count, concurrency, runs):
+    """Compare BaseHTTPMiddleware and pure ASGI middleware on a trivial route."""
+    cases = {
+        "no middleware": [],
+        "BaseHTTPMiddleware x3": [LegacyLoggingMiddleware, LegacyAuthRedirectMiddleware, LegacySettingsContextMiddleware],
+        "pure ASGI x3": [LoggingMiddleware, AuthRedirectMiddleware, SettingsContextMiddleware]
+    }
+    # Isolate middleware overhead from log output, which both stacks write alike
+    request_logger = logging.getLogger("app.request")
+    level = request_logger.level
+    request_logger.setLevel(logging.WARNING)
+    try:
+        results = {
+            name: max(
+                (asyncio.run(drive(make_app(middleware), request_count, concurrency)) for _ in range(runs)),
+                key=lambda result: result["rps"]
+            )
+            for name, middleware in cases.items()
+        }
+    finally:
+        request_logger.setLevel(level)
+
+    width = max(len(name) for name in results)
+    click.echo(f"{'case'.ljust(width)}  {'req/s':>9}  {'p50 ms':>8}  {'p99 ms':>8}")
+    for name, stats in results.items():
+        click.echo(f"{name.ljust(width)}  {stats['rps']:>9.0f}  {stats['p50_ms']:>8.2f}  {stats['p99_ms']:>8.2f}")
@@ -0,0 +1,90 @@
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+import click
+from fastapi import Request
+
+from app.config import settings
+from app.logger import configure_structlog, make_formatter, start_queue_listener
+from app.middleware.logging import log_request
+from .middleware import log_request_info, request_details
+from .utils import measure, report
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "scheme": "http",
+    "server": ("bench", 80),
+    "client": ("127.0.0.1", 50000),
+    "root_path": "",
+    "path": "/projects/bench",
+    "raw_path": b"/projects/bench",
+    "query_string": b"page=2&sort=name",
+    "headers": [
+        (b"host", b"bench"),
+        (b"user-agent", b"bench"),
+        (b"accept", b"text/html"),
+        (b"x-correlation-id", b"bench-correlation"),
+    ],
+}
+
+
+@click.command()
+@click.option('--requests', 'request_count', default=20000, show_default=True, help='Requests logged per run')
+@click.option('--sample-rate', default=0.1, show_default=True, help='Sample rate of the sampled case')
+@click.option('--runs', default=3, show_default=True, help='Timed runs per case')
+def bench_logging(request_count, sample_rate, runs):
+    """Compare the request-path cost of plain text file logging and queued structured logging."""
+    request_logger = logging.getLogger("app.request")
+    saved = (request_logger.handlers, request_logger.level, request_logger.propagate, settings.LOGGING.REQUEST_SAMPLE_RATE)
+    configure_structlog()
+    request_logger.propagate = False
+    request_logger.setLevel(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        text_handler = RotatingFileHandler(os.path.join(log_dir, "text.log"), maxBytes=10 * 1024 * 1024, backupCount=1)
+        text_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+        ))
+        json_handler = RotatingFileHandler(os.path.join(log_dir, "json.log"), maxBytes=10 * 1024 * 1024, backupCount=1)
+        json_handler.setFormatter(make_formatter(json=True))
+        listener = start_queue_listener([json_handler])
+
+        def legacy():
+            request_logger.handlers = [text_handler]
+            for _ in range(request_count):
+                request = Request(SCOPE)
+                request_details(request)
+                log_request_info(request)
+                log_request_info(request, response=True)
+
+        def structured(rate):
+            def run():
+                request_logger.handlers = [listener.queue_handler]
+                settings.LOGGING.REQUEST_SAMPLE_RATE = rate
+                for _ in range(request_count):
+                    started = time.perf_counter()
+                    log_request(SCOPE, 200, started, started, "bench-request", "bench-correlation")
+            return run
+
+        try:
+            results = {
+                f"plain text, file write x{request_count}": measure(legacy, runs),
+                f"structured, queued x{request_count}": measure(structured(1.0), runs),
+                f"structured, queued, {sample_rate:.0%} sampled x{request_count}": measure(structured(sample_rate), runs),
+            }
+            started = time.perf_counter()
+            listener.stop()
+            drained_ms = (time.perf_counter() - started) * 1000
+        finally:
+            request_logger.handlers, request_logger.level, request_logger.propagate, settings.LOGGING.REQUEST_SAMPLE_RATE = saved
+            text_handler.close()
+            json_handler.close()
+
+    report(results)
+    for name, stats in results.items():
+        click.echo(f"{name}: {stats['median_ms'] * 1000 / request_count:.1f} us per request on the request path")
+    click.echo(f"Listener thread finished writing queued records {drained_ms:.0f} ms after the last run")
@@ -0,0 +1,67 @@
+import click
+
+from app.db.models import Team, TeamMember, TeamRole, Project, Prompt
+from app.managers.search_manager import SearchManager
+from app.services.authorization import AccessControlIndex
+from .utils import rollback_session, seed_users, measure, report
+
+
+@click.command()
+@click.option('--tenants', default=200, show_default=True, help='Teams sharing the database')
+@click.option('--projects', default=5, show_default=True, help='Projects per tenant')
+@click.option('--prompts', default=10, show_default=True, help='Prompts per project')
+@click.option('--query', default='summar', show_default=True, help='Search term')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per case')
+def bench_search(tenants, projects, prompts, query, runs):
+    """Compare SQL-scoped search with fetching everything and filtering in Python."""
+    with rollback_session() as session:
+        users = seed_users(session, tenants)
+        teams = [Team(name=f"Tenant {i}", created_by=user.id) for i, user in enumerate(users)]
+        session.add_all(teams)
+        session.flush()
+        session.add_all([
+            TeamMember(team_id=team.id, user_id=user.id, role=TeamRole.OWNER, status='active')
+            for team, user in zip(teams, users)
+        ])
+        all_projects = [
+            Project(
+                name=f"Tenant {i} project {j}",
+                key=f"bench-{team.id.hex[:8]}-{j}",
+                team_id=team.id,
+                created_by=user.id
+            )
+            for i, (team, user) in enumerate(zip(teams, users))
+            for j in range(projects)
+        ]
+        session.add_all(all_projects)
+        session.flush()
+        session.add_all([
+            Prompt(
+                name=f"Prompt {k}",
+                key=f"prompt-{k}",
+                user_prompt="Summarize the following text" if k % 3 == 0 else "Translate the following text",
+                project_id=project.id,
+                created_by=project.created_by
+            )
+            for project in all_projects
+            for k in range(prompts)
+        ])
+        session.flush()
+        click.echo(f"Seeded {tenants} tenants, {len(all_projects)} projects, {len(all_projects) * prompts} prompts")
+
+        user = users[0]
+        manager = SearchManager(session)
+
+        def scoped():
+            return manager.search(user.id, query=query, page=1, per_page=20)
+
+        def unscoped_python_filter():
+            access = AccessControlIndex.load(session, user.id)
+            matches = session.query(Prompt).join(Project).filter(Prompt.user_prompt.ilike(f"%{query}%")).all()
+            visible = [prompt for prompt in matches if access.can_view_project(prompt.project)]
+            return visible[:20], len(visible)
+
+        report({
+            "python filter": measure(unscoped_python_filter, runs, setup=session.expire_all),
+            "sql scoped search": measure(scoped, runs, setup=session.expire_all),
+        })
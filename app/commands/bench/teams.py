@@ -0,0 +1,66 @@
+import click
+
+from app.db.models import Team, TeamMember, TeamRole, Project
+from app.managers.team_manager import TeamManager
+from .utils import rollback_session, seed_users, measure, report
+
+
+@click.command()
+@click.option('--teams', 'team_count', default=50, show_default=True, help='Teams the user belongs to')
+@click.option('--members', default=8, show_default=True, help='Members per team')
+@click.option('--projects', default=4, show_default=True, help='Projects per team')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per case')
+def bench_teams(team_count, members, projects, runs):
+    """Compare per-team loading with the batched team overview."""
+    with rollback_session() as session:
+        users = seed_users(session, max(members, 1))
+        user = users[0]
+
+        teams = [Team(name=f"Bench team {i}", created_by=user.id, updated_by=user.id) for i in range(team_count)]
+        session.add_all(teams)
+        session.flush()
+        session.add_all([
+            TeamMember(
+                team_id=team.id,
+                user_id=member.id,
+                role=TeamRole.ADMIN if member is user else TeamRole.EDITOR,
+                status='active'
+            )
+            for team in teams
+            for member in users
+        ])
+        session.add_all([
+            Project(
+                name=f"Bench project {i}-{j}",
+                key=f"bench-{team.id.hex[:8]}-{j}",
+                team_id=team.id,
+                created_by=user.id,
+                updated_by=user.id
+            )
+            for i, team in enumerate(teams)
+            for j in range(projects)
+        ])
+        session.flush()
+        click.echo(f"Seeded {team_count} teams with {members} members and {projects} projects each")
+
+        manager = TeamManager(session)
+
+        def per_team():
+            details = []
+            for team in manager.get_user_teams(user.id):
+                details.append({
+                    "team": team,
+                    "members": manager.get_team_members(team.id),
+                    "project_count": manager.get_team_project_count(team.id),
+                    "permissions": manager.check_team_permissions(team.id, user.id),
+                    "created_by": team.creator.username if team.creator else None
+                })
+            return details
+
+        def overview():
+            return manager.get_user_team_overview(user.id)
+
+        report({
+            "per-team": measure(per_team, runs, setup=session.expire_all),
+            "team overview": measure(overview, runs, setup=session.expire_all),
+        })
@@ -0,0 +1,132 @@
+"""
+Shared helpers for benchmark commands.
+
+Benchmarks seed their fixtures inside a transaction that is always rolled
+back, so they can be pointed at a development database without leaving
+any data behind.
+"""
+import time
+import uuid
+import statistics
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Generator
+
+import click
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.database import db
+from app.db.models import User, Project, Prompt
+
+
+class QueryCounter:
+    """Count the SQL statements executed on an engine while active."""
+
+    def __init__(self, engine=None):
+        self.engine = engine or db.engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+
+@contextmanager
+def rollback_session() -> Generator[Session, None, None]:
+    """Yield a session whose work, including commits, is rolled back on exit."""
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+def seed_users(session: Session, count: int) -> List[User]:
+    """Create `count` throwaway users."""
+    tag = uuid.uuid4().hex[:8]
+    users = [
+        User(
+            username=f"bench-{tag}-{i}",
+            email=f"bench-{tag}-{i}@example.com",
+            hashed_password="!",
+            is_active=True
+        )
+        for i in range(count)
+    ]
+    session.add_all(users)
+    session.flush()
+    return users
+
+
+def seed_project(session: Session, owner: User) -> Project:
+    """Create a throwaway project owned by `owner`."""
+    tag = uuid.uuid4().hex[:8]
+    project = Project(
+        name=f"Bench {tag}",
+        key=f"bench-{tag}",
+        created_by=owner.id,
+        updated_by=owner.id
+    )
+    session.add(project)
+    session.flush()
+    return project
+
+
+def seed_prompt(session: Session, project: Project, owner: User, key: str = None,
+                content: str = "Benchmark prompt") -> Prompt:
+    """Create a throwaway root prompt in `project`."""
+    key = key or f"bench-{uuid.uuid4().hex[:8]}"
+    prompt = Prompt(
+        name=key,
+        key=key,
+        user_prompt=content,
+        project_id=project.id,
+        created_by=owner.id,
+        updated_by=owner.id
+    )
+    session.add(prompt)
+    session.flush()
+    return prompt
+
+
+def measure(func: Callable[[], Any], runs: int, setup: Callable[[], Any] = None) -> Dict[str, float]:
+    """Run `func` `runs` times and return timing and query statistics."""
+    timings = []
+    queries = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+        "queries": max(queries)
+    }
+
+
+def report(results: Dict[str, Dict[str, float]]) -> None:
+    """Print benchmark results as an aligned table."""
+    width = max(len(name) for name in results)
+    click.echo(f"{'case'.ljust(width)}  {'queries':>8}  {'min ms':>9}  {'median ms':>9}  {'max ms':>9}")
+    for name, stats in results.items():
+        click.echo(
+            f"{name.ljust(width)}  {stats['queries']:>8}  {stats['min_ms']:>9.2f}  "
+            f"{stats['median_ms']:>9.2f}  {stats['max_ms']:>9.2f}"
+        )
@@ -0,0 +1,105 @@
+import random
+
+import click
+from sqlalchemy import Text, cast, func
+
+from app.db.models import Prompt, TextBlob
+from app.managers.prompt_manager import PromptManager
+from app.services.storage_stats import format_bytes
+from app.services.version_storage import VersionStore, materialized_versions
+from .utils import rollback_session, seed_users, seed_project, measure, report
+
+WORDS = "summarize translate classify extract the text below into concise clear bullet points for a reader".split()
+
+
+def stored_bytes(session, project_id):
+    """Bytes of version text as stored: distinct blobs, plain texts and delta payloads."""
+    prompts = session.query(Prompt).filter(Prompt.project_id == project_id)
+    hashes = {
+        blob_hash
+        for row in prompts.with_entities(Prompt.system_prompt_hash, Prompt.user_prompt_hash)
+        for blob_hash in row if blob_hash
+    }
+    blob_bytes = session.query(func.coalesce(func.sum(TextBlob.size), 0))\
+        .filter(TextBlob.hash.in_(hashes)).scalar() if hashes else 0
+    row_bytes = prompts.with_entities(func.coalesce(func.sum(
+        func.coalesce(func.octet_length(Prompt._system_prompt), 0)
+        + func.coalesce(func.octet_length(Prompt._user_prompt), 0)
+        + func.coalesce(func.octet_length(cast(Prompt.text_delta, Text)), 0)
+    ), 0)).scalar()
+    return blob_bytes + row_bytes
+
+
+@click.command()
+@click.option('--families', default=20, show_default=True, help='Prompt families')
+@click.option('--versions', 'version_count', default=40, show_default=True, help='Versions per family')
+@click.option('--words', default=800, show_default=True, help='Words per prompt text')
+@click.option('--edits', default=3, show_default=True, help='Words changed per version')
+@click.option('--snapshot-interval', default=10, show_default=True, help='Every Nth version stored in full')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per case')
+def bench_versions(families, version_count, words, edits, snapshot_interval, runs):
+    """Compare storage size and read latency of full and delta version storage."""
+    rng = random.Random(42)
+    with rollback_session() as session:
+        user = seed_users(session, 1)[0]
+        project = seed_project(session, user)
+
+        roots = []
+        for f in range(families):
+            text = [rng.choice(WORDS) for _ in range(words)]
+            parent = None
+            for v in range(1, version_count + 1):
+                for _ in range(edits):
+                    text[rng.randrange(words)] = rng.choice(WORDS)
+                prompt = Prompt(
+                    name=f"Family {f}",
+                    key=f"bench-family-{f}" if v == 1 else f"bench-family-{f}_v{v}",
+                    system_prompt="You are a careful assistant.\n" * 5,
+                    user_prompt=" ".join(text),
+                    version=v,
+                    is_active=v == version_count,
+                    project_id=project.id,
+                    created_by=user.id
+                )
+                prompt.parent_id = parent.id if parent else None
+                session.add(prompt)
+                session.flush()
+                parent = prompt
+                if v == 1:
+                    roots.append(prompt)
+            session.expunge_all()
+        click.echo(f"Seeded {families} families with {version_count} versions of {words} words")
+
+        root_ids = [root.id for root in roots]
+        manager = PromptManager(session)
+
+        # The version furthest from a snapshot needs the longest delta chain
+        worst_version = snapshot_interval if version_count >= snapshot_interval else version_count - 1
+        targets = [
+            session.query(Prompt.id).filter(Prompt.key == f"bench-family-{f}_v{worst_version}").scalar()
+            for f in range(families)
+        ]
+
+        def read_all():
+            return [len(session.get(Prompt, target_id).user_prompt) for target_id in targets]
+
+        def cold():
+            session.expire_all()
+            materialized_versions.clear()
+
+        results = {"full read": measure(read_all, runs, setup=session.expire_all)}
+        full_bytes = stored_bytes(session, project.id)
+
+        store = VersionStore(mode="delta", snapshot_interval=snapshot_interval)
+        for root_id in root_ids:
+            store.repack_family(session, manager.get_family_versions(root_id, with_text=True))
+        session.commit()
+        delta_bytes = stored_bytes(session, project.id)
+        click.echo(
+            f"Stored text: full {format_bytes(full_bytes)}, delta {format_bytes(delta_bytes)} "
+            f"({100 - delta_bytes * 100 // max(full_bytes, 1)}% saved)"
+        )
+
+        results["delta read, cold cache"] = measure(read_all, runs, setup=cold)
+        results["delta read, warm cache"] = measure(read_all, runs, setup=session.expire_all)
+        report(results)
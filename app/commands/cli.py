@@ -20,10 +20,16 @@ def cli():
 from .db import db_group
 from .migrations import migrations_group
 from .auth import auth_group
+from .bench import bench_group
+from .jobs import jobs_group
+from .templates import templates_group
 
 cli.add_command(db_group, name="db")
 cli.add_command(migrations_group, name="migrations")
 cli.add_command(auth_group, name="auth")
+cli.add_command(bench_group, name="bench")
+cli.add_command(jobs_group, name="jobs")
+cli.add_command(templates_group, name="templates")
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
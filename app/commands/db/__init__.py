@@ -2,6 +2,11 @@ import click
 # from .init import init_db
 # from .superuser import create_superuser
 from .tables import check_tables, list_tables, seed_llm_models
+from .storage import refresh_storage_stats
+from .versions import repack_versions, find_identical_versions
+from .blobs import migrate_prompt_texts_command, gc_blobs
+from .prompt_import import import_prompts
+from .bundles import export_bundle, restore_bundle_command
 
 @click.group()
 def db_group():
@@ -13,4 +18,12 @@ def db_group():
 
 db_group.add_command(check_tables, name='check-tables')
 db_group.add_command(list_tables, name='list-tables')
-db_group.add_command(seed_llm_models, name="seed-llm-models")
\ No newline at end of file
+db_group.add_command(seed_llm_models, name="seed-llm-models")
+db_group.add_command(refresh_storage_stats, name="refresh-storage-stats")
+db_group.add_command(repack_versions, name="repack-versions")
+db_group.add_command(find_identical_versions, name="find-identical-versions")
+db_group.add_command(migrate_prompt_texts_command, name="migrate-prompt-texts")
+db_group.add_command(gc_blobs, name="gc-blobs")
+db_group.add_command(import_prompts, name="import-prompts")
+db_group.add_command(export_bundle, name="export-bundle")
+db_group.add_command(restore_bundle_command, name="restore-bundle")
\ No newline at end of file
@@ -0,0 +1,44 @@
+import click
+from app.db.database import db
+from app.services.storage_stats import format_bytes
+from app.services.text_blobs import collect_garbage, dedup_summary, migrate_prompt_texts
+
+@click.command()
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Prompts committed per batch.')
+def migrate_prompt_texts_command(batch_size):
+    """Move inline prompt texts into deduplicated text blobs."""
+    session = db.get_session()
+    try:
+        migrated = 0
+        for count in migrate_prompt_texts(session, batch_size=batch_size):
+            migrated += count
+            click.echo(f"Migrated {migrated} prompts...")
+        summary = dedup_summary(session)
+        click.echo(
+            f"Done: {migrated} prompts migrated. {summary['blobs']} blobs store "
+            f"{format_bytes(summary['stored_bytes'])} for {format_bytes(summary['referenced_bytes'])} of prompt text."
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
+
+@click.command()
+@click.option('--no-recount', is_flag=True, help='Trust stored reference counts instead of recounting them.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+def gc_blobs(no_recount, dry_run):
+    """Delete text blobs that no prompt references."""
+    session = db.get_session()
+    try:
+        stats = collect_garbage(session, recount=not no_recount, dry_run=dry_run)
+        action = "Would delete" if dry_run else "Deleted"
+        click.echo(
+            f"{action} {stats['deleted']} blobs ({format_bytes(stats['freed_bytes'])}); "
+            f"{stats['recounted']} reference counts corrected."
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
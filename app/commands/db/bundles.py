@@ -0,0 +1,68 @@
+import click
+from app.db.database import db
+from app.db.models import Project
+from app.managers.user_manager import UserManager
+from app.services.project_export import EXPORT_FORMATS, open_bundle, restore_bundle, team_project_ids, write_export
+
+@click.command()
+@click.option('--project', 'project_keys', multiple=True, help='Key of a project to export (repeatable).')
+@click.option('--team', 'team_id', default=None, help='Export every project of this team.')
+@click.option('--output', '-o', type=click.File('wb'), required=True, help='Bundle file to write.')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='ndjson.gz', show_default=True,
+              help='Gzipped NDJSON, or a tar.gz archive with a manifest.')
+def export_bundle(project_keys, team_id, output, fmt):
+    """Export projects with their prompt families, versions and comments."""
+    session = db.get_session()
+    try:
+        project_ids = []
+        if project_keys:
+            found = dict(session.query(Project.key, Project.id).filter(Project.key.in_(project_keys)).all())
+            missing = set(project_keys) - set(found)
+            if missing:
+                raise click.ClickException(f"Projects not found: {', '.join(sorted(missing))}")
+            project_ids.extend(found.values())
+        if team_id:
+            project_ids.extend(team_project_ids(session, team_id))
+        if not project_ids:
+            raise click.ClickException("Nothing to export: pass --project or --team")
+
+        count = write_export(session, project_ids, output, fmt=fmt)
+        click.echo(f"Exported {len(set(project_ids))} projects ({count} records) to {output.name}")
+    finally:
+        session.rollback()
+        db.close_session(session)
+
+@click.command()
+@click.argument('bundle', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'username', required=True, help='Username or email the restored data is created by.')
+@click.option('--team', 'team_id', default=None, help='Team that new projects are created in.')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Records committed per batch.')
+@click.option('--dry-run', is_flag=True, help='Validate the bundle without writing anything.')
+@click.option('--show-errors', type=int, default=20, show_default=True, help='Row errors to print.')
+def restore_bundle_command(bundle, username, team_id, batch_size, dry_run, show_errors):
+    """Restore an export bundle into this environment."""
+    session = db.get_session()
+    try:
+        users = UserManager(session)
+        user = users.get_user_by_username(username) or users.get_user_by_email(username)
+        if not user:
+            raise click.ClickException(f"User '{username}' not found")
+
+        with open_bundle(bundle) as stream:
+            result = restore_bundle(session, stream, user.id, team_id=team_id, batch_size=batch_size, dry_run=dry_run)
+        action = "Would restore" if dry_run else "Restored"
+        click.echo(
+            f"{action} {result['projects_created']} new projects, {result['prompts']} prompts "
+            f"({result['versions']} versions), {result['comments']} comments and {result['replies']} replies; "
+            f"{result['errors_total']} records rejected."
+        )
+        for error in result['errors'][:show_errors]:
+            click.echo(f"  {error['location']}: {error['project']}/{error['key']}: {error['error']}")
+    except ValueError as e:
+        session.rollback()
+        raise click.ClickException(str(e))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
@@ -0,0 +1,45 @@
+import click
+from app.db.database import db
+from app.managers.user_manager import UserManager
+from app.services.prompt_import import FORMATS, detect_format, import_bundle
+
+@click.command()
+@click.argument('bundle', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--user', 'username', required=True, help='Username or email the imported data is created by.')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Bundle format (default: guessed from the file name).')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Prompts committed per batch.')
+@click.option('--dry-run', is_flag=True, help='Validate the bundle without writing anything.')
+@click.option('--show-errors', type=int, default=20, show_default=True, help='Row errors to print.')
+def import_prompts(bundle, username, fmt, batch_size, dry_run, show_errors):
+    """Import projects, prompts and version histories from a JSON, NDJSON or YAML bundle."""
+    session = db.get_session()
+    try:
+        users = UserManager(session)
+        user = users.get_user_by_username(username) or users.get_user_by_email(username)
+        if not user:
+            raise click.ClickException(f"User '{username}' not found")
+
+        result = import_bundle(
+            session,
+            bundle,
+            user.id,
+            fmt=fmt or detect_format(bundle.name),
+            batch_size=batch_size,
+            dry_run=dry_run
+        )
+        action = "Would import" if dry_run else "Imported"
+        click.echo(
+            f"{action} {result['prompts']} prompts ({result['versions']} versions) in {result['batches']} batches, "
+            f"{result['projects_created']} new projects; {result['errors_total']} rows rejected."
+        )
+        for error in result['errors'][:show_errors]:
+            click.echo(f"  {error['location']}: {error['project']}/{error['key']}: {error['error']}")
+    except ValueError as e:
+        session.rollback()
+        raise click.ClickException(str(e))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
@@ -0,0 +1,30 @@
+import click
+from app.db.database import db
+from app.services.storage_stats import StorageAccounting
+
+@click.command()
+@click.option('--limit', type=int, default=None, help='Rows kept per report (default: STORAGE_STATS_TOP_N).')
+@click.option('--show', type=int, default=5, help='Largest entries to print per report.')
+def refresh_storage_stats(limit, show):
+    """Measure storage usage and store a new snapshot."""
+    session = db.get_session()
+    try:
+        accounting = StorageAccounting(session)
+        if not accounting.refresh(limit=limit):
+            click.echo("Another refresh is already running, nothing done.")
+            return
+
+        report = accounting.report(limit=show)
+        usage = report["usage"]
+        click.echo(f"Database: {usage['used_storage']} of {usage['total_storage']} ({usage['storage_usage']}%)")
+        for title, key in (
+            ("Tables", "tables"),
+            ("Projects", "largest_projects"),
+            ("Prompts", "largest_prompts"),
+            ("Version families", "largest_families"),
+        ):
+            click.echo(f"\n{title}:")
+            for entry in report[key]:
+                click.echo(f"  {entry['size']:>10}  {entry['name']}")
+    finally:
+        db.close_session(session)
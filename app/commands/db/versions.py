@@ -0,0 +1,71 @@
+import click
+from app.db.database import db
+from app.db.models import Prompt
+from app.managers.prompt_manager import PromptManager
+from app.services.storage_stats import format_bytes
+from app.services.version_storage import STORAGE_MODES, VersionStore
+
+@click.command()
+@click.option('--mode', type=click.Choice(STORAGE_MODES), default=None,
+              help='Storage mode to repack into (default: VERSIONS_STORAGE_MODE).')
+@click.option('--snapshot-interval', type=int, default=None,
+              help='Store every Nth version in full (default: VERSIONS_SNAPSHOT_INTERVAL).')
+@click.option('--project', 'project_id', default=None, help='Only repack families of this project.')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Families committed per batch.')
+def repack_versions(mode, snapshot_interval, project_id, batch_size):
+    """Re-store existing prompt version families in full or delta form."""
+    store = VersionStore(mode=mode, snapshot_interval=snapshot_interval)
+    session = db.get_session()
+    manager = PromptManager(session)
+    totals = {"families": 0, "full": 0, "delta": 0, "bytes_before": 0, "bytes_after": 0}
+    try:
+        last_id = None
+        while True:
+            query = session.query(Prompt.id).filter(Prompt.parent_id.is_(None))
+            if project_id:
+                query = query.filter(Prompt.project_id == project_id)
+            if last_id is not None:
+                query = query.filter(Prompt.id > last_id)
+            root_ids = [root_id for (root_id,) in query.order_by(Prompt.id).limit(batch_size).all()]
+            if not root_ids:
+                break
+
+            for root_id in root_ids:
+                stats = store.repack_family(session, manager.get_family_versions(root_id, with_text=True))
+                for key, value in stats.items():
+                    totals[key] += value
+                totals["families"] += 1
+            session.commit()
+            # Keep memory flat on large databases
+            session.expunge_all()
+            last_id = root_ids[-1]
+            click.echo(f"Repacked {totals['families']} families...")
+
+        click.echo(
+            f"Done: {totals['full']} full and {totals['delta']} delta versions in {store.mode} mode, "
+            f"text storage {format_bytes(totals['bytes_before'])} -> {format_bytes(totals['bytes_after'])}"
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        db.close_session(session)
+
+@click.command()
+@click.option('--project', 'project_id', default=None, help='Only compare versions within this project.')
+@click.option('--limit', type=int, default=20, show_default=True, help='Maximum number of groups to list.')
+def find_identical_versions(project_id, limit):
+    """List groups of prompt versions with identical name and texts."""
+    session = db.get_session()
+    try:
+        groups = PromptManager(session).find_identical_versions(project_id=project_id, limit=limit)
+        if not groups:
+            click.echo("No identical versions found.")
+            return
+        for group in groups:
+            click.echo(f"{group['content_hash'][:12]}  {group['count']} versions")
+            for version in group['versions']:
+                active = " (active)" if version['is_active'] else ""
+                click.echo(f"    {version['key']} v{version['version']}{active}  {version['id']}  project {version['project_id']}")
+    finally:
+        db.close_session(session)
@@ -0,0 +1,11 @@
+import click
+from .worker import run_worker, list_jobs_command, retry_job_command
+
+@click.group()
+def jobs_group():
+    """Background job queue commands."""
+    pass
+
+jobs_group.add_command(run_worker, name='worker')
+jobs_group.add_command(list_jobs_command, name='list')
+jobs_group.add_command(retry_job_command, name='retry')
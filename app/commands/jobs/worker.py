@@ -0,0 +1,53 @@
+import uuid
+import click
+from app.db.database import db
+from app.db.models import BackgroundJob
+from app.services.jobs import JobWorker, list_jobs, retry_job
+
+@click.command()
+@click.option('--threads', type=int, default=None, help='Worker threads (default: JOBS_WORKER_THREADS).')
+@click.option('--kind', 'kinds', multiple=True, help='Only run jobs of this kind (repeatable).')
+@click.option('--once', is_flag=True, help='Run until the queue has no runnable job, then exit.')
+def run_worker(threads, kinds, once):
+    """Claim and run queued background jobs."""
+    worker = JobWorker(threads=threads, kinds=list(kinds) or None)
+    if once:
+        succeeded, failed = worker.run_once()
+        click.echo(f"Ran {succeeded + failed} jobs: {succeeded} succeeded, {failed} failed or rescheduled.")
+        return
+    click.echo(f"Job worker {worker.worker_id} running {worker.threads} threads (Ctrl+C to stop)...")
+    worker.run_forever()
+
+@click.command()
+@click.option('--status', default=None, help='Only jobs with this status.')
+@click.option('--kind', default=None, help='Only jobs of this kind.')
+@click.option('--limit', type=int, default=20, show_default=True)
+def list_jobs_command(status, kind, limit):
+    """List recent background jobs."""
+    session = db.get_session()
+    try:
+        for job in list_jobs(session, status=status, kind=kind, limit=limit):
+            progress = job.progress or {}
+            done = f"{progress.get('done')}/{progress.get('total')}" if progress else "-"
+            click.echo(
+                f"{job.id}  {job.kind:<22} {job.status:<10} attempts {job.attempts}/{job.max_attempts}  "
+                f"progress {done}  {job.created_at:%Y-%m-%d %H:%M}"
+                + (f"\n    error: {job.error}" if job.error else "")
+            )
+    finally:
+        db.close_session(session)
+
+@click.command()
+@click.argument('job_id')
+def retry_job_command(job_id):
+    """Queue a failed or cancelled job again."""
+    session = db.get_session()
+    try:
+        job = session.get(BackgroundJob, uuid.UUID(job_id))
+        if job is None:
+            raise click.ClickException(f"Job {job_id} not found")
+        if not retry_job(session, job):
+            raise click.ClickException(f"Job is {job.status}; only failed or cancelled jobs can be retried")
+        click.echo(f"Job {job_id} queued again.")
+    finally:
+        db.close_session(session)
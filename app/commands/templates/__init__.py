@@ -0,0 +1,9 @@
+import click
+from .check import check_templates
+
+@click.group()
+def templates_group():
+    """Jinja template commands."""
+    pass
+
+templates_group.add_command(check_templates, name='check')
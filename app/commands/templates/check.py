@@ -0,0 +1,18 @@
+import click
+from app.services import template as email_templates
+from app.templates import precompile_templates
+
+
+@click.command()
+@click.option('--all', 'report_all', is_flag=True, help='Report every broken template instead of stopping at the first.')
+def check_templates(report_all):
+    """Compile every page and email template, failing on syntax errors."""
+    results = precompile_templates(stop_on_error=not report_all)
+    if report_all or all(error is None for error in results.values()):
+        results.update(email_templates.precompile_templates(stop_on_error=not report_all))
+    errors = {name: error for name, error in results.items() if error}
+    for name, error in errors.items():
+        click.echo(f"{name}: {error}", err=True)
+    if errors:
+        raise click.ClickException(f"{len(errors)} of {len(results)} templates failed to compile")
+    click.echo(f"Compiled {len(results)} templates.")
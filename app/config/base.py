@@ -97,6 +97,11 @@ class SecuritySettings(BaseSettings):
         ]
     )
     
+    # Authorization settings
+    ACCESS_CACHE_TTL: int = Field(
+        default_factory=lambda: int(os.getenv("ACCESS_CACHE_TTL", "60"))  # seconds, 0 disables caching
+    )
+    
     # Auth redirect settings
     AUTH_LOGIN_PATH: str = Field(default_factory=lambda: os.getenv("AUTH_LOGIN_PATH", "/login"))
     AUTH_DEFAULT_REDIRECT: str = Field(default_factory=lambda: os.getenv("AUTH_DEFAULT_REDIRECT", "/"))
@@ -134,6 +139,31 @@ class EmailSettings(BaseSettings):
         default_factory=lambda: os.getenv("EMAIL_VALIDATE_CERTS", "true").lower() == "true"
     )
     DEV_DIR: str = Field(default_factory=lambda: os.getenv("EMAIL_DEV_DIR", "data/emails"))
+    SMTP_POOL_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("EMAIL_SMTP_POOL_SIZE", "4"))  # reused authenticated connections
+    )
+    SMTP_MAX_IDLE: float = Field(
+        default_factory=lambda: float(os.getenv("EMAIL_SMTP_MAX_IDLE", "60"))  # seconds before a NOOP check on reuse
+    )
+    SMTP_MAX_MESSAGES: int = Field(
+        default_factory=lambda: int(os.getenv("EMAIL_SMTP_MAX_MESSAGES", "100"))  # per connection
+    )
+    SMTP_TIMEOUT: float = Field(
+        default_factory=lambda: float(os.getenv("EMAIL_SMTP_TIMEOUT", "30"))
+    )
+    PROVIDER: str = Field(default_factory=lambda: os.getenv("EMAIL_PROVIDER", "smtp"))  # smtp | aws_ses
+    AWS_REGION: str = Field(default_factory=lambda: os.getenv("EMAIL_AWS_REGION", "us-east-1"))
+    AWS_ACCESS_KEY: str = Field(default_factory=lambda: os.getenv("EMAIL_AWS_ACCESS_KEY", ""))
+    AWS_SECRET_KEY: str = Field(default_factory=lambda: os.getenv("EMAIL_AWS_SECRET_KEY", ""))
+    SEND_CONCURRENCY: int = Field(
+        default_factory=lambda: int(os.getenv("EMAIL_SEND_CONCURRENCY", "4"))  # messages in flight in batch sends
+    )
+    SEND_RATE: float = Field(
+        default_factory=lambda: float(os.getenv("EMAIL_SEND_RATE", "10"))  # messages per second, 0 = unlimited
+    )
+    INVITE_BATCH_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("EMAIL_INVITE_BATCH_SIZE", "200"))  # deliveries per send round
+    )
 
 class StorageSettings(BaseSettings):
     """Storage configuration settings"""
@@ -141,6 +171,15 @@ class StorageSettings(BaseSettings):
     MAX_UPLOAD_SIZE: int = Field(
         default_factory=lambda: int(os.getenv("MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))
     )
+    DATABASE_QUOTA: int = Field(
+        default_factory=lambda: int(os.getenv("STORAGE_DATABASE_QUOTA", str(10 * 1024 ** 3)))  # bytes, 0 = unlimited
+    )
+    STATS_REFRESH_INTERVAL: int = Field(
+        default_factory=lambda: int(os.getenv("STORAGE_STATS_REFRESH_INTERVAL", "3600"))  # seconds, 0 disables
+    )
+    STATS_TOP_N: int = Field(
+        default_factory=lambda: int(os.getenv("STORAGE_STATS_TOP_N", "50"))  # rows kept per report
+    )
 
 class APISettings(BaseSettings):
     """API configuration settings"""
@@ -200,6 +239,126 @@ class LoggingSettings(BaseSettings):
     FORMAT: str = Field(
         default_factory=lambda: os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     )
+    JSON: bool = Field(
+        default_factory=lambda: os.getenv("LOG_JSON", "true").lower() == "true"  # structlog JSON lines, else key=value text
+    )
+    QUEUE_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records waiting for the writer thread, 0 = unbounded
+    )
+    REQUEST_SAMPLE_RATE: float = Field(
+        default_factory=lambda: float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))  # share of requests logged
+    )
+    REQUEST_SAMPLING: Dict[str, float] = Field(
+        # per path prefix, e.g. "/static=0,/api/events=0.1"; longest prefix wins
+        default_factory=lambda: {
+            prefix.strip(): float(rate)
+            for prefix, _, rate in (
+                item.partition("=") for item in os.getenv("LOG_REQUEST_SAMPLING", "").split(",")
+            )
+            if prefix.strip() and rate.strip()
+        }
+    )
+    SLOW_REQUEST_MS: float = Field(
+        default_factory=lambda: float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))  # slower requests and errors are always logged
+    )
+
+class EventSettings(BaseSettings):
+    """Live update (server-sent events) settings"""
+    BACKEND: str = Field(
+        default_factory=lambda: os.getenv("EVENTS_BACKEND", "memory")  # memory | postgres
+    )
+    PG_CHANNEL: str = Field(
+        default_factory=lambda: os.getenv("EVENTS_PG_CHANNEL", "promptlane_events")
+    )
+    SUBSCRIBER_QUEUE_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("EVENTS_SUBSCRIBER_QUEUE_SIZE", "100"))
+    )
+    HEARTBEAT_INTERVAL: int = Field(
+        default_factory=lambda: int(os.getenv("EVENTS_HEARTBEAT_INTERVAL", "15"))  # seconds
+    )
+    RETRY_INTERVAL: int = Field(
+        default_factory=lambda: int(os.getenv("EVENTS_RETRY_INTERVAL", "3000"))  # milliseconds, sent to clients
+    )
+
+class MetricsSettings(BaseSettings):
+    """Admin metrics settings"""
+    CACHE_TTL: int = Field(
+        default_factory=lambda: int(os.getenv("METRICS_CACHE_TTL", "60"))  # seconds
+    )
+    EXACT_COUNT_THRESHOLD: int = Field(
+        default_factory=lambda: int(os.getenv("METRICS_EXACT_COUNT_THRESHOLD", "100000"))  # rows
+    )
+
+class VersionSettings(BaseSettings):
+    """Prompt version settings"""
+    DIFF_CACHE_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("VERSIONS_DIFF_CACHE_SIZE", "256"))  # version pairs
+    )
+    DIFF_MAX_CHARS: int = Field(
+        default_factory=lambda: int(os.getenv("VERSIONS_DIFF_MAX_CHARS", "200000"))  # per text, word diffs fall back to lines above
+    )
+    STORAGE_MODE: str = Field(
+        default_factory=lambda: os.getenv("VERSIONS_STORAGE_MODE", "full")  # full | delta
+    )
+    SNAPSHOT_INTERVAL: int = Field(
+        default_factory=lambda: int(os.getenv("VERSIONS_SNAPSHOT_INTERVAL", "10"))  # every Nth version is stored in full
+    )
+    MATERIALIZED_CACHE_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("VERSIONS_MATERIALIZED_CACHE_SIZE", "1024"))  # reconstructed versions
+    )
+
+class JobSettings(BaseSettings):
+    """Background job settings"""
+    DELETE_BATCH_SIZE: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_DELETE_BATCH_SIZE", "1000"))  # rows per delete statement
+    )
+    DELETE_INLINE_MAX_ROWS: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_DELETE_INLINE_MAX_ROWS", "5000"))  # larger deletes run as jobs
+    )
+    STALE_AFTER_SECONDS: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_STALE_AFTER_SECONDS", "300"))  # running jobs without a worker heartbeat are resumed
+    )
+    DELETED_USER_NAME: str = Field(
+        default_factory=lambda: os.getenv("JOBS_DELETED_USER_NAME", "deleted-user")  # owner of anonymized activity
+    )
+    RUN_IN_PROCESS: bool = Field(
+        default_factory=lambda: os.getenv("JOBS_RUN_IN_PROCESS", "true").lower() == "true"  # web app runs a worker
+    )
+    WORKER_THREADS: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_WORKER_THREADS", "2"))
+    )
+    POLL_INTERVAL: float = Field(
+        default_factory=lambda: float(os.getenv("JOBS_POLL_INTERVAL", "5"))  # seconds between queue checks
+    )
+    MAX_ATTEMPTS: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    )
+    RETRY_BACKOFF_SECONDS: int = Field(
+        default_factory=lambda: int(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", "30"))  # doubled after every failure
+    )
+    KIND_CONCURRENCY: Dict[str, int] = Field(
+        # e.g. "delete_user=1,delete_team=2"; kinds not listed are unlimited
+        default_factory=lambda: {
+            kind.strip(): int(limit)
+            for kind, _, limit in (
+                item.partition("=") for item in os.getenv("JOBS_KIND_CONCURRENCY", "delete_user=1").split(",")
+            )
+            if kind.strip() and limit.strip()
+        }
+    )
+
+class TemplateSettings(BaseSettings):
+    """Jinja template compilation settings"""
+    BYTECODE_CACHE_DIR: str = Field(
+        default_factory=lambda: os.getenv("TEMPLATES_BYTECODE_CACHE_DIR", "data/cache/jinja")  # empty disables
+    )
+    AUTO_RELOAD: bool = Field(
+        # recompile templates whose files changed; off in production
+        default_factory=lambda: os.getenv("TEMPLATES_AUTO_RELOAD", os.getenv("DEBUG", "false")).lower() == "true"
+    )
+    PRECOMPILE: bool = Field(
+        default_factory=lambda: os.getenv("TEMPLATES_PRECOMPILE", "true").lower() == "true"  # compile at startup
+    )
 
 class BaseSettings(BaseSettings):
     """Base settings with environment variable support"""
@@ -221,6 +380,11 @@ class BaseSettings(BaseSettings):
     APP: AppSettings = AppSettings()
     LOGGING: LoggingSettings = LoggingSettings()
     SERVER: ServerSettings = ServerSettings()
+    EVENTS: EventSettings = EventSettings()
+    METRICS: MetricsSettings = MetricsSettings()
+    VERSIONS: VersionSettings = VersionSettings()
+    JOBS: JobSettings = JobSettings()
+    TEMPLATES: TemplateSettings = TemplateSettings()
     
     model_config = SettingsConfigDict(
         env_file=".env",
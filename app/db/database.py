@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError
@@ -110,6 +110,15 @@ class Database:
                 time.sleep(self._retry_delay)
         return None
 
+    def new_session(self) -> Session:
+        """
+        Get a session of its own, not the thread's scoped one.
+
+        For work that outlives a request on a pooled thread, e.g. a streaming
+        response or a threadpool task; close it with `close_session`.
+        """
+        return self._SessionLocal.session_factory()
+
     def close_session(self, session):
         """Safely close a database session"""
         try:
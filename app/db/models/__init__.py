@@ -7,10 +7,14 @@ from .user import User
 from .team import Team
 from .team_member import TeamMember, TeamRole
 from .project import Project
-from .prompt import Prompt
+from .text_blob import TextBlob, text_hash
+from .prompt import Prompt, content_fingerprint
 from .activity import Activity, ActivityType
 from .comment import Comment, Reply
 from .llm_model import LLMModel
+from .storage_stat import StorageStat
+from .background_job import BackgroundJob
+from .invitation_delivery import InvitationDelivery
 
 __all__ = [
     'Base',
@@ -20,9 +24,15 @@ __all__ = [
     'TeamRole',
     'Project',
     'Prompt',
+    'content_fingerprint',
+    'TextBlob',
+    'text_hash',
     'Activity',
     'ActivityType',
     'Comment',
     'Reply',
-    'LLMModel'
+    'LLMModel',
+    'StorageStat',
+    'BackgroundJob',
+    'InvitationDelivery'
 ] 
\ No newline at end of file
@@ -41,6 +41,8 @@ class ActivityType(str, Enum):
     REPLY_CREATED = "reply_created"
     REPLY_UPDATED = "reply_updated"
     REPLY_DELETED = "reply_deleted"
+    IMPORT_PROMPTS = "import_prompts"
+    INVITE_USERS = "invite_users"
 
 class Activity(BaseModel):
     __tablename__ = "activities"
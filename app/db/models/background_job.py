@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from ...db.models.base import BaseModel
+
+class BackgroundJob(BaseModel):
+    """SQLAlchemy model for long-running work done outside the request.
+
+    ``kind`` selects the handler (see ``app.services.jobs``), ``params``
+    are its arguments. Handlers report ``progress`` as they go, typically
+    ``{"done": ..., "total": ..., "stage": ...}``; ``result`` and ``error``
+    are set when the job finishes. The table doubles as the queue workers
+    claim jobs from.
+    """
+    __tablename__ = 'background_jobs'
+    __table_args__ = (
+        Index('ix_background_jobs_status_created', 'status', 'created_at'),
+    )
+
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default='pending', server_default='pending')  # pending | running | succeeded | failed | cancelled
+    params = Column(JSONB, nullable=True)
+    progress = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    max_attempts = Column(Integer, nullable=False, default=3, server_default='3')
+    run_after = Column(DateTime, nullable=True)  # not claimed before this time (retry backoff)
+    locked_by = Column(String(255), nullable=True)  # worker running the job
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Text, ForeignKey, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr, backref
 from ...db.models.base import BaseModel
@@ -6,6 +6,10 @@ from ...db.models.base import BaseModel
 class Comment(BaseModel):
     """SQLAlchemy model for prompt comments table."""
     __tablename__ = 'prompt_comments'
+    __table_args__ = (
+        # Serves keyset-paginated thread windows: pinned first, then newest first
+        Index('ix_prompt_comments_prompt_pinned_created', 'prompt_id', 'is_pinned', 'created_at'),
+    )
 
     content = Column(Text, nullable=False)
     prompt_id = Column(UUID(as_uuid=True), ForeignKey('prompts.id', ondelete='CASCADE'), nullable=False)
@@ -15,13 +19,14 @@ class Comment(BaseModel):
     @declared_attr
     def prompt(cls):
         # Use overlaps to prevent circular dependency issues
-        return relationship("Prompt", backref=backref("comments", overlaps="prompt"))
+        return relationship("Prompt", backref=backref("comments", overlaps="prompt", passive_deletes=True))
     
     @declared_attr
     def replies(cls):
         return relationship("Reply", 
                            back_populates="comment", 
                            cascade="all, delete-orphan",
+                           passive_deletes=True,
                            order_by="Reply.created_at")
     
     def __repr__(self):
@@ -30,6 +35,9 @@ class Comment(BaseModel):
 class Reply(BaseModel):
     """SQLAlchemy model for comment replies table."""
     __tablename__ = 'comment_replies'
+    __table_args__ = (
+        Index('ix_comment_replies_comment_created', 'comment_id', 'created_at'),
+    )
     
     content = Column(Text, nullable=False)
     comment_id = Column(UUID(as_uuid=True), ForeignKey('prompt_comments.id', ondelete='CASCADE'), nullable=False)
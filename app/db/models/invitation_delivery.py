@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from ...db.models.base import BaseModel
+
+class InvitationDelivery(BaseModel):
+    """SQLAlchemy model recording the email delivery of one invitation in a bulk invite.
+
+    All invitations created together share a ``batch_id``; ``status`` moves
+    from ``pending`` to ``sent`` or ``failed`` as the send job works through
+    the batch.
+    """
+    __tablename__ = 'invitation_deliveries'
+    __table_args__ = (
+        Index('ix_invitation_deliveries_batch_status', 'batch_id', 'status'),
+    )
+
+    batch_id = Column(UUID(as_uuid=True), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    email = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default='pending', server_default='pending')  # pending | sent | failed
+    personal_message = Column(Text, nullable=True)
+    provider = Column(String(50), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<InvitationDelivery(email='{self.email}', status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
 from ...db.models.base import BaseModel
@@ -6,6 +6,12 @@ from ...db.models.base import BaseModel
 class Project(BaseModel):
     """SQLAlchemy model for projects table."""
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Access scoping: "owned by user" and "belongs to one of the user's teams"
+        Index('ix_projects_created_by', 'created_by'),
+        Index('ix_projects_team_id', 'team_id'),
+        Index('ix_projects_created_at', 'created_at'),
+    )
 
     name = Column(String(100), nullable=False)
     key = Column(String(50), unique=True, nullable=False, index=True) 
@@ -30,7 +36,7 @@ class Project(BaseModel):
 
     @declared_attr
     def prompts(cls):
-        return relationship("Prompt", back_populates="project", cascade="all, delete-orphan")
+        return relationship("Prompt", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Project(name='{self.name}', team_id={self.team_id})>" 
\ No newline at end of file
@@ -1,8 +1,23 @@
+from collections import Counter
+from itertools import chain
 from sqlalchemy import Column, String, Text, ForeignKey, Integer, Boolean, CheckConstraint, DateTime, UniqueConstraint, Index
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, declared_attr, backref, validates
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects.postgresql import UUID, JSONB, insert
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, declared_attr, backref, validates, object_session, Session
 from sqlalchemy.sql import func, text
 from ...db.models.base import BaseModel
+from ...db.models.text_blob import TextBlob, text_hash
+
+TEXT_FIELDS = ("system_prompt", "user_prompt")
+
+def content_fingerprint(name, system_prompt_hash, user_prompt_hash):
+    """Fingerprint of a version's content (name and texts) from its text hashes.
+
+    A missing system prompt counts as an empty one.
+    """
+    parts = (name or "", system_prompt_hash or text_hash(""), user_prompt_hash or text_hash(""))
+    return text_hash("\x1f".join(parts))
 
 class Prompt(BaseModel):
     """SQLAlchemy model for prompts table with versioning support."""
@@ -11,14 +26,26 @@ class Prompt(BaseModel):
     name = Column(String(100), nullable=False)
     key = Column(String(50), nullable=False, index=True)  # Unique within project
     description = Column(String(500), nullable=True)
-    system_prompt = Column(Text, nullable=True)  # System instructions/context
-    user_prompt = Column(Text, nullable=False)   # User-facing prompt
+    # Texts live in content-addressed text_blobs; the plain columns only hold
+    # texts not yet moved there (written before the flush, or legacy rows)
+    _system_prompt = Column("system_prompt", Text, nullable=True)  # System instructions/context
+    _user_prompt = Column("user_prompt", Text, nullable=False)   # User-facing prompt
+    system_prompt_hash = Column(String(64), ForeignKey('text_blobs.hash'), nullable=True, index=True)
+    user_prompt_hash = Column(String(64), ForeignKey('text_blobs.hash'), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     version = Column(Integer, nullable=False, default=1)
     version_notes = Column(Text, nullable=True)  # Changelog for this version
     version_created_at = Column(DateTime(timezone=True), server_default=func.now())
     project_id = Column(UUID(as_uuid=True), ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("prompts.id"), nullable=True)
+    # 'full' rows store their texts; 'delta' rows store text_delta against the parent version
+    storage_format = Column(String(10), nullable=False, default='full', server_default='full')
+    text_delta = Column(JSONB, nullable=True)
+    # content_fingerprint() of name and texts, maintained on flush
+    content_hash = Column(String(64), nullable=True, index=True)
+    # Blobs of the texts; load them with selectinload to read the texts of many rows in one query
+    system_prompt_blob = relationship(TextBlob, foreign_keys=[system_prompt_hash], viewonly=True)
+    user_prompt_blob = relationship(TextBlob, foreign_keys=[user_prompt_hash], viewonly=True)
 
     # Add constraints
     __table_args__ = (
@@ -35,9 +62,93 @@ class Prompt(BaseModel):
             'parent_id',
             postgresql_where=text('is_active = true'),
             unique=True
-        )
+        ),
+        Index('ix_prompts_created_at', 'created_at'),
     )
 
+    @hybrid_property
+    def system_prompt(self):
+        if self.storage_format == 'delta':
+            return self._materialized_texts()[0]
+        return self.stored_text("system_prompt")
+
+    @system_prompt.setter
+    def system_prompt(self, value):
+        self.expand_text()
+        self._system_prompt = value
+        self.system_prompt_hash = None
+
+    @system_prompt.expression
+    def system_prompt(cls):
+        return func.coalesce(cls._blob_content(cls.system_prompt_hash), cls._system_prompt)
+
+    @hybrid_property
+    def user_prompt(self):
+        if self.storage_format == 'delta':
+            return self._materialized_texts()[1]
+        return self.stored_text("user_prompt")
+
+    @user_prompt.setter
+    def user_prompt(self, value):
+        self.expand_text()
+        self._user_prompt = value
+        self.user_prompt_hash = None
+
+    @user_prompt.expression
+    def user_prompt(cls):
+        return func.coalesce(cls._blob_content(cls.user_prompt_hash), cls._user_prompt)
+
+    @classmethod
+    def _blob_content(cls, hash_column):
+        return select(TextBlob.content).where(TextBlob.hash == hash_column).scalar_subquery()
+
+    def stored_text(self, field):
+        """A text of a full version, read from its blob or its plain column."""
+        blob_hash = getattr(self, f"{field}_hash")
+        if blob_hash is None:
+            return getattr(self, f"_{field}")
+        # An eagerly loaded blob, unless the hash changed since it was loaded
+        blob = self.__dict__.get(f"{field}_blob")
+        if blob is not None and blob.hash == blob_hash:
+            return blob.content
+        session = object_session(self)
+        if session is None:
+            raise RuntimeError(f"Prompt {self.id} is detached; its {field} blob cannot be loaded")
+        return session.get(TextBlob, blob_hash).content
+
+    def text_digest(self, field):
+        """Content hash of a text, without loading it when it is stored as a blob."""
+        if self.storage_format != 'delta':
+            blob_hash = getattr(self, f"{field}_hash")
+            if blob_hash is not None:
+                return blob_hash
+        return text_hash(getattr(self, field))
+
+    def fingerprint(self):
+        """Content fingerprint, computed when not stored yet."""
+        if self.content_hash is not None:
+            return self.content_hash
+        return content_fingerprint(self.name, self.text_digest("system_prompt"), self.text_digest("user_prompt"))
+
+    def _materialized_texts(self):
+        from app.services.version_storage import version_texts
+        return version_texts(self)
+
+    def store_texts(self, system_prompt, user_prompt):
+        """Store texts in full; they move to blobs on the next flush."""
+        self._system_prompt = system_prompt
+        self._user_prompt = user_prompt
+        self.system_prompt_hash = None
+        self.user_prompt_hash = None
+        self.storage_format = 'full'
+        self.text_delta = None
+
+    def expand_text(self):
+        """Store this version's texts in full instead of as a delta."""
+        if self.storage_format != 'delta':
+            return
+        self.store_texts(*self._materialized_texts())
+
     @declared_attr
     def project(cls):
         return relationship("Project", back_populates="prompts")
@@ -87,4 +198,62 @@ class Prompt(BaseModel):
 
 
     def __repr__(self):
-        return f"<Prompt(key='{self.key}', name='{self.name}', version={self.version}, project_id={self.project_id})>" 
\ No newline at end of file
+        return f"<Prompt(key='{self.key}', name='{self.name}', version={self.version}, project_id={self.project_id})>"
+
+
+@event.listens_for(Session, "before_flush")
+def store_prompt_texts(session, flush_context, instances):
+    """Move pending prompt texts into text blobs, keep blob reference counts and content fingerprints."""
+    changed = [obj for obj in chain(session.new, session.dirty) if isinstance(obj, Prompt)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Prompt)]
+    if not changed and not deleted:
+        return
+
+    contents = {}
+    for prompt in changed:
+        if prompt.storage_format == 'delta':
+            continue
+        for field in TEXT_FIELDS:
+            content = getattr(prompt, f"_{field}")
+            if getattr(prompt, f"{field}_hash") is None and content is not None:
+                blob_hash = text_hash(content)
+                contents[blob_hash] = content
+                setattr(prompt, f"{field}_hash", blob_hash)
+                setattr(prompt, f"_{field}", "" if field == "user_prompt" else None)
+
+    for prompt in changed:
+        # Delta rows change storage, not content, unless renamed
+        if prompt.storage_format != 'delta' or prompt.content_hash is None \
+                or inspect(prompt).attrs.name.history.has_changes():
+            prompt.content_hash = content_fingerprint(
+                prompt.name, prompt.text_digest("system_prompt"), prompt.text_digest("user_prompt")
+            )
+
+    references = Counter()
+    for prompt in changed:
+        state = inspect(prompt)
+        for field in TEXT_FIELDS:
+            history = state.attrs[f"{field}_hash"].history
+            references.update(value for value in history.added if value)
+            references.subtract(value for value in history.deleted if value)
+    for prompt in deleted:
+        state = inspect(prompt)
+        for field in TEXT_FIELDS:
+            history = state.attrs[f"{field}_hash"].history
+            references.subtract(value for value in (history.deleted or history.unchanged) if value)
+
+    connection = session.connection()
+    if contents:
+        connection.execute(
+            insert(TextBlob.__table__).values([
+                {"hash": blob_hash, "content": content, "size": len(content.encode("utf-8")), "ref_count": 0}
+                for blob_hash, content in contents.items()
+            ]).on_conflict_do_nothing(index_elements=["hash"])
+        )
+    for blob_hash, change in references.items():
+        if change:
+            connection.execute(
+                update(TextBlob.__table__)
+                .where(TextBlob.__table__.c.hash == blob_hash)
+                .values(ref_count=TextBlob.__table__.c.ref_count + change)
+            )
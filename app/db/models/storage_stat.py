@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from ...db.models.base import BaseModel
+
+class StorageStat(BaseModel):
+    """SQLAlchemy model for storage accounting snapshots.
+
+    Each refresh replaces the previous snapshot. ``scope`` is one of
+    ``database``, ``table``, ``project``, ``prompt`` or ``family`` (all
+    versions of a prompt); ``key`` identifies the measured object within
+    its scope (table name or entity id).
+    """
+    __tablename__ = 'storage_stats'
+    __table_args__ = (
+        Index('ix_storage_stats_scope_total', 'scope', 'total_bytes'),
+    )
+
+    scope = Column(String(20), nullable=False)
+    key = Column(String(100), nullable=False)
+    label = Column(String(200), nullable=True)
+    project_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+    text_bytes = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    details = Column(JSONB, nullable=True)
+    refreshed_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<StorageStat(scope='{self.scope}', key='{self.key}', total_bytes={self.total_bytes})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ...db.models.base import BaseModel
@@ -6,13 +6,17 @@ from ...db.models.base import BaseModel
 class Team(BaseModel):
     """SQLAlchemy model for teams table."""
     __tablename__ = 'teams'
+    __table_args__ = (
+        Index('ix_teams_created_by', 'created_by'),
+    )
 
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
 
     # Relationships
-    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan")
-    projects = relationship("Project", back_populates="team", cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE, not loaded and deleted one by one
+    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan", passive_deletes=True)
+    projects = relationship("Project", back_populates="team", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Team(name='{self.name}')>" 
\ No newline at end of file
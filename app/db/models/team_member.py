@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Enum
+from sqlalchemy import Column, String, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
 from ...db.models.base import BaseModel
@@ -16,6 +16,11 @@ class TeamRole(PyEnum):
 class TeamMember(BaseModel):
     """SQLAlchemy model for team_members table."""
     __tablename__ = 'team_members'
+    __table_args__ = (
+        # Resolves a user's teams (and role) without touching the teams table
+        Index('ix_team_members_user_team_role', 'user_id', 'team_id', 'role'),
+        Index('ix_team_members_team_id', 'team_id'),
+    )
 
     team_id = Column(UUID(as_uuid=True), ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -0,0 +1,29 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, String, Text, Integer, DateTime
+from .base import Base
+
+def text_hash(text: Optional[str]) -> Optional[str]:
+    """Content address of a text: hex SHA-256 of its UTF-8 bytes."""
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class TextBlob(Base):
+    """SQLAlchemy model for content-addressed, deduplicated prompt texts.
+
+    Blobs are immutable. ``ref_count`` is maintained on flush as prompts
+    start or stop referencing a blob; ``manage.py db gc-blobs`` recounts it
+    from the actual references and deletes unreferenced blobs.
+    """
+    __tablename__ = 'text_blobs'
+
+    hash = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False, default=0)
+    ref_count = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<TextBlob(hash='{self.hash[:12]}', size={self.size}, ref_count={self.ref_count})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
 from ...db.models.base import BaseModel
@@ -7,6 +7,10 @@ from ...core.security import get_password_hash, verify_password
 class User(BaseModel):
     """SQLAlchemy model for users table."""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Period-over-period signup counts on the admin dashboard
+        Index('ix_users_created_at', 'created_at'),
+    )
 
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
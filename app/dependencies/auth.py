@@ -6,6 +6,7 @@ from fastapi.responses import RedirectResponse
 from functools import wraps
 import uuid
 from app.managers.user_manager import UserManager
+from app.services.authorization import AccessControlIndex, get_access_index
 from typing import Optional
 
 def get_token_from_header(authorization: Optional[str] = Header(None)) -> Optional[str]:
@@ -114,4 +115,15 @@ def require_admin():
                 )
             return await func(request, *args, **kwargs)
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator 
+
+def get_request_access(request: Request) -> AccessControlIndex:
+    """
+    Get the current user's access index, computed at most once per request.
+    Must be used after require_auth() has validated the session.
+    """
+    access = getattr(request.state, "access", None)
+    if access is None:
+        access = get_access_index(uuid.UUID(request.session["user_id"]))
+        request.state.access = access
+    return access
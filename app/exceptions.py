@@ -125,4 +125,7 @@ class TeamUpdateError(Exception):
 
 class TeamMemberError(Exception):
     """Exception raised when team member operations fail"""
-    pass 
\ No newline at end of file
+    pass 
+class InvalidCursorError(Exception):
+    """Exception raised when a pagination cursor cannot be decoded"""
+    pass
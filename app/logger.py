@@ -2,14 +2,30 @@
 Logging configuration for Promptlane.
 
 This module configures logging for the application.
+
+Loggers only put records on an in-memory queue; a ``QueueListener`` thread
+formats them and writes the console and rotating log files, so no log I/O
+happens on the request path. Records are rendered by structlog: as JSON
+lines with ``LOG_JSON`` (the default), otherwise as key=value text. Code can
+log structured events with ``structlog.get_logger(__name__)`` or use the
+standard library loggers from ``get_logger`` as before.
+
+On hot paths, pass log arguments %-style so messages are only formatted when
+a record is emitted, wrap costly arguments in ``lazy`` and guard loops that
+exist only for logging with ``logger.isEnabledFor``.
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
 import os
-from pathlib import Path
-from fastapi import Request
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, List, Optional
+
+import structlog
+
 from app.config import settings, get_logs_path
 
 # Base logging level
@@ -18,90 +34,182 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", settings.LOGGING.LEVEL).upper()
 # Get logs directory
 LOGS_DIR = get_logs_path()
 
+# Processors adding the fields every record gets, for structlog and standard library records alike
+SHARED_PROCESSORS = [
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    structlog.processors.TimeStamper(fmt="iso", utc=True),
+]
+
+_listener: Optional[QueueListener] = None
+
+
+class lazy:
+    """
+    A log argument computed only if the record is emitted::
+
+        logger.debug("Versions: %s", lazy(lambda: [v.version for v in versions]))
+    """
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+    def __repr__(self) -> str:
+        return repr(self.func())
+
+
+class LoggerFilter(logging.Filter):
+    """Pass records of any of the named loggers and their children"""
+
+    def __init__(self, *names: str):
+        super().__init__()
+        self.filters = [logging.Filter(name) for name in names]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return any(f.filter(record) for f in self.filters)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Queue handler for a listener in the same process.
+
+    Records keep their structlog event dicts and exception info for the
+    formatters on the listener thread; only the message text is fixed now, so
+    later changes to its arguments don't show up. When the queue is full,
+    records are dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args and not isinstance(record.msg, dict):
+            record = copy.copy(record)
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def make_formatter(json: Optional[bool] = None) -> logging.Formatter:
+    """A formatter rendering structlog events and standard library records alike"""
+    json = settings.LOGGING.JSON if json is None else json
+    renderer = structlog.processors.JSONRenderer() if json else structlog.dev.ConsoleRenderer(colors=False)
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=SHARED_PROCESSORS,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+    )
+
+
+def configure_structlog() -> None:
+    """Route structlog loggers through the standard library handlers"""
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            *SHARED_PROCESSORS,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def start_queue_listener(handlers: List[logging.Handler], size: int = 0) -> QueueListener:
+    """Start a listener thread writing to `handlers`; log through the returned listener's ``queue_handler``"""
+    queue_handler = LogQueueHandler(queue.Queue(size))
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.queue_handler = queue_handler
+    listener.start()
+    return listener
+
+
 # Configure root logger
 def configure_logging():
     """Configure the application's logging system"""
-    
-    # Create formatters
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-    )
-    
+    global _listener
+    root_logger = logging.getLogger()
+    if _listener is not None:
+        return root_logger
+
+    formatter = make_formatter()
+
     # Create handlers
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
-    
+
     # Create file handlers for different log types
     general_file_handler = RotatingFileHandler(
         str(LOGS_DIR / "app.log"),
         maxBytes=settings.LOGGING.MAX_BYTES,
         backupCount=settings.LOGGING.BACKUP_COUNT
     )
-    general_file_handler.setFormatter(file_formatter)
-    
+
     invitation_file_handler = RotatingFileHandler(
         str(LOGS_DIR / "invitations.log"),
         maxBytes=settings.LOGGING.MAX_BYTES,
         backupCount=settings.LOGGING.BACKUP_COUNT
     )
-    invitation_file_handler.setFormatter(file_formatter)
-    
+    invitation_file_handler.addFilter(LoggerFilter("app.routers.admin", "app.db.crud"))
+
     email_file_handler = RotatingFileHandler(
         str(LOGS_DIR / "emails.log"),
         maxBytes=settings.LOGGING.MAX_BYTES,
         backupCount=settings.LOGGING.BACKUP_COUNT
     )
-    email_file_handler.setFormatter(file_formatter)
-    
+    email_file_handler.addFilter(LoggerFilter("app.services.email", "app.services.template"))
+
+    handlers = [console_handler, general_file_handler, invitation_file_handler, email_file_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # All handlers run on the listener thread
+    _listener = start_queue_listener(handlers, settings.LOGGING.QUEUE_SIZE)
+    atexit.register(stop_logging)
+
     # Configure root logger
-    root_logger = logging.getLogger()
     root_logger.setLevel(LOG_LEVEL)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(general_file_handler)
-    
+    root_logger.addHandler(_listener.queue_handler)
+
     # Configure specific loggers
-    invitation_logger = logging.getLogger("app.routers.admin")
-    invitation_logger.setLevel(logging.DEBUG)
-    invitation_logger.addHandler(invitation_file_handler)
-    
-    invitation_crud_logger = logging.getLogger("app.db.crud")
-    invitation_crud_logger.setLevel(logging.DEBUG)
-    invitation_crud_logger.addHandler(invitation_file_handler)
-    
-    email_logger = logging.getLogger("app.services.email")
-    email_logger.setLevel(logging.DEBUG)
-    email_logger.addHandler(email_file_handler)
-    
-    template_logger = logging.getLogger("app.services.template")
-    template_logger.setLevel(logging.DEBUG)
-    template_logger.addHandler(email_file_handler)
-    
+    for name in ("app.routers.admin", "app.db.crud", "app.services.email", "app.services.template"):
+        logging.getLogger(name).setLevel(logging.DEBUG)
+
     # Additional loggers
     request_logger = logging.getLogger("app.request")
     request_logger.setLevel(logging.INFO)
-    request_logger.addHandler(general_file_handler)
-    
+
+    configure_structlog()
     return root_logger
 
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_listener.queue_handler)
+    if _listener.queue_handler.dropped:
+        sys.stderr.write(f"{_listener.queue_handler.dropped} log records dropped, log queue was full\n")
+    _listener = None
+
+
 # Create a logger for the current module
 def get_logger(name):
     """Get a logger for the specified name"""
     return logging.getLogger(name)
-
-# Log request information
-def log_request_info(request: Request, response=None, error=None):
-    """Log information about a request"""
-    logger = get_logger("app.request")
-    
-    if error:
-        logger.error(f"Exception during request processing: {str(error)}")
-        return
-    
-    if response:
-        status_code = getattr(response, "status_code", "unknown")
-        logger.info(f"Request processed successfully")
-    else:
-        logger.info(f"Request received: {request.method} {request.url.path}") 
\ No newline at end of file
@@ -8,7 +8,7 @@ from typing import List, Dict, Type
 # Third-party imports
 from fastapi import FastAPI, APIRouter, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from app.templates import templates
+from app.templates import templates, warm_templates
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -19,6 +19,10 @@ from app.config import settings
 from app.logger import get_logger, configure_logging
 from app.middleware import LoggingMiddleware, AuthRedirectMiddleware, SettingsContextMiddleware
 from app.error_handlers import not_found_error, server_error
+from app.services.events import event_broker
+from app.services.storage_stats import storage_stats_refresher
+from app.services.jobs import job_worker
+from app.services.template import precompile_templates
 
 # Configure logging
 configure_logging()
@@ -36,6 +40,7 @@ ROUTER_REGISTRY: Dict[str, Type[APIRouter]] = {
     "teams": "app.routers.teams.router",
     "activities": "app.routers.activities.router",
     "admin": "app.routers.admin.router",
+    "jobs": "app.routers.jobs.router",
     "common": "app.routers.common.router"
 }
 
@@ -79,6 +84,17 @@ def create_app() -> FastAPI:
     app.add_middleware(AuthRedirectMiddleware)
     app.add_middleware(SettingsContextMiddleware)
 
+    # Live update events (starts the LISTEN thread for the postgres backend)
+    app.add_event_handler("startup", event_broker.start)
+    app.add_event_handler("shutdown", event_broker.stop)
+    app.add_event_handler("startup", storage_stats_refresher.start)
+    app.add_event_handler("shutdown", storage_stats_refresher.stop)
+    app.add_event_handler("startup", job_worker.start_in_process)
+    app.add_event_handler("shutdown", job_worker.stop)
+    if settings.TEMPLATES.PRECOMPILE:
+        app.add_event_handler("startup", precompile_templates)
+        app.add_event_handler("startup", warm_templates)
+
     # Mount static files
     app.mount("/static", StaticFiles(directory="app/static"), name="static")
     
@@ -1,32 +1,110 @@
 import uuid
+import json
+import base64
 import logging
-from typing import List, Dict, Any, Tuple, Optional, Union
+from typing import List, Dict, Any, Tuple, Optional, Union, Callable
 from datetime import datetime
 
 from app.db.database import db
-from app.db.models import Comment, Reply, Prompt, User
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from app.db.models import Comment, Reply, Prompt
+from app.exceptions import InvalidCursorError
+from app.managers.user_manager import UsernameResolver
+from app.services.events import event_broker, prompt_channel, project_channel
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, func, tuple_
 
 logger = logging.getLogger(__name__)
 
+
+def _encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor."""
+    payload = [
+        value.isoformat() if isinstance(value, datetime)
+        else str(value) if isinstance(value, uuid.UUID)
+        else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str, *converters: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """Decode a cursor produced by `_encode_cursor`, converting each value."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if len(values) != len(converters):
+            raise ValueError("unexpected cursor length")
+        return tuple(convert(value) for convert, value in zip(converters, values))
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
 class CommentManager:
-    """Manager class for handling comment operations."""
+    """Manager class for handling comment operations.
+
+    Comment lists use keyset pagination. Top-level comments are ordered
+    pinned first, then newest first, which matches the
+    (prompt_id, is_pinned, created_at) index; replies are ordered oldest
+    first on (comment_id, created_at). Cursors are opaque strings and an
+    `InvalidCursorError` is raised for anything that does not decode.
+    """
     
     def __init__(self, db_session=None):
         self._db = db_session or db.get_session()
+
+    @staticmethod
+    def comment_cursor(comment: Comment) -> str:
+        """Cursor positioned after `comment` in thread order."""
+        return _encode_cursor(bool(comment.is_pinned), comment.created_at, comment.id)
+
+    @staticmethod
+    def since_cursor(item: Union[Comment, Reply]) -> str:
+        """Cursor positioned after `item` in creation order."""
+        return _encode_cursor(item.created_at, item.id)
     
-    def get_prompt_comments(self, prompt_id: uuid.UUID) -> List[Comment]:
-        """Get all comments for a specific prompt."""
+    def get_prompt_comments(self, prompt_id: uuid.UUID, cursor: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[Comment]:
+        """Get comments for a specific prompt, pinned first, continuing after `cursor`."""
+        position = _decode_cursor(cursor, bool, datetime.fromisoformat, uuid.UUID) if cursor else None
         try:
-            comments = self._db.query(Comment)\
-                .filter(Comment.prompt_id == prompt_id)\
-                .order_by(desc(Comment.is_pinned), desc(Comment.created_at))\
-                .all()
-            return comments
+            query = self._db.query(Comment).filter(Comment.prompt_id == prompt_id)
+            if position:
+                query = query.filter(
+                    tuple_(Comment.is_pinned, Comment.created_at, Comment.id) < tuple_(*position)
+                )
+            query = query.order_by(desc(Comment.is_pinned), desc(Comment.created_at), desc(Comment.id))
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
         except Exception as e:
             logger.error(f"Error fetching comments for prompt {prompt_id}: {str(e)}")
             return []
+
+    def get_comments_since(self, prompt_id: uuid.UUID, since: Optional[str],
+                           limit: Optional[int] = None) -> List[Comment]:
+        """Get comments created after the `since` cursor (or all of them), oldest first."""
+        position = _decode_cursor(since, datetime.fromisoformat, uuid.UUID) if since else None
+        try:
+            query = self._db.query(Comment).filter(Comment.prompt_id == prompt_id)
+            if position:
+                query = query.filter(tuple_(Comment.created_at, Comment.id) > tuple_(*position))
+            query = query.order_by(Comment.created_at, Comment.id)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
+        except Exception as e:
+            logger.error(f"Error fetching new comments for prompt {prompt_id}: {str(e)}")
+            return []
+
+    def get_latest_comment(self, prompt_id: uuid.UUID) -> Optional[Comment]:
+        """Get the most recently created comment of a prompt."""
+        try:
+            return self._db.query(Comment)\
+                .filter(Comment.prompt_id == prompt_id)\
+                .order_by(desc(Comment.created_at), desc(Comment.id))\
+                .first()
+        except Exception as e:
+            logger.error(f"Error fetching latest comment for prompt {prompt_id}: {str(e)}")
+            return None
     
     def get_comment(self, comment_id: uuid.UUID) -> Optional[Comment]:
         """Get a specific comment by ID."""
@@ -37,17 +115,129 @@ class CommentManager:
             logger.error(f"Error fetching comment {comment_id}: {str(e)}")
             return None
     
-    def get_comment_replies(self, comment_id: uuid.UUID) -> List[Reply]:
-        """Get all replies for a specific comment."""
+    def get_comment_replies(self, comment_id: uuid.UUID, cursor: Optional[str] = None,
+                            limit: Optional[int] = None) -> List[Reply]:
+        """Get replies for a specific comment, oldest first, continuing after `cursor`."""
+        position = _decode_cursor(cursor, datetime.fromisoformat, uuid.UUID) if cursor else None
         try:
-            replies = self._db.query(Reply)\
-                .filter(Reply.comment_id == comment_id)\
-                .order_by(Reply.created_at)\
-                .all()
-            return replies
+            query = self._db.query(Reply).filter(Reply.comment_id == comment_id)
+            if position:
+                query = query.filter(tuple_(Reply.created_at, Reply.id) > tuple_(*position))
+            query = query.order_by(Reply.created_at, Reply.id)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
         except Exception as e:
             logger.error(f"Error fetching replies for comment {comment_id}: {str(e)}")
             return []
+
+    def get_reply_counts(self, comment_ids: List[uuid.UUID]) -> Dict[uuid.UUID, int]:
+        """Get reply counts for several comments with a single grouped query."""
+        if not comment_ids:
+            return {}
+        rows = self._db.query(Reply.comment_id, func.count(Reply.id))\
+            .filter(Reply.comment_id.in_(comment_ids))\
+            .group_by(Reply.comment_id)\
+            .all()
+        return {comment_id: count for comment_id, count in rows}
+
+    def get_reply_previews(self, comment_ids: List[uuid.UUID],
+                           limit: int) -> Dict[uuid.UUID, List[Reply]]:
+        """Get the first `limit` replies of each comment in one query.
+
+        Replies are ranked per comment with ROW_NUMBER() so the cap is applied
+        by the database rather than by loading every reply.
+        """
+        if not comment_ids or limit <= 0:
+            return {}
+        ranked = self._db.query(
+            Reply,
+            func.row_number().over(
+                partition_by=Reply.comment_id,
+                order_by=(Reply.created_at, Reply.id)
+            ).label("position")
+        ).filter(Reply.comment_id.in_(comment_ids)).subquery()
+        ranked_reply = aliased(Reply, ranked)
+
+        previews: Dict[uuid.UUID, List[Reply]] = {}
+        replies = self._db.query(ranked_reply)\
+            .filter(ranked.c.position <= limit)\
+            .order_by(ranked.c.comment_id, ranked.c.position)\
+            .all()
+        for reply in replies:
+            previews.setdefault(reply.comment_id, []).append(reply)
+        return previews
+
+    def format_thread(self, comments: List[Comment], reply_preview: int = 3) -> List[Dict[str, Any]]:
+        """Format comments with reply counts, reply previews and authors.
+
+        Uses a fixed number of queries regardless of how many comments are
+        passed: grouped reply counts, the capped reply previews and one lookup
+        for every author involved.
+        """
+        comment_ids = [comment.id for comment in comments]
+        reply_counts = self.get_reply_counts(comment_ids)
+        previews = self.get_reply_previews(comment_ids, reply_preview)
+
+        usernames = self.get_username_resolver().add_from(comments, fields=("created_by",))
+        for replies in previews.values():
+            usernames.add_from(replies, fields=("created_by",))
+        usernames.resolve()
+
+        items = []
+        for comment in comments:
+            replies = previews.get(comment.id, [])
+            replies_count = reply_counts.get(comment.id, 0)
+            data = self.format_comment_data(comment, usernames=usernames, replies_count=replies_count)
+            data["replies"] = [self.format_reply_data(reply, usernames=usernames) for reply in replies]
+            data["replies_cursor"] = (
+                self.since_cursor(replies[-1]) if replies and replies_count > len(replies) else None
+            )
+            items.append(data)
+        return items
+
+    def get_prompt_thread(self, prompt_id: uuid.UUID, cursor: Optional[str] = None,
+                          limit: int = 20, reply_preview: int = 3) -> Dict[str, Any]:
+        """Load one window of a prompt's comment thread.
+
+        `next_cursor` continues the thread and is None on the last window. The
+        first window (no cursor) also returns the total count and a `since`
+        cursor for polling new comments with `get_new_comments`.
+        """
+        limit = max(limit, 1)
+        comments = self.get_prompt_comments(prompt_id, cursor=cursor, limit=limit + 1)
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+
+        thread = {
+            "comments": self.format_thread(comments, reply_preview),
+            "next_cursor": self.comment_cursor(comments[-1]) if has_more else None
+        }
+        if cursor is None:
+            latest = self.get_latest_comment(prompt_id)
+            thread["total"] = self._db.query(func.count(Comment.id))\
+                .filter(Comment.prompt_id == prompt_id).scalar()
+            thread["since"] = self.since_cursor(latest) if latest else None
+        return thread
+
+    def get_new_comments(self, prompt_id: uuid.UUID, since: Optional[str],
+                         limit: int = 50) -> Dict[str, Any]:
+        """Get comments created after `since` for incremental polling.
+
+        Returns the new comments oldest first and the cursor to poll with
+        next; `has_more` means the caller should poll again straight away.
+        Without a `since` cursor (a prompt that had no comments yet) polling
+        starts from the first comment.
+        """
+        limit = max(limit, 1)
+        comments = self.get_comments_since(prompt_id, since, limit=limit + 1)
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+        return {
+            "comments": self.format_thread(comments, reply_preview=0),
+            "since": self.since_cursor(comments[-1]) if comments else since,
+            "has_more": has_more
+        }
     
     def create_comment(self, prompt_id: uuid.UUID, content: str, 
                       created_by: uuid.UUID) -> Tuple[Optional[Comment], Optional[str]]:
@@ -69,6 +259,11 @@ class CommentManager:
             self._db.add(comment)
             self._db.commit()
             
+            self._publish(prompt_id, "comment.created", {
+                "comment_id": str(comment.id),
+                "created_by": str(created_by)
+            }, project_id=prompt.project_id)
+            
             return comment, None
         except Exception as e:
             self._db.rollback()
@@ -95,6 +290,12 @@ class CommentManager:
             self._db.add(reply)
             self._db.commit()
             
+            self._publish(comment.prompt_id, "reply.created", {
+                "comment_id": str(comment_id),
+                "reply_id": str(reply.id),
+                "created_by": str(created_by)
+            })
+            
             return reply, None
         except Exception as e:
             self._db.rollback()
@@ -120,6 +321,8 @@ class CommentManager:
             
             self._db.commit()
             
+            self._publish(comment.prompt_id, "comment.updated", {"comment_id": str(comment_id)})
+            
             return comment, None
         except Exception as e:
             self._db.rollback()
@@ -145,6 +348,11 @@ class CommentManager:
             
             self._db.commit()
             
+            self._publish(reply.comment.prompt_id, "reply.updated", {
+                "comment_id": str(reply.comment_id),
+                "reply_id": str(reply_id)
+            })
+            
             return reply, None
         except Exception as e:
             self._db.rollback()
@@ -163,9 +371,12 @@ class CommentManager:
                 return False, "You can only delete your own comments"
             
             # Delete will cascade to replies
+            prompt_id = comment.prompt_id
             self._db.delete(comment)
             self._db.commit()
             
+            self._publish(prompt_id, "comment.deleted", {"comment_id": str(comment_id)})
+            
             return True, None
         except Exception as e:
             self._db.rollback()
@@ -183,9 +394,16 @@ class CommentManager:
             if reply.created_by != user_id:
                 return False, "You can only delete your own replies"
             
+            prompt_id = reply.comment.prompt_id
+            comment_id = reply.comment_id
             self._db.delete(reply)
             self._db.commit()
             
+            self._publish(prompt_id, "reply.deleted", {
+                "comment_id": str(comment_id),
+                "reply_id": str(reply_id)
+            })
+            
             return True, None
         except Exception as e:
             self._db.rollback()
@@ -202,37 +420,68 @@ class CommentManager:
             comment.is_pinned = pin
             self._db.commit()
             
+            self._publish(comment.prompt_id, "comment.pinned" if pin else "comment.unpinned", {
+                "comment_id": str(comment_id)
+            })
+            
             return comment, None
         except Exception as e:
             self._db.rollback()
             logger.error(f"Error {'pinning' if pin else 'unpinning'} comment: {str(e)}")
             return None, f"Failed to {'pin' if pin else 'unpin'} comment: {str(e)}"
     
-    def format_comment_data(self, comment: Comment) -> Dict[str, Any]:
-        """Format a comment object for API response."""
-        user = self._db.query(User).filter(User.id == comment.created_by).first()
+    def _publish(self, prompt_id: uuid.UUID, event_type: str, data: Dict[str, Any],
+                 project_id: Optional[uuid.UUID] = None):
+        """Broadcast a comment event to the prompt's and its project's channels."""
+        try:
+            if project_id is None:
+                project_id = self._db.query(Prompt.project_id).filter(Prompt.id == prompt_id).scalar()
+            channels = [prompt_channel(prompt_id)]
+            if project_id:
+                channels.append(project_channel(project_id))
+            event_broker.publish(channels, event_type, dict(data, prompt_id=str(prompt_id)))
+        except Exception as e:
+            logger.error(f"Error publishing {event_type} event: {str(e)}")
+    
+    def get_username_resolver(self) -> UsernameResolver:
+        """Get a username resolver bound to this manager's session."""
+        return UsernameResolver(self._db)
+
+    def format_comment_data(self, comment: Comment,
+                            usernames: Optional[UsernameResolver] = None,
+                            replies_count: Optional[int] = None) -> Dict[str, Any]:
+        """Format a comment object for API response.
+
+        Pass a shared `usernames` resolver (pre-filled with `add_from`) and a
+        precomputed `replies_count` when formatting many comments so neither
+        triggers a query per comment.
+        """
+        usernames = usernames or self.get_username_resolver()
+        if replies_count is None:
+            replies_count = self.get_reply_counts([comment.id]).get(comment.id, 0)
         return {
             "id": str(comment.id),
             "content": comment.content,
             "created_at": comment.created_at.isoformat(),
             "updated_at": comment.updated_at.isoformat(),
-            "created_by": user.username if user else "Unknown",
+            "created_by": usernames.get(comment.created_by),
             "created_by_id": str(comment.created_by),
             "is_edited": comment.is_edited,
             "is_pinned": comment.is_pinned,
             "user_color": self._generate_user_color(str(comment.created_by)),
-            "replies_count": len(comment.replies)
+            "replies_count": replies_count
         }
     
-    def format_reply_data(self, reply: Reply) -> Dict[str, Any]:
+    def format_reply_data(self, reply: Reply,
+                          usernames: Optional[UsernameResolver] = None) -> Dict[str, Any]:
         """Format a reply object for API response."""
-        user = self._db.query(User).filter(User.id == reply.created_by).first()
+        usernames = usernames or self.get_username_resolver()
         return {
             "id": str(reply.id),
             "content": reply.content,
             "created_at": reply.created_at.isoformat(),
             "updated_at": reply.updated_at.isoformat(),
-            "created_by": user.username if user else "Unknown",
+            "created_by": usernames.get(reply.created_by),
             "created_by_id": str(reply.created_by),
             "is_edited": reply.is_edited,
             "user_color": self._generate_user_color(str(reply.created_by))
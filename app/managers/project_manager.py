@@ -9,6 +9,9 @@ from datetime import datetime
 from app.models.team import TeamRole
 from app.db.database import db
 from app.managers.base_manager import BaseManager
+from app.services.authorization import accessible_projects_filter, get_access_index
+from app.services.deletion import DELETE_PROJECT, schedule_or_delete
+from app.exceptions import ProjectNotFoundError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -108,31 +111,48 @@ class ProjectManager(BaseManager):
             logger.error(f"Error updating project: {str(e)}")
             return None, str(e)
 
-    def delete_project(self, project_id: uuid.UUID) -> bool:
-        """Delete a project"""
+    def delete_project(self, project_id: uuid.UUID, deleted_by: Optional[uuid.UUID] = None) -> bool:
+        """Delete a project, or start deleting it in the background if it is large"""
         try:
-            project = self.get_project(project_id)
-            if not project:
-                return False
-
-            success = self.delete(project_id)
-            if not success:
-                return False
-
-            # Log activity
-            self._log_activity(project.created_by, models.ActivityType.DELETE_PROJECT, {
-                "project_id": project_id,
-                "name": project.name
-            })
-
+            self.request_project_deletion(project_id, deleted_by)
             return True
+        except ProjectNotFoundError:
+            return False
         except Exception as e:
+            self._db.rollback()
             logger.error(f"Error deleting project: {str(e)}")
             return False
 
+    def request_project_deletion(
+        self,
+        project_id: uuid.UUID,
+        deleted_by: Optional[uuid.UUID] = None
+    ) -> Optional[models.BackgroundJob]:
+        """
+        Delete a project without loading its prompts and comments.
+
+        Returns the background job deleting it when it is too large to delete
+        inline, None when it is already deleted.
+        """
+        project = self.get_project(project_id)
+        if not project:
+            raise ProjectNotFoundError(f"Project {project_id} not found")
+        # The instance is stale once the rows are gone
+        project_id, name, created_by = project.id, project.name, project.created_by
+
+        job = schedule_or_delete(self._db, DELETE_PROJECT, project_id, deleted_by)
+
+        # Log activity
+        self._log_activity(deleted_by or created_by, models.ActivityType.DELETE_PROJECT, {
+            "project_id": str(project_id),
+            "name": name,
+            "job_id": str(job.id) if job else None
+        })
+        return job
+
     def get_user_projects(self, user_id: uuid.UUID) -> List[models.Project]:
-        """Get all projects for a user"""
-        return self.get_multi_by_field('created_by', user_id)
+        """Get all projects a user can access, owned or through a team"""
+        return self.get_query().filter(accessible_projects_filter(user_id)).all()
 
     def check_project_permissions(
         self,
@@ -143,18 +163,17 @@ class ProjectManager(BaseManager):
         try:
             project = self.get_project(project_id)
             if not project:
-                return {"has_access": False, "is_owner": False}
-
-            # Check if user is the project owner
-            is_owner = project.created_by == user_id
+                return {"has_access": False, "is_owner": False, "can_edit": False}
 
+            access = get_access_index(user_id, self._db)
             return {
-                "has_access": is_owner,  # For now, only owners have access
-                "is_owner": is_owner
+                "has_access": access.can_view_project(project),
+                "is_owner": project.created_by == user_id,
+                "can_edit": access.can_edit_project(project)
             }
         except Exception as e:
             logger.error(f"Error checking project permissions: {str(e)}")
-            return {"has_access": False, "is_owner": False}
+            return {"has_access": False, "is_owner": False, "can_edit": False}
 
     def _log_activity(self, user_id: uuid.UUID, activity_type: models.ActivityType, details: Dict[str, Any]):
         """Log project activity"""
@@ -10,8 +10,13 @@ from app.exceptions import PromptCreationError, PromptNotFoundError, PromptUpdat
 from app.db.database import get_db
 from app.managers.base_manager import BaseManager
 import logging
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, aliased, defer
 from app.managers.project_manager import ProjectManager
+from app.services.events import event_broker, prompt_channel, project_channel
+from app.services.authorization import accessible_projects_filter, get_access_index
+from app.services.version_storage import version_store
+from app.services.text_blobs import text_loading
 
 logger = logging.getLogger(__name__)
 
@@ -24,82 +29,60 @@ class PromptManager(BaseManager):
     def get_prompt(self, prompt_id: uuid.UUID) -> Optional[models.Prompt]:
         """Get a prompt by ID with its versions"""
         try:
-            logger.info(f"Getting prompt with ID: {prompt_id}")
-            
-            # First, get the prompt by ID
             prompt = self._db.query(self.model_class)\
                 .filter(self.model_class.id == prompt_id)\
                 .first()
-                
+
             if not prompt:
-                logger.warning(f"Prompt not found: {prompt_id}")
+                logger.warning("Prompt not found: %s", prompt_id)
                 return None
-                
-            logger.debug(f"Found prompt: id={prompt.id}, name={prompt.name}, " + 
-                       f"parent_id={prompt.parent_id}, version={getattr(prompt, 'version', 'N/A')}")
-            
-            # Find the original root parent by traversing up
-            current = prompt
-            root_parent = current
-            
-            # Traverse up the parent chain to find the root (v1)
-            while current.parent_id is not None:
-                logger.debug(f"Traversing up from version {current.version} to parent")
-                parent = self._db.query(self.model_class)\
-                    .filter(self.model_class.id == current.parent_id)\
-                    .first()
-                
-                if not parent:
-                    logger.warning(f"Parent not found for prompt {current.id}")
-                    break
-                
-                root_parent = parent
-                current = parent
-                logger.debug(f"Found parent: id={parent.id}, version={parent.version}")
-            
-            logger.info(f"Found root parent: id={root_parent.id}, version={root_parent.version}")
-            
-            # Get ALL descendants at all levels using recursive CTE (Common Table Expression)
-            # This is the most efficient way to get the entire hierarchy
-            versions = []
-            version_ids = set()
-            
-            # First add the root parent (version 1)
-            versions.append(root_parent)
-            version_ids.add(root_parent.id)
-            
-            # Function to recursively collect all descendants
-            def collect_descendants(parent_id, indent=1):
-                children = self._db.query(self.model_class)\
-                    .filter(self.model_class.parent_id == parent_id)\
-                    .all()
-                
-                for child in children:
-                    if child.id not in version_ids:
-                        versions.append(child)
-                        version_ids.add(child.id)
-                        logger.debug(f"{'  ' * indent}Added child: id={child.id}, version={child.version}")
-                        # Recursively get this child's children
-                        collect_descendants(child.id, indent + 1)
-            
-            # Start collecting from the root
-            logger.debug(f"Starting to collect all descendants from root parent: {root_parent.id}")
-            collect_descendants(root_parent.id)
-            
-            # Log the full version list
-            version_info = [{"id": str(v.id), "version": v.version} for v in versions]
-            logger.info(f"Complete versions list: {version_info}")
-            
-            # Attach the versions list to the prompt
-            prompt.versions = versions
-            
-            logger.info(f"Returning prompt with {len(versions)} total versions")
+
+            # The whole family (root and all descendants) in two recursive queries
+            versions = self.get_family_versions(prompt.id, with_text=True)
+            prompt.versions = versions or [prompt]
+
+            logger.debug("Returning prompt %s with %d total versions", prompt.id, len(prompt.versions))
             return prompt
-                
+
         except Exception as e:
-            logger.error(f"Error getting prompt with versions: {str(e)}")
+            logger.error("Error getting prompt with versions: %s", e)
             return None
 
+    def get_family_root_id(self, prompt_id: uuid.UUID) -> Optional[uuid.UUID]:
+        """Get the id of the first version of a prompt's family"""
+        Prompt = self.model_class
+        ancestors = select(Prompt.id, Prompt.parent_id)\
+            .where(Prompt.id == prompt_id)\
+            .cte("ancestors", recursive=True)
+        parent = aliased(Prompt)
+        ancestors = ancestors.union_all(
+            select(parent.id, parent.parent_id).join(ancestors, parent.id == ancestors.c.parent_id)
+        )
+        return self._db.query(ancestors.c.id).filter(ancestors.c.parent_id.is_(None)).scalar()
+
+    def get_family_versions(self, prompt_id: uuid.UUID, with_text: bool = False) -> List[models.Prompt]:
+        """
+        Get every version in a prompt's family, ordered by version number.
+
+        Unless `with_text` is set the prompt texts are deferred, so listing
+        versions does not transfer them; they load on first access.
+        """
+        Prompt = self.model_class
+        root_id = self.get_family_root_id(prompt_id)
+        if root_id is None:
+            return []
+
+        family = select(Prompt.id).where(Prompt.id == root_id).cte("family", recursive=True)
+        child = aliased(Prompt)
+        family = family.union_all(select(child.id).join(family, child.parent_id == family.c.id))
+
+        query = self._db.query(Prompt).filter(Prompt.id.in_(select(family.c.id)))
+        if with_text:
+            query = query.options(*text_loading())
+        else:
+            query = query.options(defer(Prompt._system_prompt), defer(Prompt._user_prompt))
+        return query.order_by(Prompt.version, Prompt.created_at).all()
+
     def get_prompt_by_key(self, key: str) -> Optional[models.Prompt]:
         """Get a prompt by key"""
         return self.get_by_field('key', key)
@@ -148,6 +131,7 @@ class PromptManager(BaseManager):
                 "name": name,
                 "key": key
             })
+            self._publish(project_id, [prompt.id], "prompt.created", {"name": name, "key": key})
 
             return prompt, ""
         except Exception as e:
@@ -168,24 +152,38 @@ class PromptManager(BaseManager):
     ) -> Tuple[Optional[models.Prompt], str]:
         """Update a prompt or create a new version"""
         try:
-            logger.info(f"Updating prompt {prompt_id} (create_new_version={create_new_version})")
-            logger.debug(f"Update params - name: {name}, system_prompt: {system_prompt and len(system_prompt)}, " +
-                        f"user_prompt: {user_prompt and len(user_prompt)}, updated_by: {updated_by}")
+            debug = logger.isEnabledFor(logging.DEBUG)
+            logger.info("Updating prompt %s (create_new_version=%s)", prompt_id, create_new_version)
+            if debug:
+                logger.debug("Update params - name: %s, system_prompt: %s, user_prompt: %s, updated_by: %s",
+                             name, system_prompt and len(system_prompt), user_prompt and len(user_prompt), updated_by)
             
             prompt = self.get_prompt(prompt_id)
             if not prompt:
-                logger.error(f"Prompt {prompt_id} not found")
+                logger.error("Prompt %s not found", prompt_id)
                 return None, "Prompt not found"
                 
-            logger.debug(f"Found prompt: id={prompt.id}, name={prompt.name}, " +
-                         f"has version attr: {hasattr(prompt, 'version')}, " +
-                         f"has is_active attr: {hasattr(prompt, 'is_active')}")
+            if debug:
+                logger.debug("Found prompt: id=%s, name=%s, has version attr: %s, has is_active attr: %s",
+                             prompt.id, prompt.name, hasattr(prompt, 'version'), hasattr(prompt, 'is_active'))
 
             if create_new_version:
-                logger.info(f"Creating new version of prompt {prompt_id}")
+                logger.info("Creating new version of prompt %s", prompt_id)
+                # Resubmitting the active version's content is a no-op
+                active_version = next((v for v in prompt.versions if v.is_active), None)
+                if active_version is not None:
+                    fingerprint = models.content_fingerprint(
+                        name or prompt.name,
+                        models.text_hash(system_prompt) if system_prompt else prompt.text_digest('system_prompt'),
+                        models.text_hash(user_prompt) if user_prompt else prompt.text_digest('user_prompt')
+                    )
+                    if fingerprint == active_version.fingerprint():
+                        logger.info("Content matches active version %s; no new version created", active_version.id)
+                        return active_version, ""
+
                 # Create a new version of the prompt
                 current_version = prompt.version if hasattr(prompt, "version") else 1
-                logger.debug(f"Current version: {current_version}, new version will be: {current_version + 1}")
+                logger.debug("Current version: %s, new version will be: %s", current_version, current_version + 1)
                 
                 # Get the root parent's key
                 root_parent = prompt
@@ -207,22 +205,26 @@ class PromptManager(BaseManager):
                     'created_by': updated_by or prompt.created_by,
                     'created_at': datetime.utcnow()
                 }
-                logger.debug(f"Creating new prompt with data: {new_prompt_data}")
+                logger.debug("Creating new prompt with data: %s", new_prompt_data)
                 
                 try:
                     new_prompt = self.create(new_prompt_data)
-                    logger.debug(f"New prompt created: {new_prompt and new_prompt.id}")
+                    logger.debug("New prompt created: %s", new_prompt and new_prompt.id)
                     
                     if not new_prompt:
                         logger.error("Failed to create new prompt version")
                         return None, "Failed to create new prompt version"
                     
                     # Deactivate all versions in the chain
-                    logger.debug(f"Deactivating all versions in the chain for prompt {prompt_id}")
+                    logger.debug("Deactivating all versions in the chain for prompt %s", prompt_id)
                     prompt.deactivate_all_versions(self._db)
+
+                    # The branched-from version is now inactive and may be stored as a delta
+                    if version_store.compact(self._db, prompt):
+                        self._db.commit()
                     
                     # Log activity
-                    logger.debug(f"Logging activity for new prompt version: {new_prompt.id}")
+                    logger.debug("Logging activity for new prompt version: %s", new_prompt.id)
                     self._log_activity(updated_by or prompt.created_by, models.ActivityType.CREATE_PROMPT_VERSION, {
                         "prompt_id": str(new_prompt.id),
                         "original_prompt_id": str(prompt_id),
@@ -230,14 +232,18 @@ class PromptManager(BaseManager):
                         "name": name or prompt.name,
                         "version": current_version + 1
                     })
+                    self._publish(prompt.project_id, [prompt_id, new_prompt.id], "prompt.version_created", {
+                        "new_prompt_id": str(new_prompt.id),
+                        "version": current_version + 1
+                    })
                     
-                    logger.info(f"Successfully created new prompt version: {new_prompt.id} (version {current_version + 1})")
+                    logger.info("Successfully created new prompt version: %s (version %s)", new_prompt.id, current_version + 1)
                     return new_prompt, ""
                 except Exception as inner_e:
-                    logger.exception(f"Exception during new version creation: {str(inner_e)}")
+                    logger.exception("Exception during new version creation: %s", inner_e)
                     return None, f"Error creating new version: {str(inner_e)}"
             else:
-                logger.info(f"Updating existing prompt {prompt_id}")
+                logger.info("Updating existing prompt %s", prompt_id)
                 # Update fields
                 update_data = {}
                 if name is not None:
@@ -246,9 +252,10 @@ class PromptManager(BaseManager):
                     update_data['description'] = description
                 if content is not None:
                     update_data['content'] = content
-                if system_prompt is not None:
+                # Unchanged texts are skipped so their blobs are not re-referenced
+                if system_prompt is not None and models.text_hash(system_prompt) != prompt.text_digest('system_prompt'):
                     update_data['system_prompt'] = system_prompt
-                if user_prompt is not None:
+                if user_prompt is not None and models.text_hash(user_prompt) != prompt.text_digest('user_prompt'):
                     update_data['user_prompt'] = user_prompt
                 if is_active is not None:
                     update_data['is_active'] = is_active
@@ -256,24 +263,36 @@ class PromptManager(BaseManager):
                     update_data['updated_by'] = updated_by
                     update_data['updated_at'] = datetime.utcnow()
 
-                logger.debug(f"Updating prompt with data: {update_data.keys()}")
+                # Delta children are encoded against the current text; store them in full first
+                if 'system_prompt' in update_data or 'user_prompt' in update_data:
+                    version_store.expand_children(self._db, prompt.id)
+                # The active version is always stored in full
+                if is_active:
+                    prompt.expand_text()
+
+                logger.debug("Updating prompt with data: %s", update_data.keys())
                 updated_prompt = self.update(prompt, update_data)
                 if not updated_prompt:
                     logger.error("Failed to update prompt")
                     return None, "Failed to update prompt"
 
                 # Log activity
-                logger.debug(f"Logging activity for updated prompt: {prompt_id}")
+                logger.debug("Logging activity for updated prompt: %s", prompt_id)
                 self._log_activity(updated_by or prompt.created_by, models.ActivityType.UPDATE_PROMPT, {
                     "prompt_id": prompt_id,
                     "project_id": prompt.project_id,
                     "updated_fields": [k for k, v in update_data.items() if v is not None]
                 })
+                event_type = "prompt.version_activated" if is_active else "prompt.updated"
+                self._publish(prompt.project_id, [prompt_id], event_type, {
+                    "version": prompt.version,
+                    "updated_fields": list(update_data.keys())
+                })
 
-                logger.info(f"Successfully updated prompt: {prompt_id}")
+                logger.info("Successfully updated prompt: %s", prompt_id)
                 return updated_prompt, ""
         except Exception as e:
-            logger.exception(f"Error updating prompt: {str(e)}")
+            logger.exception("Error updating prompt: %s", e)
             return None, str(e)
 
     def delete_prompt(self, prompt_id: uuid.UUID) -> bool:
@@ -283,6 +302,8 @@ class PromptManager(BaseManager):
             if not prompt:
                 return False
 
+            # Children stored as deltas against this version must not lose their base
+            version_store.expand_children(self._db, prompt_id)
             success = self.delete(prompt_id)
             if not success:
                 return False
@@ -293,12 +314,59 @@ class PromptManager(BaseManager):
                 "project_id": prompt.project_id,
                 "name": prompt.name
             })
+            self._publish(prompt.project_id, [prompt_id], "prompt.deleted", {"name": prompt.name})
 
             return True
         except Exception as e:
             logger.error(f"Error deleting prompt: {str(e)}")
             return False
 
+    def find_identical_versions(
+        self,
+        project_id: Optional[uuid.UUID] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Groups of prompt versions with identical name and texts, largest first.
+
+        Versions not fingerprinted yet (see ``db migrate-prompt-texts``) are not included.
+        """
+        Prompt = self.model_class
+        groups = self._db.query(Prompt.content_hash, func.count(Prompt.id).label("count"))\
+            .filter(Prompt.content_hash.isnot(None))
+        if project_id:
+            groups = groups.filter(Prompt.project_id == project_id)
+        groups = groups.group_by(Prompt.content_hash)\
+            .having(func.count(Prompt.id) > 1)\
+            .order_by(func.count(Prompt.id).desc(), Prompt.content_hash)\
+            .limit(limit)\
+            .all()
+        if not groups:
+            return []
+
+        members = self._db.query(
+            Prompt.content_hash, Prompt.id, Prompt.key, Prompt.name, Prompt.version,
+            Prompt.is_active, Prompt.project_id, Prompt.parent_id, Prompt.created_at
+        ).filter(Prompt.content_hash.in_([group.content_hash for group in groups]))
+        if project_id:
+            members = members.filter(Prompt.project_id == project_id)
+        versions: Dict[str, List[Dict[str, Any]]] = {}
+        for row in members.order_by(Prompt.created_at).all():
+            versions.setdefault(row.content_hash, []).append({
+                "id": str(row.id),
+                "key": row.key,
+                "name": row.name,
+                "version": row.version,
+                "is_active": bool(row.is_active),
+                "project_id": str(row.project_id),
+                "parent_id": str(row.parent_id) if row.parent_id else None,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            })
+        return [
+            {"content_hash": group.content_hash, "count": group.count, "versions": versions.get(group.content_hash, [])}
+            for group in groups
+        ]
+
     def get_project_prompts(self, project_id: uuid.UUID) -> List[models.Prompt]:
         """Get all prompts for a project"""
         return self.get_multi_by_field('project_id', project_id)
@@ -358,20 +426,31 @@ class PromptManager(BaseManager):
     ) -> Dict[str, Any]:
         """Check user permissions for a prompt"""
         try:
-            prompt = self.get_prompt(prompt_id)
-            if not prompt:
-                return {"has_access": False, "is_owner": False}
-
-            # Check if user is the prompt owner
-            is_owner = prompt.created_by == user_id
+            # Only the owning project is needed, not the version tree
+            row = self._db.query(models.Prompt.created_by, models.Project)\
+                .join(models.Project, models.Project.id == models.Prompt.project_id)\
+                .filter(models.Prompt.id == prompt_id)\
+                .first()
+            if not row:
+                return {"has_access": False, "is_owner": False, "can_edit": False}
 
+            created_by, project = row
+            access = get_access_index(user_id, self._db)
             return {
-                "has_access": is_owner,  # For now, only owners have access
-                "is_owner": is_owner
+                "has_access": access.can_view_project(project),
+                "is_owner": created_by == user_id,
+                "can_edit": access.can_edit_project(project)
             }
         except Exception as e:
             logger.error(f"Error checking prompt permissions: {str(e)}")
-            return {"has_access": False, "is_owner": False}
+            return {"has_access": False, "is_owner": False, "can_edit": False}
+
+    def get_accessible_prompts(self, user_id: uuid.UUID) -> List[models.Prompt]:
+        """Get all prompts in projects the user can access"""
+        return self.get_query()\
+            .join(models.Project, models.Project.id == models.Prompt.project_id)\
+            .filter(accessible_projects_filter(user_id))\
+            .all()
 
     def get_all_prompts(self) -> List[models.Prompt]:
         """Get all prompts (admin only)"""
@@ -398,6 +477,16 @@ class PromptManager(BaseManager):
             logger.error(f"Error logging activity: {str(e)}")
             self._db.rollback()
 
+    def _publish(self, project_id: uuid.UUID, prompt_ids: List[uuid.UUID], event_type: str, data: Dict[str, Any]):
+        """Broadcast a prompt event to the affected prompts' and the project's channels"""
+        channels = [prompt_channel(prompt_id) for prompt_id in prompt_ids]
+        channels.append(project_channel(project_id))
+        event_broker.publish(channels, event_type, dict(
+            data,
+            prompt_id=str(prompt_ids[0]),
+            project_id=str(project_id)
+        ))
+
     def get_recent_prompts(self, user_id: uuid.UUID, limit: int = 6) -> List[models.Prompt]:
         """Get recent prompts for a user"""
         try:
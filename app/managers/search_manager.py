@@ -1,9 +1,14 @@
+import uuid
 from typing import List, Dict, Optional, Tuple
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func, desc
 from sqlalchemy.orm import Session
+from app.db import models
 from app.managers.base_manager import BaseManager
 from app.managers.project_manager import ProjectManager
 from app.managers.prompt_manager import PromptManager
+from app.managers.user_manager import UsernameResolver
+from app.services.authorization import accessible_projects_filter
+from app.services.text_blobs import text_loading
 from app.utils import format_date, extract_variables
 
 class SearchManager:
@@ -11,22 +16,27 @@ class SearchManager:
         self.session = session
         self.project_manager = ProjectManager(session)
         self.prompt_manager = PromptManager(session)
-        
+
     def search(
         self,
+        user_id: uuid.UUID,
         query: Optional[str] = None,
         search_type: str = "all",
         page: int = 1,
         per_page: int = 10
     ) -> Tuple[List[Dict], List[Dict], Dict]:
-        """Search for projects and prompts with pagination
-        
+        """Search the projects and prompts a user can access, with pagination
+
+        Access (project ownership or team membership) is applied in SQL, so
+        results, totals and pages only ever cover accessible rows.
+
         Args:
+            user_id: ID of the user searching
             query: Search query string
             search_type: Type of search ('all', 'projects', 'prompts')
             page: Page number
             per_page: Items per page
-            
+
         Returns:
             Tuple containing:
             - List of projects
@@ -36,90 +46,108 @@ class SearchManager:
         projects = []
         prompts = []
         offset = (page - 1) * per_page
+        total_projects = 0
+        total_prompts = 0
+        usernames = UsernameResolver(self.session)
+        accessible = accessible_projects_filter(user_id)
 
         if search_type in ["all", "projects"]:
-            # Build efficient project search query
-            project_query = self.project_manager.get_multi_with_relationships('creator')
-            
+            Project = models.Project
+            project_query = self.session.query(Project).filter(accessible)
+
             if query:
                 # Use SQLAlchemy's or_ for efficient text search
                 project_query = project_query.filter(
                     or_(
-                        self.project_manager.model_class.name.ilike(f"%{query}%"),
-                        self.project_manager.model_class.description.ilike(f"%{query}%")
+                        Project.name.ilike(f"%{query}%"),
+                        Project.description.ilike(f"%{query}%")
                     )
                 )
-            
+
+            total_projects = project_query.order_by(None).count()
+
             # Add pagination
-            project_query = project_query.offset(offset).limit(per_page)
-            all_projects = project_query.all()
-            
+            all_projects = project_query\
+                .order_by(desc(Project.updated_at), Project.id)\
+                .offset(offset)\
+                .limit(per_page)\
+                .all()
+
+            # Prompt counts for the page in one grouped query
+            prompt_counts = dict(
+                self.session.query(models.Prompt.project_id, func.count(models.Prompt.id))
+                .filter(models.Prompt.project_id.in_([project.id for project in all_projects]))
+                .group_by(models.Prompt.project_id)
+                .all()
+            ) if all_projects else {}
+            usernames.add_from(all_projects, fields=("created_by",)).resolve()
+
             for project in all_projects:
-                # Format project for display
-                prompt_count = len(project.prompts)
-                created_at = format_date(project.created_at)
-                updated_at = format_date(project.updated_at)
-                created_by = project.creator.username if project.creator else "Unknown"
-                
                 projects.append({
                     "id": str(project.id),
                     "name": project.name,
                     "description": project.description or "",
-                    "prompt_count": prompt_count,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "created_by": created_by
+                    "prompt_count": prompt_counts.get(project.id, 0),
+                    "created_at": format_date(project.created_at),
+                    "updated_at": format_date(project.updated_at),
+                    "created_by": usernames.get(project.created_by)
                 })
-        
+
         if search_type in ["all", "prompts"]:
-            # Build efficient prompt search query
-            prompt_query = self.prompt_manager.get_multi_with_relationships('creator', 'project')
-            
+            Prompt = models.Prompt
+            prompt_query = self.session.query(Prompt, models.Project.name)\
+                .join(models.Project, models.Project.id == Prompt.project_id)\
+                .filter(accessible)
+
             if query:
                 # Use SQLAlchemy's or_ for efficient text search
                 prompt_query = prompt_query.filter(
                     or_(
-                        self.prompt_manager.model_class.name.ilike(f"%{query}%"),
-                        self.prompt_manager.model_class.system_prompt.ilike(f"%{query}%"),
-                        self.prompt_manager.model_class.user_prompt.ilike(f"%{query}%")
+                        Prompt.name.ilike(f"%{query}%"),
+                        Prompt.system_prompt.ilike(f"%{query}%"),
+                        Prompt.user_prompt.ilike(f"%{query}%")
                     )
                 )
-            
+
+            total_prompts = prompt_query.with_entities(func.count(Prompt.id)).order_by(None).scalar()
+
             # Add pagination
-            prompt_query = prompt_query.offset(offset).limit(per_page)
-            all_prompts = prompt_query.all()
-            
-            for prompt in all_prompts:
+            rows = prompt_query\
+                .options(*text_loading())\
+                .order_by(desc(Prompt.updated_at), Prompt.id)\
+                .offset(offset)\
+                .limit(per_page)\
+                .all()
+            usernames.add_from((prompt for prompt, _ in rows), fields=("created_by",)).resolve()
+
+            for prompt, project_name in rows:
                 # Format prompt for display
                 variables = extract_variables((prompt.system_prompt or "") + prompt.user_prompt)
-                created_at = format_date(prompt.created_at)
-                updated_at = format_date(prompt.updated_at)
-                created_by = prompt.creator.username if prompt.creator else "Unknown"
-                
+
                 prompts.append({
                     "id": str(prompt.id),
                     "name": prompt.name,
                     "project_id": str(prompt.project_id),
-                    "project_name": prompt.project.name,
+                    "project_name": project_name,
                     "variables": variables,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "created_by": created_by
+                    "created_at": format_date(prompt.created_at),
+                    "updated_at": format_date(prompt.updated_at),
+                    "created_by": usernames.get(prompt.created_by)
                 })
-        
+
         # Calculate pagination info
-        total_projects = len(projects) if search_type in ["all", "projects"] else 0
-        total_prompts = len(prompts) if search_type in ["all", "prompts"] else 0
         total_pages = max(
             (total_projects + per_page - 1) // per_page,
             (total_prompts + per_page - 1) // per_page
         )
-        
+
         pagination = {
             "current_page": page,
             "total_pages": total_pages,
             "per_page": per_page,
-            "total_items": total_projects + total_prompts
+            "total_items": total_projects + total_prompts,
+            "total_projects": total_projects,
+            "total_prompts": total_prompts
         }
-        
-        return projects, prompts, pagination 
\ No newline at end of file
+
+        return projects, prompts, pagination
@@ -10,6 +10,10 @@ from app.models.team import TeamRole
 from app.exceptions import TeamCreationError, TeamNotFoundError, TeamUpdateError
 from app.db.database import db
 from app.managers.base_manager import BaseManager
+from app.managers.user_manager import UsernameResolver
+from app.services.authorization import AccessLevel, access_cache, get_access_index
+from app.services.deletion import DELETE_TEAM, schedule_or_delete
+from sqlalchemy import and_, or_, func
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,38 +48,8 @@ class TeamManager(BaseManager):
     ) -> bool:
         """Check if a user has access to a team with optional role requirement"""
         try:
-            # Get the team
-            team = self.get_team(team_id)
-            if not team:
-                return False
-            
-            # Team creator has full access
-            if team.created_by == user_id:
-                return True
-            
-            # Get the user's role in the team
-            team_member = self._db.query(models.TeamMember).filter(
-                models.TeamMember.team_id == team_id,
-                models.TeamMember.user_id == user_id
-            ).first()
-            
-            if not team_member:
-                return False
-            
-            # If no specific role required, any membership is sufficient
-            if required_role is None:
-                return True
-            
-            # Check if user's role meets the requirement
-            role_hierarchy = {
-                TeamRole.VIEWER: 0,
-                TeamRole.EDITOR: 1,
-                TeamRole.ADMIN: 2,
-                TeamRole.OWNER: 3
-            }
-            
-            return role_hierarchy[team_member.role] >= role_hierarchy[required_role]
-            
+            required_level = AccessLevel[required_role.name] if required_role else AccessLevel.VIEWER
+            return get_access_index(user_id, self._db).has_team_access(team_id, required_level)
         except Exception as e:
             raise TeamCreationError(f"Failed to check team access: {str(e)}")
 
@@ -167,28 +141,46 @@ class TeamManager(BaseManager):
             logger.error(f"Error updating team: {str(e)}")
             return None, str(e)
 
-    def delete_team(self, team_id: uuid.UUID) -> bool:
-        """Delete a team"""
+    def delete_team(self, team_id: uuid.UUID, deleted_by: Optional[uuid.UUID] = None) -> bool:
+        """Delete a team, or start deleting it in the background if it is large"""
         try:
-            team = self.get_team(team_id)
-            if not team:
-                return False
-
-            success = self.delete(team_id)
-            if not success:
-                return False
-
-            # Log activity
-            self._log_activity(team.created_by, models.ActivityType.DELETE_TEAM, {
-                "team_id": team_id,
-                "name": team.name
-            })
-
+            self.request_team_deletion(team_id, deleted_by)
             return True
+        except TeamNotFoundError:
+            return False
         except Exception as e:
+            self._db.rollback()
             logger.error(f"Error deleting team: {str(e)}")
             return False
 
+    def request_team_deletion(
+        self,
+        team_id: uuid.UUID,
+        deleted_by: Optional[uuid.UUID] = None
+    ) -> Optional[models.BackgroundJob]:
+        """
+        Delete a team with its projects and memberships without loading them.
+
+        Returns the background job deleting it when it is too large to delete
+        inline, None when it is already deleted.
+        """
+        team = self.get_team(team_id)
+        if not team:
+            raise TeamNotFoundError(f"Team {team_id} not found")
+        # The instance is stale once the rows are gone
+        team_id, name, created_by = team.id, team.name, team.created_by
+
+        job = schedule_or_delete(self._db, DELETE_TEAM, team_id, deleted_by)
+        access_cache.invalidate_team(team_id, [created_by])
+
+        # Log activity
+        self._log_activity(deleted_by or created_by, models.ActivityType.DELETE_TEAM, {
+            "team_id": str(team_id),
+            "name": name,
+            "job_id": str(job.id) if job else None
+        })
+        return job
+
     def get_user_teams(self, user_id: uuid.UUID) -> List[models.Team]:
         """Get all teams a user is a member of"""
         try:
@@ -201,6 +193,90 @@ class TeamManager(BaseManager):
             logger.error(f"Error getting user teams: {str(e)}")
             return []
 
+    def get_user_team_overview(self, user_id: uuid.UUID, member_preview: int = 5) -> List[Dict[str, Any]]:
+        """
+        Get every team a user belongs to or created, with the user's role,
+        member and project counts and a short member preview.
+
+        Uses a fixed number of queries however many teams the user is in:
+        the teams with the caller's membership, grouped member counts,
+        grouped project counts, the windowed member preview and one lookup
+        for the team creators' usernames.
+        """
+        try:
+            rows = self._db.query(models.Team, models.TeamMember.role).outerjoin(
+                models.TeamMember,
+                and_(
+                    models.TeamMember.team_id == models.Team.id,
+                    models.TeamMember.user_id == user_id
+                )
+            ).filter(
+                or_(models.TeamMember.id.isnot(None), models.Team.created_by == user_id)
+            ).order_by(models.Team.name).all()
+            if not rows:
+                return []
+
+            team_ids = [team.id for team, _ in rows]
+            member_counts = dict(
+                self._db.query(models.TeamMember.team_id, func.count(models.TeamMember.id))
+                .filter(models.TeamMember.team_id.in_(team_ids))
+                .group_by(models.TeamMember.team_id)
+                .all()
+            )
+            project_counts = dict(
+                self._db.query(models.Project.team_id, func.count(models.Project.id))
+                .filter(models.Project.team_id.in_(team_ids))
+                .group_by(models.Project.team_id)
+                .all()
+            )
+
+            previews: Dict[uuid.UUID, List[Dict[str, Any]]] = {}
+            if member_preview > 0:
+                ranked = self._db.query(
+                    models.TeamMember.team_id,
+                    models.TeamMember.user_id,
+                    models.TeamMember.role,
+                    models.User.username,
+                    func.row_number().over(
+                        partition_by=models.TeamMember.team_id,
+                        order_by=(models.TeamMember.created_at, models.TeamMember.id)
+                    ).label("position")
+                ).join(
+                    models.User, models.User.id == models.TeamMember.user_id
+                ).filter(models.TeamMember.team_id.in_(team_ids)).subquery()
+                for member in self._db.query(ranked).filter(ranked.c.position <= member_preview).all():
+                    previews.setdefault(member.team_id, []).append({
+                        "user_id": member.user_id,
+                        "username": member.username,
+                        "role": member.role.value
+                    })
+
+            usernames = UsernameResolver(self._db).add_from(
+                (team for team, _ in rows), fields=("created_by",)
+            ).resolve()
+
+            overview = []
+            for team, role in rows:
+                is_creator = team.created_by == user_id
+                is_admin = is_creator or role in (models.TeamRole.ADMIN, models.TeamRole.OWNER)
+                overview.append({
+                    "id": team.id,
+                    "name": team.name,
+                    "description": team.description,
+                    "created_at": team.created_at,
+                    "created_by": usernames.get(team.created_by),
+                    "created_by_id": team.created_by,
+                    "role": role.value if role else models.TeamRole.OWNER.value,
+                    "member_count": member_counts.get(team.id, 0),
+                    "project_count": project_counts.get(team.id, 0),
+                    "members": previews.get(team.id, []),
+                    "permissions": {"has_access": True, "is_admin": is_admin}
+                })
+            return overview
+        except Exception as e:
+            logger.error(f"Error getting team overview for user {user_id}: {str(e)}")
+            return []
+
     def get_team_members(self, team_id: uuid.UUID) -> List[models.TeamMember]:
         """Get all members of a team"""
         try:
@@ -239,6 +315,7 @@ class TeamManager(BaseManager):
             
             self._db.add(member)
             self._db.commit()
+            access_cache.invalidate_team(team_id, [user_id])
 
             # Log activity
             self._log_activity(user_id, models.ActivityType.ADD_TEAM_MEMBER, {
@@ -266,6 +343,7 @@ class TeamManager(BaseManager):
 
             self._db.delete(member)
             self._db.commit()
+            access_cache.invalidate_team(team_id, [user_id])
 
             # Log activity
             self._log_activity(user_id, models.ActivityType.REMOVE_TEAM_MEMBER, {
@@ -297,6 +375,7 @@ class TeamManager(BaseManager):
 
             member.role = role
             self._db.commit()
+            access_cache.invalidate_team(team_id, [user_id])
 
             # Log activity
             self._log_activity(user_id, models.ActivityType.UPDATE_TEAM_MEMBER_ROLE, {
@@ -318,21 +397,16 @@ class TeamManager(BaseManager):
     ) -> Dict[str, Any]:
         """Check user permissions for a team"""
         try:
-            member = self._db.query(models.TeamMember).filter(
-                models.TeamMember.team_id == team_id,
-                models.TeamMember.user_id == user_id
-            ).first()
-
-            if not member:
-                return {"has_access": False, "is_admin": False}
-
+            level = get_access_index(user_id, self._db).team_level(team_id)
             return {
-                "has_access": True,
-                "is_admin": member.role == models.TeamRole.ADMIN
+                "has_access": level >= AccessLevel.VIEWER,
+                "can_view": level >= AccessLevel.VIEWER,
+                "can_edit": level >= AccessLevel.EDITOR,
+                "is_admin": level >= AccessLevel.ADMIN
             }
         except Exception as e:
             logger.error(f"Error checking team permissions: {str(e)}")
-            return {"has_access": False, "is_admin": False}
+            return {"has_access": False, "can_view": False, "can_edit": False, "is_admin": False}
 
     def _add_team_member(
         self,
@@ -352,6 +426,7 @@ class TeamManager(BaseManager):
             
             self._db.add(member)
             self._db.commit()
+            access_cache.invalidate_team(team_id, [user_id])
             return True
         except Exception as e:
             logger.error(f"Error adding team member: {str(e)}")
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 import bcrypt
 from datetime import datetime, timedelta
 import uuid
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Set
 import secrets
 import logging
 from sqlalchemy import or_
@@ -14,11 +14,87 @@ from app.models.activity import UserStats, UserActivity
 from app.db.models import User, TeamMember, Activity, ActivityType
 from app.db.database import db
 from app.managers.base_manager import BaseManager
+from app.services.authorization import access_cache
+from app.services.deletion import DELETE_USER, USER_DELETE_MODES
+from app.services.jobs import enqueue
 import jwt
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT = object()
+
+class UsernameResolver:
+    """
+    Per-request resolver that maps user ids to usernames.
+
+    Pages collect every creator/updater id they are about to render with
+    `add`/`add_from`, then call `resolve` once: all ids are fetched with a
+    single `IN` query, so the number of user lookups per page stays fixed
+    no matter how many rows are shown.
+    """
+
+    def __init__(self, db_session: Optional[Session] = None, default: str = "Unknown"):
+        self._db = db_session or db.get_session()
+        self.default = default
+        self._usernames: Dict[uuid.UUID, Optional[str]] = {}
+        self._pending: Set[uuid.UUID] = set()
+
+    @staticmethod
+    def _normalize(user_id: Any) -> Optional[uuid.UUID]:
+        if user_id is None or isinstance(user_id, uuid.UUID):
+            return user_id
+        try:
+            return uuid.UUID(str(user_id))
+        except ValueError:
+            return None
+
+    def add(self, *user_ids: Any) -> "UsernameResolver":
+        """Queue user ids for the next batched lookup"""
+        for user_id in user_ids:
+            user_id = self._normalize(user_id)
+            if user_id is not None and user_id not in self._usernames:
+                self._pending.add(user_id)
+        return self
+
+    def add_from(
+        self,
+        objects: Iterable[Any],
+        fields: Tuple[str, ...] = ("created_by", "updated_by")
+    ) -> "UsernameResolver":
+        """Queue the user id fields of every object"""
+        for obj in objects:
+            if obj is None:
+                continue
+            self.add(*(getattr(obj, field, None) for field in fields))
+        return self
+
+    def resolve(self) -> "UsernameResolver":
+        """Load all pending user ids with one query"""
+        if not self._pending:
+            return self
+        pending = list(self._pending)
+        self._pending.clear()
+        try:
+            rows = self._db.query(User.id, User.username).filter(User.id.in_(pending)).all()
+        except Exception as e:
+            logger.error(f"Error resolving usernames: {str(e)}")
+            rows = []
+        self._usernames.update({user_id: None for user_id in pending})
+        self._usernames.update({user_id: username for user_id, username in rows})
+        return self
+
+    def get(self, user_id: Any, default: Any = _DEFAULT) -> Optional[str]:
+        """Get the username for a user id, resolving it on demand if it was not queued"""
+        if default is _DEFAULT:
+            default = self.default
+        user_id = self._normalize(user_id)
+        if user_id is None:
+            return default
+        if user_id not in self._usernames:
+            self.add(user_id).resolve()
+        return self._usernames.get(user_id) or default
+
 class UserManager(BaseManager):
     """Manager class for handling user-related operations"""
     
@@ -48,7 +124,8 @@ class UserManager(BaseManager):
     def get_active_users(self, days: int = 30) -> List[models.User]:
         """Get users who have been active in the last N days"""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        return self.filter(last_login__gte=cutoff_date)
+        active_ids = self._db.query(Activity.user_id).filter(Activity.timestamp >= cutoff_date)
+        return self._db.query(User).filter(User.id.in_(active_ids)).all()
 
     def get_all_users(self) -> List[models.User]:
         """Get all users (admin only)"""
@@ -135,31 +212,59 @@ class UserManager(BaseManager):
             logger.error(f"Error updating user: {str(e)}")
             return None, str(e)
 
-    def delete_user(self, user_id: uuid.UUID) -> Tuple[bool, Optional[str]]:
-        """Delete a user"""
+    def delete_user(
+        self,
+        user_id: uuid.UUID,
+        deleted_by: Optional[uuid.UUID] = None,
+        mode: str = "delete"
+    ) -> Tuple[bool, Optional[str]]:
+        """Delete a user; the work itself runs as a background job"""
+        job, error = self.request_user_deletion(user_id, deleted_by, mode)
+        return job is not None, error
+
+    def request_user_deletion(
+        self,
+        user_id: uuid.UUID,
+        deleted_by: Optional[uuid.UUID] = None,
+        mode: str = "delete"
+    ) -> Tuple[Optional[models.BackgroundJob], Optional[str]]:
+        """
+        Disable a user right away and start the background job that deletes
+        their memberships and activities (or re-attributes them, with
+        mode="anonymize") in batches before removing the user.
+        """
         try:
+            if mode not in USER_DELETE_MODES:
+                return None, f"Unknown delete mode '{mode}'"
             user = self.get_user(user_id)
             if not user:
-                return False, "User not found"
-
-            # Delete user's team memberships
-            self._db.query(TeamMember).filter(TeamMember.user_id == user_id).delete()
+                return None, "User not found"
+            user_id, username = user.id, user.username
 
-            # Delete user's activities
-            self._db.query(Activity).filter(Activity.user_id == user_id).delete()
+            # Locked out while the job runs
+            self.update(user, {
+                'is_active': False,
+                'status': 'disabled',
+                'invitation_token': None,
+                'updated_at': datetime.utcnow()
+            })
+            access_cache.invalidate_users([user_id])
 
-            # Delete user
-            success = self.delete(user_id)
-            if not success:
-                return False, "Failed to delete user"
+            job = enqueue(self._db, DELETE_USER, {"user_id": str(user_id), "mode": mode}, created_by=deleted_by)
 
             # Log activity
-            self._log_activity(user_id, ActivityType.DELETE_USER, {"username": user.username})
-
-            return True, None
+            if deleted_by:
+                self._log_activity(deleted_by, ActivityType.DELETE_USER, {
+                    "user_id": str(user_id),
+                    "username": username,
+                    "mode": mode,
+                    "job_id": str(job.id)
+                })
+
+            return job, None
         except Exception as e:
             logger.error(f"Error deleting user: {str(e)}")
-            return False, str(e)
+            return None, str(e)
 
     def verify_password(self, user: models.User, password: str) -> bool:
         """Verify a user's password"""
@@ -1,31 +1,55 @@
 """
 Authentication redirect middleware for handling auth-related redirects
 """
-from fastapi import Request, HTTPException
+from typing import Optional
+from fastapi import HTTPException
 from fastapi.responses import RedirectResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette import status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+def _login_redirect(status_code: int, location: Optional[str]) -> Optional[RedirectResponse]:
+    """A 303 redirect replacing a 307 redirect to the login page"""
+    if status_code == status.HTTP_307_TEMPORARY_REDIRECT and location and location.startswith("/login"):
+        return RedirectResponse(url=location, status_code=status.HTTP_303_SEE_OTHER)
+    return None
+
+class AuthRedirectMiddleware:
+    """
+    Middleware for handling authentication redirects.
+
+    Temporary (307) redirects to the login page, returned or raised as an
+    HTTPException, are turned into 303 redirects so the browser follows them
+    with a GET. Other responses pass through untouched, streaming included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        redirect: Optional[RedirectResponse] = None
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal redirect, started
+            if message["type"] == "http.response.start":
+                started = True
+                redirect = _login_redirect(message["status"], Headers(raw=message["headers"]).get("location"))
+                if redirect is not None:
+                    await redirect(scope, receive, send)
+                    return
+            if redirect is None:
+                await send(message)
 
-class AuthRedirectMiddleware(BaseHTTPMiddleware):
-    """Middleware for handling authentication redirects"""
-    
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-            
-            # Check if the response is a redirect for authentication
-            if response.status_code == status.HTTP_307_TEMPORARY_REDIRECT:
-                redirect_url = response.headers.get("Location")
-                if redirect_url and redirect_url.startswith("/login"):
-                    # Convert HTTPException to RedirectResponse
-                    return RedirectResponse(url=redirect_url, status_code=status.HTTP_303_SEE_OTHER)
-                    
-            return response
+            await self.app(scope, receive, send_wrapper)
         except HTTPException as e:
             # Check if the exception is a redirect for authentication
-            if e.status_code == status.HTTP_307_TEMPORARY_REDIRECT:
-                redirect_url = e.headers.get("Location")
-                if redirect_url and redirect_url.startswith("/login"):
-                    # Convert HTTPException to RedirectResponse
-                    return RedirectResponse(url=redirect_url, status_code=status.HTTP_303_SEE_OTHER)
-            raise 
\ No newline at end of file
+            response = None if started else _login_redirect(e.status_code, (e.headers or {}).get("Location"))
+            if response is None:
+                raise
+            await response(scope, receive, send)
@@ -1,89 +1,132 @@
 """
 Logging middleware for request/response logging
+
+Each request is logged once it has finished, as one structured ``request``
+event with its timings. Requests are sampled per path prefix
+(``LOG_REQUEST_SAMPLING``, falling back to ``LOG_REQUEST_SAMPLE_RATE``);
+failed and slow requests (``LOG_SLOW_REQUEST_MS``) are always logged.
 """
+import logging
+import random
 import time
 import uuid
-from typing import Dict, Any, Tuple
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.logger import log_request_info
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests and responses"""
-    
-    def _generate_request_id(self, request: Request) -> Tuple[str, str]:
-        """Generate request ID and handle client-provided correlation ID"""
-        # Generate our own request ID
+from typing import Any, Dict, Optional
+
+import structlog
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+request_logger = structlog.get_logger("app.request")
+_stdlib_request_logger = logging.getLogger("app.request")
+
+# Longest prefix first, so the most specific rule wins
+_SAMPLING = sorted(settings.LOGGING.REQUEST_SAMPLING.items(), key=lambda rule: len(rule[0]), reverse=True)
+
+
+def request_sample_rate(path: str) -> float:
+    """Share of requests to `path` that are logged"""
+    for prefix, rate in _SAMPLING:
+        if path.startswith(prefix):
+            return rate
+    return settings.LOGGING.REQUEST_SAMPLE_RATE
+
+
+def log_request(
+    scope: Scope,
+    status: int,
+    started: float,
+    response_started: Optional[float],
+    request_id: str,
+    correlation_id: Optional[str] = None,
+    error: Optional[BaseException] = None
+) -> None:
+    """Log a finished request, subject to sampling; `started` and `response_started` are perf_counter values"""
+    if not _stdlib_request_logger.isEnabledFor(logging.INFO):
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    rate = request_sample_rate(scope["path"])
+    if error is None and status < 500 and duration_ms < settings.LOGGING.SLOW_REQUEST_MS \
+            and rate < 1 and random.random() >= rate:
+        return
+
+    fields: Dict[str, Any] = {
+        "request_id": request_id,
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "response_ms": round((response_started - started) * 1000, 2) if response_started else None,
+        "sample_rate": rate,
+    }
+    if correlation_id:
+        fields["correlation_id"] = correlation_id
+    if scope.get("client"):
+        fields["client"] = scope["client"][0]
+    # SessionMiddleware runs inside this middleware and has loaded the session by now
+    session = scope.get("session")
+    if session and session.get("user_id"):
+        fields["user_id"] = session["user_id"]
+
+    if error is not None:
+        request_logger.error("request failed", error=f"{type(error).__name__}: {error}", **fields)
+    elif status >= 500:
+        request_logger.error("request", **fields)
+    else:
+        request_logger.info("request", **fields)
+
+
+class LoggingMiddleware:
+    """
+    Middleware for logging HTTP requests and responses.
+
+    Response headers get the request ID, the client's correlation ID and the
+    time until the response started; the body is passed through as it is
+    sent, so streaming responses are not buffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
         request_id = str(uuid.uuid4())
-        
-        # Get client correlation ID if provided
-        client_correlation_id = request.headers.get("X-Correlation-ID")
-        
-        return request_id, client_correlation_id
-    
-    def _get_request_details(self, request: Request) -> Dict[str, Any]:
-        """Extract common request details"""
-        request_id, client_correlation_id = self._generate_request_id(request)
-        
-        # Safely get session data
-        session_id = None
-        user_id = None
-        try:
-            if hasattr(request, "session") and "session" in request.scope:
-                session_id = request.session.get("session_id")
-                user_id = request.session.get("user_id")
-        except Exception:
-            # If there's any error accessing session, just use None values
-            pass
-        
-        return {
-            "request_id": request_id,
-            "client_correlation_id": client_correlation_id,
-            "method": request.method,
-            "url": str(request.url),
-            "path": request.url.path,
-            "query_params": dict(request.query_params),
-            "client_host": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "referer": request.headers.get("referer"),
-            "content_type": request.headers.get("content-type"),
-            "accept": request.headers.get("accept"),
-            "content_length": request.headers.get("content-length"),
-            "x_forwarded_for": request.headers.get("x-forwarded-for"),
-            "x_real_ip": request.headers.get("x-real-ip"),
-            "session_id": session_id,
-            "user_id": user_id,
-        }
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Get request details
-        request_details = self._get_request_details(request)
-        
+        correlation_id = Headers(scope=scope).get("x-correlation-id")
+
         # Add request ID to request state
-        request.state.request_id = request_details["request_id"]
-        if request_details["client_correlation_id"]:
-            request.state.client_correlation_id = request_details["client_correlation_id"]
-        
-        # Log request received
-        log_request_info(request)
-        
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        if correlation_id:
+            state["client_correlation_id"] = correlation_id
+
+        if _stdlib_request_logger.isEnabledFor(logging.DEBUG):
+            request_logger.debug("request received", request_id=request_id, method=scope["method"], path=scope["path"])
+
+        status = 500
+        response_started = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                response_started = time.perf_counter()
+                status = message["status"]
+
+                # Add headers to response
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                if correlation_id:
+                    headers["X-Correlation-ID"] = correlation_id
+                headers["X-Process-Time"] = str(response_started - started)
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            # Add headers to response
-            response.headers["X-Request-ID"] = request_details["request_id"]
-            if request_details["client_correlation_id"]:
-                response.headers["X-Correlation-ID"] = request_details["client_correlation_id"]
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            # Log response with timing
-            log_request_info(request, response=response)
-            
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Log error with request details
-            log_request_info(request, error=e)
-            raise 
\ No newline at end of file
+            log_request(scope, status, started, response_started, request_id, correlation_id, error=e)
+            raise
+        log_request(scope, status, started, response_started, request_id, correlation_id)
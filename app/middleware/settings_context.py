@@ -1,19 +1,17 @@
 """
 Middleware to add settings to template context
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.config import settings
 
-class SettingsContextMiddleware(BaseHTTPMiddleware):
-    """Middleware to add settings to template context"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Add settings to the request state before processing
-        request.state.settings = settings
-        
-        # Process the request
-        response = await call_next(request)
-        
-        # Return the response
-        return response 
\ No newline at end of file
+class SettingsContextMiddleware:
+    """Middleware to add settings to template context (``request.state.settings``)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # request.state is backed by scope["state"]
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["settings"] = settings
+        await self.app(scope, receive, send)
@@ -28,6 +28,8 @@ class ActivityType(str, Enum):
     add_team_member = "add_team_member"
     remove_team_member = "remove_team_member"
     update_team_member_role = "update_team_member_role"
+    import_prompts = "import_prompts"
+    invite_users = "invite_users"
 
 class ActivityBase(BaseModel):
     user_id: str
@@ -9,6 +9,19 @@ class UserInvite(BaseModel):
     expiry_hours: int = Field(48, description="Hours until invitation expires")
     personal_message: Optional[str] = Field(None, description="Optional personal message to include in invitation")
 
+class BulkInvitee(BaseModel):
+    """One invitee of a bulk invitation"""
+    username: str = Field(..., description="Username for the new user")
+    email: EmailStr = Field(..., description="Email address of the user")
+    is_admin: bool = Field(False, description="Whether the user should have admin privileges")
+    personal_message: Optional[str] = Field(None, description="Overrides the batch's personal message")
+
+class BulkUserInvite(BaseModel):
+    """Schema for inviting many users at once"""
+    invites: List[BulkInvitee] = Field(..., description="Users to invite")
+    expiry_hours: int = Field(48, description="Hours until invitations expire")
+    personal_message: Optional[str] = Field(None, description="Optional personal message to include in every invitation")
+
 class AdminStatusUpdate(BaseModel):
     """Schema for updating a user's admin status"""
     is_admin_status: bool = Field(..., description="Whether the user should have admin privileges") 
\ No newline at end of file
@@ -2,12 +2,14 @@
 Admin API routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 import logging
 import uuid
 from datetime import datetime
 
 from app.db import models
+from app.db.database import db
 from app.managers.user_manager import UserManager
 from app.managers.team_manager import TeamManager
 from app.managers.project_manager import ProjectManager
@@ -19,8 +21,12 @@ from app.routers.admin.common import (
     check_admin_permissions
 )
 from app.services.email import send_invitation_email
+from app.services.admin_metrics import AdminMetrics
+from app.services.storage_stats import REFRESH_STORAGE_STATS, StorageAccounting
+from app.services.jobs import enqueue
+from app.services.invitations import batch_status, create_invitations, resend_failed
 from app.utils.serializers import safe_json_dumps
-from app.models.admin import AdminStatusUpdate, UserInvite
+from app.models.admin import AdminStatusUpdate, BulkUserInvite, UserInvite
 from app.models.activity import ActivityType
 from app.exceptions import UserNotFoundError, TeamNotFoundError, ProjectNotFoundError, PromptNotFoundError
 
@@ -58,26 +64,60 @@ async def api_dashboard_stats(
         # Check admin permissions
         check_admin_permissions(request)
         
-        # Get basic stats
-        total_users = len(user_manager.get_all_users())
-        total_projects = len(project_manager.get_all_projects())
-        active_users = len(user_manager.get_active_users(days=7))
-        
-        # Get prompt count
-        total_prompts = len(prompt_manager.get_all_prompts())
-        
-        # Calculate stats changes (mock data for now)
-        return {
-            "active_users": active_users,
-            "total_users": total_users,
-            "total_projects": total_projects,
-            "total_prompts": total_prompts,
-            "storage_used": "1.2 GB",
-            "storage_percentage": 24,
-            "user_change": 12,
-            "project_change": 8,
-            "prompt_change": 15
-        }
+        # Counts, estimates and period deltas (cached for a short TTL)
+        return AdminMetrics().dashboard_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/reports/storage")
+async def api_storage_report(request: Request, limit: int = 20):
+    """API endpoint to get the latest storage report (largest tables, projects, prompts and version families)"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        return StorageAccounting().report(limit=max(1, min(limit, 100)))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/reports/storage/refresh")
+async def api_refresh_storage_report(request: Request):
+    """API endpoint to refresh the storage report in a background job"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        session = db.get_session()
+        try:
+            job = enqueue(session, REFRESH_STORAGE_STATS, created_by=uuid.UUID(request.session["user_id"]))
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"message": "Storage report refresh scheduled", "job_id": str(job.id)}
+            )
+        finally:
+            db.close_session(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/reports/identical-versions")
+async def api_identical_versions_report(
+    request: Request,
+    project_id: uuid.UUID = None,
+    limit: int = 50,
+    prompt_manager: PromptManager = Depends(get_prompt_manager)
+):
+    """API endpoint to list groups of prompt versions with identical name and texts"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        return {"groups": prompt_manager.find_identical_versions(project_id=project_id, limit=max(1, min(limit, 500)))}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -278,17 +318,29 @@ async def update_user(
 async def delete_user(
     request: Request,
     user_id: str,
+    mode: str = "delete",
     user_manager: UserManager = Depends(get_user_manager)
 ):
-    """Delete a user"""
+    """Delete (or anonymize) a user in a background job"""
     try:
         # Check admin permissions
         check_admin_permissions(request)
         
-        # Delete user
-        user_manager.delete_user(user_id)
+        # Disable the user now; memberships and activities are removed in batches
+        job, error = user_manager.request_user_deletion(
+            user_id, deleted_by=uuid.UUID(request.session["user_id"]), mode=mode
+        )
+        if error == "User not found":
+            raise UserNotFoundError(error)
+        if not job:
+            raise HTTPException(status_code=400, detail=error)
         
-        return {"message": "User deleted successfully"}
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "User deletion started", "job_id": str(job.id)}
+        )
+    except HTTPException:
+        raise
     except UserNotFoundError:
         raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
@@ -360,8 +412,13 @@ async def delete_team(
         # Check admin permissions
         check_admin_permissions(request)
         
-        # Delete team
-        team_manager.delete_team(team_id)
+        # Delete team; large teams are deleted by a background job
+        job = team_manager.request_team_deletion(team_id)
+        if job:
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"message": "Team deletion started", "job_id": str(job.id)}
+            )
         
         return {"message": "Team deleted successfully"}
     except TeamNotFoundError:
@@ -435,8 +492,13 @@ async def delete_project(
         # Check admin permissions
         check_admin_permissions(request)
         
-        # Delete project
-        project_manager.delete_project(project_id)
+        # Delete project; large projects are deleted by a background job
+        job = project_manager.request_project_deletion(project_id)
+        if job:
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"message": "Project deletion started", "job_id": str(job.id)}
+            )
         
         return {"message": "Project deleted successfully"}
     except ProjectNotFoundError:
@@ -596,6 +658,83 @@ async def invite_user(
         logger.exception(f"Unexpected error during invitation process: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/users/invite/bulk")
+async def invite_users_bulk(request: Request, invitation: BulkUserInvite):
+    """Invite many users at once; emails are sent by a rate-limited background job"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        session = db.get_session()
+        try:
+            batch = create_invitations(
+                session,
+                [invite.model_dump() for invite in invitation.invites],
+                invited_by=uuid.UUID(request.session["user_id"]),
+                inviter_name=get_admin_user(request),
+                expiry_hours=invitation.expiry_hours,
+                personal_message=invitation.personal_message
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED if batch["job"] else status.HTTP_400_BAD_REQUEST,
+                content={
+                    "batch_id": str(batch["batch_id"]) if batch["batch_id"] else None,
+                    "job_id": str(batch["job"].id) if batch["job"] else None,
+                    "invited": batch["invited"],
+                    "rejected": batch["rejected"]
+                }
+            )
+        finally:
+            db.close_session(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Bulk invitation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/users/invite/bulk/{batch_id}")
+async def get_bulk_invite_status(request: Request, batch_id: uuid.UUID):
+    """Per-recipient delivery status of a bulk invitation"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        session = db.get_session()
+        try:
+            report = batch_status(session, batch_id)
+        finally:
+            db.close_session(session)
+        if not report["recipients"]:
+            raise HTTPException(status_code=404, detail="Invitation batch not found")
+        return report
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/users/invite/bulk/{batch_id}/resend")
+async def resend_bulk_invite_failures(request: Request, batch_id: uuid.UUID):
+    """Send the failed invitations of a bulk invitation again"""
+    try:
+        # Check admin permissions
+        check_admin_permissions(request)
+
+        session = db.get_session()
+        try:
+            job = resend_failed(session, batch_id, resent_by=uuid.UUID(request.session["user_id"]))
+            if not job:
+                return {"message": "No failed invitations to resend", "job_id": None}
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"message": "Resending failed invitations", "job_id": str(job.id)}
+            )
+        finally:
+            db.close_session(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/users/{user_id}/resend-invite")
 async def resend_invitation(
     request: Request,
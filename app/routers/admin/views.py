@@ -15,6 +15,7 @@ from app.managers.team_manager import TeamManager
 from app.managers.project_manager import ProjectManager
 from app.managers.prompt_manager import PromptManager
 from app.managers.activity_manager import ActivityManager
+from app.services.admin_metrics import AdminMetrics
 from app.routers.auth import get_current_user, is_admin
 from app.utils import format_date
 from app.templates import templates
@@ -37,18 +38,8 @@ async def dashboard_view(
     
     # Initialize managers
     user_manager = UserManager()
-    project_manager = ProjectManager()
-    prompt_manager = PromptManager()
     activity_manager = ActivityManager()
     
-    # Get basic stats
-    total_users = len(user_manager.get_all_users())
-    total_projects = len(project_manager.get_all_projects())
-    active_users = len(user_manager.get_active_users(days=7))
-    
-    # Get prompt count
-    total_prompts = len(prompt_manager.get_all_prompts())
-    
     # Get recent activities
     recent_activities = activity_manager.get_recent_activities(limit=10)
     formatted_activities = []
@@ -65,15 +56,8 @@ async def dashboard_view(
             "time": format_date(activity.timestamp)
         })
     
-    # Calculate stats changes (mock data for now)
-    stats = {
-        "active_users": active_users,
-        "total_projects": total_projects,
-        "total_prompts": total_prompts,
-        "user_change": 12,
-        "project_change": 8,
-        "prompt_change": 15
-    }
+    # Counts, estimates and period deltas (cached for a short TTL)
+    stats = AdminMetrics(db).dashboard_stats()
     
     return templates.TemplateResponse(
         "admin/dashboard.html",
@@ -8,6 +8,7 @@ from app.managers.team_manager import TeamManager
 from app.managers.project_manager import ProjectManager
 from app.managers.activity_manager import ActivityManager
 from app.managers.prompt_manager import PromptManager
+from app.services.admin_metrics import AdminMetrics
 from app.templates import templates
 from .common import get_username, get_admin_user, check_admin_permissions
 import uuid
@@ -41,10 +42,8 @@ async def admin_dashboard(
         # Check admin permissions
         check_admin_permissions(request)
         
-        # Get stats
-        total_users = user_manager.get_total_users()
-        total_teams = team_manager.get_total_teams()
-        total_projects = project_manager.get_total_projects()
+        # Counts, estimates and period deltas (cached for a short TTL)
+        stats = AdminMetrics().dashboard_stats()
         
         # Get recent activity
         activity = user_manager.get_recent_activity(limit=10)
@@ -53,11 +52,7 @@ async def admin_dashboard(
             "admin/dashboard.html",
             {
                 "request": request,
-                "stats": {
-                    "total_users": total_users,
-                    "total_teams": total_teams,
-                    "total_projects": total_projects
-                },
+                "stats": stats,
                 "activity": activity,
                 "admin_user": get_admin_user(request)
             }
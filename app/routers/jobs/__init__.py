@@ -0,0 +1,11 @@
+"""
+Background jobs router package
+"""
+from fastapi import APIRouter
+from .api import router as api_router
+
+# Create main router
+router = APIRouter(tags=["jobs"])
+
+# Include sub-routers with their respective prefixes
+router.include_router(api_router, prefix="/api/jobs")
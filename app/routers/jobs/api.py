@@ -0,0 +1,105 @@
+"""
+Background jobs API routes
+"""
+from fastapi import APIRouter, Request, HTTPException, Query, status
+from typing import Optional
+import uuid
+
+from app.db.database import db
+from app.db.models import BackgroundJob
+from app.dependencies.auth import require_auth
+from app.services.jobs import cancel_job, job_status, list_jobs, queue_summary, retry_job
+
+# Create router
+router = APIRouter(tags=["jobs-api"])
+
+def _is_admin(request: Request) -> bool:
+    return request.session.get("user", {}).get("is_admin", False)
+
+def _get_visible_job(request: Request, session, job_id: str) -> BackgroundJob:
+    """The job, if it exists and the current user started it or is an admin"""
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    job = session.get(BackgroundJob, job_uuid)
+    if job is None or not (job.created_by == uuid.UUID(request.session["user_id"]) or _is_admin(request)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("")
+@require_auth()
+async def get_jobs(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    kind: Optional[str] = None,
+    limit: int = 50
+):
+    """List recent jobs; admins see every user's jobs"""
+    session = db.get_session()
+    try:
+        created_by = None if _is_admin(request) else uuid.UUID(request.session["user_id"])
+        jobs = list_jobs(session, created_by=created_by, status=status_filter, kind=kind, limit=max(1, min(limit, 200)))
+        return [job_status(job) for job in jobs]
+    finally:
+        db.close_session(session)
+
+@router.get("/summary")
+@require_auth()
+async def get_queue_summary(request: Request):
+    """Job counts by kind and status (admin only)"""
+    if not _is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin permissions required")
+    session = db.get_session()
+    try:
+        return queue_summary(session)
+    finally:
+        db.close_session(session)
+
+@router.get("/{job_id}")
+@require_auth()
+async def get_job(request: Request, job_id: str):
+    """Get the status and progress of a background job started by the current user"""
+    session = db.get_session()
+    try:
+        return job_status(_get_visible_job(request, session, job_id))
+    finally:
+        db.close_session(session)
+
+@router.post("/{job_id}/retry")
+@require_auth()
+async def retry(request: Request, job_id: str):
+    """Queue a failed or cancelled job again"""
+    session = db.get_session()
+    try:
+        job = _get_visible_job(request, session, job_id)
+        if not retry_job(session, job):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is {job.status}; only failed or cancelled jobs can be retried"
+            )
+        return job_status(job)
+    finally:
+        db.close_session(session)
+
+@router.post("/{job_id}/cancel")
+@require_auth()
+async def cancel(request: Request, job_id: str):
+    """Cancel a job that has not started yet"""
+    session = db.get_session()
+    try:
+        job = _get_visible_job(request, session, job_id)
+        if not cancel_job(session, job):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is {job.status}; only pending jobs can be cancelled"
+            )
+        return job_status(job)
+    finally:
+        db.close_session(session)
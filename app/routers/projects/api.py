@@ -2,6 +2,7 @@
 Projects API routes
 """
 from fastapi import APIRouter, Request, HTTPException, status,Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
@@ -14,7 +15,9 @@ from app.managers.activity_manager import ActivityManager
 from app.db import models
 from app.models.activity import ActivityType
 from app.models.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from app.dependencies.auth import require_auth
+from app.dependencies.auth import require_auth, get_request_access
+from app.services.events import event_broker, project_channel
+from app.services.project_export import stream_export
 
 # Create router
 router = APIRouter(tags=["projects-api"])
@@ -90,8 +93,7 @@ async def get_project(
             detail="Project not found"
         )
     
-    user_id = uuid.UUID(request.session["user_id"])
-    if project.user_id != user_id:
+    if not get_request_access(request).can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this project"
@@ -125,7 +127,7 @@ async def update_project(
         )
     
     user_id = uuid.UUID(request.session["user_id"])
-    if project.user_id != user_id:
+    if not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this project"
@@ -171,7 +173,7 @@ async def delete_project(
         )
     
     user_id = uuid.UUID(request.session["user_id"])
-    if project.user_id != user_id:
+    if not get_request_access(request).can_manage_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this project"
@@ -184,8 +186,13 @@ async def delete_project(
         user_id=user_id
     )
     
-    # Delete project
-    project_manager.delete_project(project_uuid)
+    # Delete project; large projects are deleted by a background job
+    job = project_manager.request_project_deletion(project_uuid, deleted_by=user_id)
+    if job:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Project deletion started", "job_id": str(job.id)}
+        )
     
     return {"message": "Project deleted successfully"}
 
@@ -242,4 +249,73 @@ async def get_search_suggestions(
         limit=limit
     )
     
-    return suggestions 
\ No newline at end of file
+    return suggestions 
+
+@router.get("/{project_id}/events")
+@require_auth()
+async def project_events(
+    request: Request,
+    project_id: str,
+    project_manager: ProjectManager = Depends(get_project_manager)
+):
+    """Stream prompt, version and comment events for a project as server-sent events"""
+    try:
+        project_uuid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project ID format"
+        )
+
+    project = project_manager.get_project(project_uuid)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if not get_request_access(request).can_view_project(project):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this project"
+        )
+
+    return StreamingResponse(
+        event_broker.stream(request, project_channel(project.id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{project_id}/export")
+@require_auth()
+async def export_project(
+    request: Request,
+    project_id: str,
+    project_manager: ProjectManager = Depends(get_project_manager)
+):
+    """Download a project with its prompt families, versions and comments as a gzipped NDJSON bundle"""
+    try:
+        project_uuid = uuid.UUID(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid project ID format"
+        )
+
+    project = project_manager.get_project(project_uuid)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    if not get_request_access(request).can_view_project(project):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this project"
+        )
+
+    filename = f"{project.key}-{datetime.utcnow():%Y%m%d%H%M%S}.ndjson.gz"
+    return StreamingResponse(
+        stream_export([project.id]),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -9,15 +9,18 @@ from typing import List, Dict, Any, Optional
 import uuid
 import logging
 
-from app.dependencies.auth import require_auth
+from app.dependencies.auth import require_auth, get_request_access
 from app.managers.project_manager import ProjectManager
 from app.managers.prompt_manager import PromptManager
 from app.managers.activity_manager import ActivityManager
+from app.managers.comment_manager import CommentManager
 from app.db import models
 from app.db.models.activity import ActivityType
 from app.utils.format_date import format_datetime, format_relative_time
 from app.utils.token_counter import count_prompt_tokens
 from app.managers.llm_model_manager import LLMModelManager
+from app.managers.user_manager import UsernameResolver
+from app.logger import lazy
 
 # Create router
 router = APIRouter(tags=["projects-web"])
@@ -45,16 +48,28 @@ def get_llm_model_manager() -> LLMModelManager:
     return LLMModelManager()
 
 
+def get_username_resolver() -> UsernameResolver:
+    """Dependency to get a per-request username resolver"""
+    return UsernameResolver()
+
+
+def get_comment_manager() -> CommentManager:
+    """Dependency to get comment manager instance"""
+    return CommentManager()
+
+
 @router.get("", response_class=HTMLResponse)
 @require_auth()
 async def projects_page(
     request: Request,
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Render the projects list page"""
     user_id = uuid.UUID(request.session["user_id"])
     projects = project_manager.get_user_projects(user_id)
+    usernames.add_from(projects).resolve()
 
     # Get prompt counts for each project
     project_data = []
@@ -67,9 +82,7 @@ async def projects_page(
                 "description": project.description,
                 "prompt_count": prompt_count,
                 "created_at": format_relative_time(project.created_at),
-                "created_by": (
-                    project.creator.username if project.creator else "Unknown"
-                ),
+                "created_by": usernames.get(project.created_by),
             }
         )
 
@@ -86,6 +99,7 @@ async def project_detail_page(
     project_id: str,
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Render the project detail page"""
     try:
@@ -101,14 +115,14 @@ async def project_detail_page(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    user_id = uuid.UUID(request.session["user_id"])
-    if project.created_by != user_id:
+    if not get_request_access(request).can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this project",
         )
 
     prompts = prompt_manager.get_project_prompts(project.id)
+    usernames.add_from([project]).add_from(prompts).resolve()
 
     return templates.TemplateResponse(
         "projects/detail.html",
@@ -125,9 +139,7 @@ async def project_detail_page(
                     if project.updated_at
                     else None
                 ),
-                "created_by": (
-                    project.creator.username if project.creator else "Unknown"
-                ),
+                "created_by": usernames.get(project.created_by),
                 "prompts": [
                     {
                         "id": str(prompt.id),
@@ -140,16 +152,8 @@ async def project_detail_page(
                             if prompt.updated_at
                             else None
                         ),
-                        "created_by": (
-                            prompt.creator.username
-                            if hasattr(prompt, "creator") and prompt.creator
-                            else "Unknown"
-                        ),
-                        "updated_by": (
-                            prompt.updater.username
-                            if hasattr(prompt, "updater") and prompt.updater
-                            else "Unknown"
-                        ),
+                        "created_by": usernames.get(prompt.created_by),
+                        "updated_by": usernames.get(prompt.updated_by),
                         "enabled": (
                             prompt.is_active if hasattr(prompt, "is_active") else True
                         ),
@@ -267,6 +271,7 @@ async def update_project(
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
     activity_manager: ActivityManager = Depends(get_activity_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Update a project"""
     try:
@@ -285,7 +290,7 @@ async def update_project(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this project",
@@ -299,6 +304,7 @@ async def update_project(
     if error:
         # Return to the project details page with an error message
         prompts = prompt_manager.get_project_prompts(project_uuid)
+        usernames.add_from([project]).add_from(prompts).resolve()
         return templates.TemplateResponse(
             "projects/detail.html",
             {
@@ -314,9 +320,7 @@ async def update_project(
                         if project.updated_at
                         else None
                     ),
-                    "created_by": (
-                        project.creator.username if project.creator else "Unknown"
-                    ),
+                    "created_by": usernames.get(project.created_by),
                     "prompts": [
                         {
                             "id": str(prompt.id),
@@ -328,16 +332,8 @@ async def update_project(
                                 if prompt.updated_at
                                 else None
                             ),
-                            "created_by": (
-                                prompt.creator.username
-                                if hasattr(prompt, "creator") and prompt.creator
-                                else "Unknown"
-                            ),
-                            "updated_by": (
-                                prompt.updater.username
-                                if hasattr(prompt, "updater") and prompt.updater
-                                else "Unknown"
-                            ),
+                            "created_by": usernames.get(prompt.created_by),
+                            "updated_by": usernames.get(prompt.updated_by),
                             "enabled": (
                                 prompt.is_active
                                 if hasattr(prompt, "is_active")
@@ -387,6 +383,7 @@ async def delete_project_form(
     project_id: str,
     project_manager: ProjectManager = Depends(get_project_manager),
     activity_manager: ActivityManager = Depends(get_activity_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Handle form-based deletion for projects (for HTML forms that can't use DELETE method)"""
     try:
@@ -405,14 +402,15 @@ async def delete_project_form(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_manage_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this project",
         )
 
-    # Delete the project
-    success = project_manager.delete_project(project_uuid)
+    # Delete the project (large projects are deleted by a background job)
+    project_name = project.name
+    success = project_manager.delete_project(project_uuid, deleted_by=user_id)
 
     if not success:
         # Return to the project details page with an error message
@@ -431,9 +429,7 @@ async def delete_project_form(
                         if project.updated_at
                         else None
                     ),
-                    "created_by": (
-                        project.creator.username if project.creator else "Unknown"
-                    ),
+                    "created_by": usernames.get(project.created_by),
                 },
                 "error": "Failed to delete project",
             },
@@ -443,7 +439,7 @@ async def delete_project_form(
     activity_manager.create_activity(
         user_id=user_id,
         activity_type=ActivityType.DELETE_PROJECT,
-        details={"project_id": str(project_uuid), "name": project.name},
+        details={"project_id": str(project_uuid), "name": project_name},
     )
 
     # Redirect to the projects list page
@@ -472,6 +468,7 @@ async def create_prompt(
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
     activity_manager: ActivityManager = Depends(get_activity_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Create a new prompt within a project"""
     try:
@@ -489,7 +486,7 @@ async def create_prompt(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create prompts in this project",
@@ -523,9 +520,7 @@ async def create_prompt(
                         if project.updated_at
                         else None
                     ),
-                    "created_by": (
-                        project.creator.username if project.creator else "Unknown"
-                    ),
+                    "created_by": usernames.get(project.created_by),
                 },
                 "error": error,
                 "form_data": {
@@ -553,6 +548,58 @@ async def create_prompt(
     )
 
 
+def version_history(prompt: Any, prompt_uuid: uuid.UUID, usernames: UsernameResolver) -> List[Dict[str, Any]]:
+    """Rows of the prompt detail page's version history, newest first"""
+    debug = logger.isEnabledFor(logging.DEBUG)
+    versions = []
+    if hasattr(prompt, "versions") and prompt.versions:
+        logger.info(
+            "Processing %d versions for prompt %s", len(prompt.versions), prompt_uuid
+        )
+
+        for i, version in enumerate(prompt.versions):
+            # Debug log for each version
+            if debug:
+                logger.debug(
+                    "Version %d: id=%s, version=%s, parent_id=%s, name=%s, is_active=%s",
+                    i + 1, version.id, version.version,
+                    version.parent_id if hasattr(version, 'parent_id') else 'N/A',
+                    version.name, getattr(version, 'is_active', None)
+                )
+
+            versions.append(
+                {
+                    "id": str(version.id),
+                    "version": version.version,
+                    "name": version.name,
+                    "created_at": format_relative_time(version.created_at),
+                    "created_by": usernames.get(version.created_by),
+                    "updated_at": (
+                        format_relative_time(version.updated_at)
+                        if version.updated_at
+                        else None
+                    ),
+                    "updated_by": usernames.get(version.updated_by, None),
+                    "is_active": (
+                        version.is_active if hasattr(version, "is_active") else False
+                    ),
+                }
+            )
+        # Sort versions by version number (descending)
+        versions.sort(key=lambda v: v["version"], reverse=True)
+        logger.debug("Sorted %d versions by version number", len(versions))
+
+        # Additional debug info about version counting
+        logger.debug(
+            "prompt.versions count: %d, processed versions count: %d", len(prompt.versions), len(versions)
+        )
+        logger.debug("Versions in array: %s", lazy(lambda: [v['version'] for v in versions]))
+    else:
+        logger.info("No versions found for prompt %s", prompt_uuid)
+
+    return versions
+
+
 @router.get("/{project_id}/prompts/{prompt_id}", response_class=HTMLResponse)
 @require_auth()
 async def project_prompt_detail(
@@ -561,15 +608,17 @@ async def project_prompt_detail(
     prompt_id: str,
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
+    comment_manager: CommentManager = Depends(get_comment_manager),
 ):
     """View a specific prompt within a project"""
     logger.info(
-        f"Accessing prompt detail view: project_id={project_id}, prompt_id={prompt_id}"
+        "Accessing prompt detail view: project_id=%s, prompt_id=%s", project_id, prompt_id
     )
 
     try:
         project_uuid = uuid.UUID(project_id)
-        logger.debug(f"Valid project UUID: {project_uuid}")
+        logger.debug("Valid project UUID: %s", project_uuid)
     except ValueError:
         logger.error(f"Invalid project ID format: {project_id}")
         raise HTTPException(
@@ -578,7 +627,7 @@ async def project_prompt_detail(
 
     try:
         prompt_uuid = uuid.UUID(prompt_id)
-        logger.debug(f"Valid prompt UUID: {prompt_uuid}")
+        logger.debug("Valid prompt UUID: %s", prompt_uuid)
     except ValueError:
         logger.error(f"Invalid prompt ID format: {prompt_id}")
         raise HTTPException(
@@ -587,7 +636,7 @@ async def project_prompt_detail(
 
     # Verify project ownership
     user_id = uuid.UUID(request.session["user_id"])
-    logger.debug(f"User ID: {user_id}")
+    logger.debug("User ID: %s", user_id)
     project = project_manager.get_project(project_uuid)
     if not project:
         logger.error(f"Project not found: {project_uuid}")
@@ -595,9 +644,9 @@ async def project_prompt_detail(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_view_project(project):
         logger.warning(
-            f"Unauthorized access attempt to project {project_uuid} by user {user_id}"
+            "Unauthorized access attempt to project %s by user %s", project_uuid, user_id
         )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -605,8 +654,8 @@ async def project_prompt_detail(
         )
 
     # Get the prompt
-    logger.debug(f"Fetching prompt: {prompt_uuid}")
-    prompt = prompt_manager.get_prompt(prompt_uuid)
+    logger.debug("Fetching prompt: %s", prompt_uuid)
+    prompt = prompt_manager.get(prompt_uuid)
     if not prompt:
         logger.error(f"Prompt not found: {prompt_uuid}")
         raise HTTPException(
@@ -622,68 +671,21 @@ async def project_prompt_detail(
         )
 
     logger.debug(
-        f"Prompt found: id={prompt.id}, name={prompt.name}, version={getattr(prompt, 'version', 'N/A')}"
+        "Prompt found: id=%s, name=%s, version=%s", prompt.id, prompt.name, getattr(prompt, 'version', 'N/A')
     )
-    logger.debug(f"Prompt has versions attribute: {hasattr(prompt, 'versions')}")
+    # Version metadata only; the compare tab fetches diffs on demand
+    prompt.versions = prompt_manager.get_family_versions(prompt.id) or [prompt]
+    logger.debug("Prompt has versions attribute: %s", hasattr(prompt, 'versions'))
     if hasattr(prompt, "versions"):
-        logger.debug(f"Prompt versions count: {len(prompt.versions)}")
+        logger.debug("Prompt versions count: %d", len(prompt.versions))
 
-    # Process version history if available
-    versions = []
-    if hasattr(prompt, "versions") and prompt.versions:
-        logger.info(
-            f"Processing {len(prompt.versions)} versions for prompt {prompt_uuid}"
-        )
-
-        # Debug log for each version
-        for i, version in enumerate(prompt.versions):
-            logger.debug(
-                f"Version {i+1}: id={version.id}, version={version.version}, "
-                + f"parent_id={version.parent_id if hasattr(version, 'parent_id') else 'N/A'}, "
-                + f"name={version.name}, is_active={getattr(version, 'is_active', None)}"
-            )
+    # Resolve every creator/updater on the page with a single query
+    usernames.add_from([project, prompt]).add_from(getattr(prompt, "versions", None) or []).resolve()
 
-            versions.append(
-                {
-                    "id": str(version.id),
-                    "version": version.version,
-                    "name": version.name,
-                    "system_prompt": version.system_prompt,
-                    "user_prompt": version.user_prompt,
-                    "created_at": format_relative_time(version.created_at),
-                    "created_by": (
-                        version.creator.username
-                        if hasattr(version, "creator") and version.creator
-                        else "Unknown"
-                    ),
-                    "updated_at": (
-                        format_relative_time(version.updated_at)
-                        if version.updated_at
-                        else None
-                    ),
-                    "updated_by": (
-                        version.updater.username
-                        if hasattr(version, "updater") and version.updater
-                        else None
-                    ),
-                    "is_active": (
-                        version.is_active if hasattr(version, "is_active") else False
-                    ),
-                }
-            )
-        # Sort versions by version number (descending)
-        versions.sort(key=lambda v: v["version"], reverse=True)
-        logger.debug(f"Sorted {len(versions)} versions by version number")
-
-        # Additional debug info about version counting
-        logger.debug(
-            f"prompt.versions count: {len(prompt.versions)}, processed versions count: {len(versions)}"
-        )
-        logger.debug(f"Versions in array: {[v['version'] for v in versions]}")
-    else:
-        logger.info(f"No versions found for prompt {prompt_uuid}")
+    # Process version history if available
+    versions = version_history(prompt, prompt_uuid, usernames)
 
-    logger.info(f"Rendering prompt detail template with {len(versions)} versions")
+    logger.info("Rendering prompt detail template with %d versions", len(versions))
     # Calculate token counts
     token_counts = count_prompt_tokens({
         "system_prompt": prompt.system_prompt,
@@ -694,7 +696,7 @@ async def project_prompt_detail(
     # Log whether the prompt is active
     is_active = getattr(prompt, "is_active", None)
     logger.debug(
-        f"Current prompt is_active status: {is_active} (type: {type(is_active)})"
+        "Current prompt is_active status: %s (type: %s)", is_active, type(is_active)
     )
 
     return templates.TemplateResponse(
@@ -712,9 +714,7 @@ async def project_prompt_detail(
                     if project.updated_at
                     else None
                 ),
-                "created_by": (
-                    project.creator.username if project.creator else "Unknown"
-                ),
+                "created_by": usernames.get(project.created_by),
             },
             "prompt": {
                 "id": str(prompt.id),
@@ -728,16 +728,8 @@ async def project_prompt_detail(
                     if prompt.updated_at
                     else None
                 ),
-                "created_by": (
-                    prompt.creator.username
-                    if hasattr(prompt, "creator") and prompt.creator
-                    else "Unknown"
-                ),
-                "updated_by": (
-                    prompt.updater.username
-                    if hasattr(prompt, "updater") and prompt.updater
-                    else "Unknown"
-                ),
+                "created_by": usernames.get(prompt.created_by),
+                "updated_by": usernames.get(prompt.updated_by),
                 "enabled": prompt.is_active if hasattr(prompt, "is_active") else True,
                 "is_active": prompt.is_active if hasattr(prompt, "is_active") else None,
                 "version": prompt.version,
@@ -756,6 +748,8 @@ async def project_prompt_detail(
                 "system_tokens": token_counts["system_tokens"],
                 "user_tokens": token_counts["user_tokens"]
             },
+            # First window of the thread; comments.js polls from its since cursor
+            "thread": comment_manager.get_prompt_thread(prompt.id),
         },
     )
 
@@ -773,6 +767,7 @@ async def update_prompt(
     project_manager: ProjectManager = Depends(get_project_manager),
     prompt_manager: PromptManager = Depends(get_prompt_manager),
     activity_manager: ActivityManager = Depends(get_activity_manager),
+    usernames: UsernameResolver = Depends(get_username_resolver),
 ):
     """Update a prompt"""
     try:
@@ -797,7 +792,7 @@ async def update_prompt(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to modify this project",
@@ -832,6 +827,7 @@ async def update_prompt(
 
     if error:
         # Return to the prompt detail page with an error message
+        usernames.add_from([project, prompt]).resolve()
         return templates.TemplateResponse(
             "prompts/detail.html",
             {
@@ -847,9 +843,7 @@ async def update_prompt(
                         if project.updated_at
                         else None
                     ),
-                    "created_by": (
-                        project.creator.username if project.creator else "Unknown"
-                    ),
+                    "created_by": usernames.get(project.created_by),
                 },
                 "prompt": {
                     "id": str(prompt.id),
@@ -863,16 +857,8 @@ async def update_prompt(
                         if prompt.updated_at
                         else None
                     ),
-                    "created_by": (
-                        prompt.creator.username
-                        if hasattr(prompt, "creator") and prompt.creator
-                        else "Unknown"
-                    ),
-                    "updated_by": (
-                        prompt.updater.username
-                        if hasattr(prompt, "updater") and prompt.updater
-                        else "Unknown"
-                    ),
+                    "created_by": usernames.get(prompt.created_by),
+                    "updated_by": usernames.get(prompt.updated_by),
                     "enabled": (
                         prompt.is_active if hasattr(prompt, "is_active") else True
                     ),
@@ -938,14 +924,13 @@ async def prompt_use_page(
         )
 
     # Verify project ownership
-    user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(project_uuid)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this project",
@@ -1042,7 +1027,7 @@ async def toggle_prompt_enabled(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to modify this project",
@@ -1114,7 +1099,7 @@ async def set_prompt_active(
 ):
     """Set a prompt version as active"""
     logger.info(
-        f"Setting prompt as active: project_id={project_id}, prompt_id={prompt_id}, version={version}"
+        "Setting prompt as active: project_id=%s, prompt_id=%s, version=%s", project_id, prompt_id, version
     )
 
     try:
@@ -1142,7 +1127,7 @@ async def set_prompt_active(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.created_by != user_id:
+    if not get_request_access(request).can_edit_project(project):
         logger.warning(
             f"Unauthorized attempt to modify project {project_uuid} by user {user_id}"
         )
@@ -1169,13 +1154,15 @@ async def set_prompt_active(
 
     # Get all versions related to this prompt (including parent, siblings, and children at any level)
     all_related_prompts = prompt.versions if hasattr(prompt, "versions") else [prompt]
-    logger.debug(f"Found {len(all_related_prompts)} related prompts")
+    logger.debug("Found %d related prompts", len(all_related_prompts))
 
     # Debug log all versions
-    for i, related in enumerate(all_related_prompts):
-        logger.debug(
-            f"Related prompt {i+1}: id={related.id}, version={related.version}, is_active={getattr(related, 'is_active', False)}"
-        )
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, related in enumerate(all_related_prompts):
+            logger.debug(
+                "Related prompt %d: id=%s, version=%s, is_active=%s",
+                i + 1, related.id, related.version, getattr(related, 'is_active', False)
+            )
 
     # First, deactivate all related prompts
     for related in all_related_prompts:
@@ -1185,7 +1172,7 @@ async def set_prompt_active(
             and related.is_active
         ):
             logger.debug(
-                f"Deactivating prompt: {related.id} (version {related.version})"
+                "Deactivating prompt: %s (version %s)", related.id, related.version
             )
             updated_related, error = prompt_manager.update_prompt(
                 prompt_id=related.id, is_active=False, updated_by=user_id
@@ -1195,7 +1182,7 @@ async def set_prompt_active(
                 logger.error(f"Failed to deactivate prompt {related.id}: {error}")
 
     # Set the current prompt as active
-    logger.info(f"Setting prompt {prompt.id} (version {prompt.version}) as active")
+    logger.info("Setting prompt %s (version %s) as active", prompt.id, prompt.version)
     updated_prompt, error = prompt_manager.update_prompt(
         prompt_id=prompt.id, is_active=True, updated_by=user_id
     )
@@ -1,24 +1,36 @@
 """
 Prompts API routes
 """
-from fastapi import APIRouter, Request, HTTPException, status, Depends
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Request, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import IO, List, Dict, Any, Optional
 from datetime import datetime
+import io
+import tempfile
 import uuid
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import db, get_db
 from app.managers.prompt_manager import PromptManager
 from app.managers.project_manager import ProjectManager
 from app.managers.activity_manager import ActivityManager
+from app.managers.comment_manager import CommentManager
 from app.db import models
 from app.models.activity import ActivityType
 from app.models.prompt import PromptCreate, PromptUpdate, PromptResponse
-from app.dependencies.auth import require_auth
+from app.dependencies.auth import require_auth, get_request_access
+from app.exceptions import InvalidCursorError
+from app.services.events import event_broker, prompt_channel
+from app.services.prompt_diff import GRANULARITIES, diff_versions, version_metadata
+from app.services.prompt_import import FORMATS as IMPORT_FORMATS, detect_format, import_bundle
 
 # Create router
 router = APIRouter(tags=["prompts-api"])
 
+# Import bodies larger than this are spooled to disk as they are received
+IMPORT_SPOOL_BYTES = 1024 * 1024
+
 def get_prompt_manager() -> PromptManager:
     """Dependency to get prompt manager instance"""
     return PromptManager()
@@ -31,6 +43,40 @@ def get_activity_manager() -> ActivityManager:
     """Dependency to get activity manager instance"""
     return ActivityManager()
 
+def get_comment_manager() -> CommentManager:
+    """Dependency to get comment manager instance"""
+    return CommentManager()
+
+def _get_readable_prompt(
+    request: Request,
+    prompt_id: str,
+    prompt_manager: PromptManager,
+    project_manager: ProjectManager
+) -> models.Prompt:
+    """Load a prompt and verify the current user can read its project"""
+    try:
+        prompt_uuid = uuid.UUID(prompt_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid prompt ID format"
+        )
+
+    prompt = prompt_manager.get(prompt_uuid)
+    if not prompt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prompt not found"
+        )
+
+    project = project_manager.get_project(prompt.project_id)
+    if not project or not get_request_access(request).can_view_project(project):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this prompt"
+        )
+    return prompt
+
 @router.get("", response_model=List[PromptResponse])
 @require_auth()
 async def get_prompts(
@@ -46,7 +92,7 @@ async def get_prompts(
         try:
             project_uuid = uuid.UUID(project_id)
             project = project_manager.get_project(project_uuid)
-            if not project or project.user_id != user_id:
+            if not project or not get_request_access(request).can_view_project(project):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to access this project"
@@ -78,7 +124,7 @@ async def create_prompt(
     try:
         project_uuid = uuid.UUID(prompt_data.project_id)
         project = project_manager.get_project(project_uuid)
-        if not project or project.user_id != user_id:
+        if not project or not get_request_access(request).can_edit_project(project):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to create prompts in this project"
@@ -105,6 +151,51 @@ async def create_prompt(
     
     return PromptResponse.from_orm(prompt)
 
+def _import_spooled(spool: IO[bytes], user_id: uuid.UUID, **kwargs: Any) -> Dict[str, Any]:
+    """Import a spooled request body; runs on a worker thread with a session of its own."""
+    session = db.new_session()
+    try:
+        return import_bundle(session, io.TextIOWrapper(spool, encoding="utf-8-sig"), user_id, **kwargs)
+    finally:
+        db.close_session(session)
+
+@router.post("/import")
+@require_auth()
+async def import_prompts(
+    request: Request,
+    format: Optional[str] = Query(None, description="Bundle format: json, ndjson or yaml (default: from Content-Type)"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Prompts committed per batch"),
+    dry_run: bool = Query(False, description="Validate the bundle without writing anything")
+):
+    """Bulk import projects, prompts and version histories from the request body"""
+    fmt = format or detect_format(content_type=request.headers.get("content-type"))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    access = get_request_access(request)
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            # The import parses and writes synchronously, so keep it off the event loop
+            return await run_in_threadpool(
+                _import_spooled,
+                spool,
+                uuid.UUID(request.session["user_id"]),
+                fmt=fmt,
+                access=access,
+                batch_size=batch_size,
+                dry_run=dry_run
+            )
+        except (UnicodeDecodeError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid bundle: {str(e)}"
+            )
+
 @router.get("/{prompt_id}", response_model=PromptResponse)
 @require_auth()
 async def get_prompt(
@@ -130,9 +221,8 @@ async def get_prompt(
         )
     
     # Verify project ownership
-    user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(prompt.project_id)
-    if not project or project.user_id != user_id:
+    if not project or not get_request_access(request).can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this prompt"
@@ -169,7 +259,7 @@ async def update_prompt(
     # Verify project ownership
     user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(prompt.project_id)
-    if not project or project.user_id != user_id:
+    if not project or not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this prompt"
@@ -219,7 +309,7 @@ async def delete_prompt(
     # Verify project ownership
     user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(prompt.project_id)
-    if not project or project.user_id != user_id:
+    if not project or not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this prompt"
@@ -235,4 +325,154 @@ async def delete_prompt(
     # Delete prompt
     prompt_manager.delete_prompt(prompt_uuid)
     
-    return {"message": "Prompt deleted successfully"} 
\ No newline at end of file
+    return {"message": "Prompt deleted successfully"} 
+
+@router.get("/{prompt_id}/versions")
+@require_auth()
+async def get_prompt_versions(
+    request: Request,
+    prompt_id: str,
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager)
+):
+    """List the versions of a prompt's family without their texts"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    versions = prompt_manager.get_family_versions(prompt.id)
+    return {"versions": [dict(version_metadata(version), name=version.name) for version in versions]}
+
+@router.get("/{prompt_id}/diff")
+@require_auth()
+async def get_prompt_diff(
+    request: Request,
+    prompt_id: str,
+    base: str = Query(..., description="ID of the older version"),
+    target: str = Query(..., description="ID of the newer version"),
+    granularity: str = Query("line", description="Diff granularity: line or word"),
+    context: int = Query(3, ge=0, le=20, description="Unchanged lines around each line hunk"),
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager)
+):
+    """Diff two versions of a prompt's family"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid granularity, expected one of: {', '.join(GRANULARITIES)}"
+        )
+    try:
+        base_uuid, target_uuid = uuid.UUID(base), uuid.UUID(target)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid version ID format"
+        )
+
+    # Texts stay deferred and are only loaded when the pair is not cached
+    family = {version.id: version for version in prompt_manager.get_family_versions(prompt.id)}
+    if base_uuid not in family or target_uuid not in family:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Version not found in this prompt's history"
+        )
+    return diff_versions(family[base_uuid], family[target_uuid], granularity=granularity, context=context)
+
+@router.get("/{prompt_id}/comments")
+@require_auth()
+async def get_prompt_comments(
+    request: Request,
+    prompt_id: str,
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous window"),
+    limit: int = Query(20, ge=1, le=100, description="Comments per window"),
+    reply_preview: int = Query(3, ge=0, le=20, description="Replies included per comment"),
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager),
+    comment_manager: CommentManager = Depends(get_comment_manager)
+):
+    """Get a window of a prompt's comments, pinned first, with reply counts and previews"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    try:
+        return comment_manager.get_prompt_thread(
+            prompt.id,
+            cursor=cursor,
+            limit=limit,
+            reply_preview=reply_preview
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/{prompt_id}/comments/new")
+@require_auth()
+async def get_new_prompt_comments(
+    request: Request,
+    prompt_id: str,
+    since: Optional[str] = Query(None, description="Cursor returned as since by the previous call"),
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of new comments"),
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager),
+    comment_manager: CommentManager = Depends(get_comment_manager)
+):
+    """Get comments created since a cursor, for cheap polling"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    try:
+        return comment_manager.get_new_comments(prompt.id, since=since, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/{prompt_id}/comments/{comment_id}/replies")
+@require_auth()
+async def get_comment_replies(
+    request: Request,
+    prompt_id: str,
+    comment_id: str,
+    cursor: Optional[str] = Query(None, description="Cursor returned as replies_cursor or next_cursor"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of replies"),
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager),
+    comment_manager: CommentManager = Depends(get_comment_manager)
+):
+    """Get further replies of a comment beyond its preview"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    try:
+        comment_uuid = uuid.UUID(comment_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid comment ID format"
+        )
+
+    comment = comment_manager.get_comment(comment_uuid)
+    if not comment or comment.prompt_id != prompt.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+
+    try:
+        replies = comment_manager.get_comment_replies(comment_uuid, cursor=cursor, limit=limit + 1)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    has_more = len(replies) > limit
+    replies = replies[:limit]
+
+    usernames = comment_manager.get_username_resolver()
+    usernames.add_from(replies, fields=("created_by",)).resolve()
+    return {
+        "replies": [comment_manager.format_reply_data(reply, usernames=usernames) for reply in replies],
+        "next_cursor": comment_manager.since_cursor(replies[-1]) if has_more else None
+    }
+
+@router.get("/{prompt_id}/events")
+@require_auth()
+async def prompt_events(
+    request: Request,
+    prompt_id: str,
+    prompt_manager: PromptManager = Depends(get_prompt_manager),
+    project_manager: ProjectManager = Depends(get_project_manager)
+):
+    """Stream comment, reply and version events for a prompt as server-sent events"""
+    prompt = _get_readable_prompt(request, prompt_id, prompt_manager, project_manager)
+    return StreamingResponse(
+        event_broker.stream(request, prompt_channel(prompt.id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -10,10 +10,11 @@ import uuid
 from app.managers.prompt_manager import PromptManager
 from app.managers.project_manager import ProjectManager
 from app.managers.activity_manager import ActivityManager
+from app.managers.comment_manager import CommentManager
 from app.db import models
 from app.models.activity import ActivityType
-from app.dependencies.auth import require_auth
-from app.managers.user_manager import UserManager
+from app.dependencies.auth import require_auth, get_request_access
+from app.managers.user_manager import UsernameResolver
 from app.utils.format_date import format_relative_time
 
 # Create router
@@ -31,6 +32,10 @@ def get_activity_manager() -> ActivityManager:
     """Dependency to get activity manager instance"""
     return ActivityManager()
 
+def get_comment_manager() -> CommentManager:
+    """Dependency to get comment manager instance"""
+    return CommentManager()
+
 @router.get("", response_class=HTMLResponse)
 @require_auth()
 async def prompts_page(
@@ -44,13 +49,12 @@ async def prompts_page(
 ):
     """Render the prompts list page"""
     user_id = uuid.UUID(request.session["user_id"])
-    user_manager = UserManager()
     
     if project_id:
         try:
             project_uuid = uuid.UUID(project_id)
             project = project_manager.get_project(project_uuid)
-            if not project or project.user_id != user_id:
+            if not project or not get_request_access(request).can_view_project(project):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to access this project"
@@ -62,8 +66,8 @@ async def prompts_page(
                 detail="Invalid project ID format"
             )
     else:
-        # Show all prompts created by the user, irrespective of project
-        prompts = [p for p in prompt_manager.get_all_prompts() if str(p.created_by) == str(user_id)]
+        # Show all prompts in projects the user can access, irrespective of project
+        prompts = prompt_manager.get_accessible_prompts(user_id)
         project = None
     
     # --- Search ---
@@ -89,14 +93,18 @@ async def prompts_page(
     elif sort == "created_desc":
         prompts = sorted(prompts, key=lambda p: p.created_at, reverse=True)
     
+    # Resolve project names and creator usernames for all rows at once
+    project_ids = {prompt.project_id for prompt in prompts}
+    project_names = {
+        p.id: p.name
+        for p in project_manager.get_query().filter(models.Project.id.in_(project_ids))
+    } if project_ids else {}
+    usernames = UsernameResolver().add_from(prompts, fields=("created_by",)).resolve()
+
     prompt_dicts = []
     for prompt in prompts:
-        # Get project name
-        project_obj = project_manager.get_project(prompt.project_id)
-        project_name = project_obj.name if project_obj else "Unknown Project"
-        # Get creator username
-        creator = user_manager.get_user(prompt.created_by)
-        created_by = creator.username if creator else "Unknown"
+        project_name = project_names.get(prompt.project_id, "Unknown Project")
+        created_by = usernames.get(prompt.created_by)
         # Get variables (if attribute exists)
         variables = getattr(prompt, "variables", [])
         prompt_dicts.append({
@@ -140,9 +148,8 @@ async def create_prompt_page(
         )
     
     # Verify project ownership
-    user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(project_uuid)
-    if not project or project.created_by != user_id:
+    if not project or not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create prompts in this project"
@@ -185,7 +192,7 @@ async def create_prompt(
     # Verify project ownership
     user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(project_uuid)
-    if not project or project.created_by != user_id:
+    if not project or not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to create prompts in this project"
@@ -264,9 +271,8 @@ async def edit_prompt_page(
         )
     
     # Verify project ownership
-    user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(prompt.project_id)
-    if not project or project.created_by != user_id:
+    if not project or not get_request_access(request).can_edit_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to edit this prompt"
@@ -297,7 +303,8 @@ async def prompt_detail_page(
     request: Request,
     prompt_id: str,
     prompt_manager: PromptManager = Depends(get_prompt_manager),
-    project_manager: ProjectManager = Depends(get_project_manager)
+    project_manager: ProjectManager = Depends(get_project_manager),
+    comment_manager: CommentManager = Depends(get_comment_manager)
 ):
     """Render the prompt detail page"""
     try:
@@ -316,9 +323,8 @@ async def prompt_detail_page(
         )
     
     # Verify project ownership
-    user_id = uuid.UUID(request.session["user_id"])
     project = project_manager.get_project(prompt.project_id)
-    if not project or project.created_by != user_id:
+    if not project or not get_request_access(request).can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this prompt"
@@ -341,6 +347,7 @@ async def prompt_detail_page(
                 "content": prompt.content,
                 "created_at": prompt.created_at,
                 "updated_at": prompt.updated_at
-            }
+            },
+            "thread": comment_manager.get_prompt_thread(prompt.id)
         }
     ) 
\ No newline at end of file
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Request, Depends, Query
+import uuid
 from app.templates import templates
 from typing import Optional
 from app.dependencies.auth import require_auth
@@ -20,6 +21,7 @@ async def search(
     with session_scope() as session:
         search_manager = SearchManager(session)
         projects, prompts, pagination = search_manager.search(
+            user_id=uuid.UUID(request.session["user_id"]),
             query=q,
             search_type=type,
             page=page,
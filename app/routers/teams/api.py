@@ -2,6 +2,7 @@
 Teams API routes
 """
 from fastapi import APIRouter, Request, HTTPException, status, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime
@@ -19,6 +20,7 @@ from app.models.activity import ActivityType
 from app.managers.team_manager import TeamManager
 from app.managers.activity_manager import ActivityManager
 from app.managers.user_manager import UserManager
+from app.services.project_export import stream_export, team_project_ids
 
 # Create router
 router = APIRouter(tags=["teams-api"])
@@ -176,17 +178,23 @@ async def delete_team(
     
     # Get team name for logging
     team = team_manager.get_team(team_id)
+    team_name = team.name
     
-    # Delete team
-    team_manager.delete_team(team_id)
+    # Delete team; large teams are deleted by a background job
+    job = team_manager.request_team_deletion(team_id, deleted_by=user_id)
     
     # Log activity
     activity_manager.create(
         type=ActivityType.TEAM_DELETED,
-        description=f"Deleted team: {team.name}",
+        description=f"Deleted team: {team_name}",
         user_id=user_id
     )
     
+    if job:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Team deletion started", "job_id": str(job.id)}
+        )
     return {"message": "Team deleted successfully"}
 
 @router.post("/{team_id}/members", response_model=TeamMemberResponse)
@@ -399,4 +407,33 @@ async def add_project_to_team(
         "created_by": str(project.created_by),
         "created_at": project.created_at,
         "updated_at": project.updated_at
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/{team_id}/export")
+@require_auth()
+async def export_team(
+    request: Request,
+    team_id: str,
+    team_manager: TeamManager = Depends(get_team_manager)
+):
+    """Download every project of a team as a gzipped NDJSON bundle"""
+    user_id = uuid.UUID(request.session["user_id"])
+    team = team_manager.get_team(team_id)
+    if not team:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Team not found"
+        )
+    if not team_manager.is_team_member(team_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this team"
+        )
+
+    project_ids = team_project_ids(team_manager._db, team.id)
+    filename = f"team-{team.id}-{datetime.utcnow():%Y%m%d%H%M%S}.ndjson.gz"
+    return StreamingResponse(
+        stream_export(project_ids),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -39,25 +39,15 @@ async def teams_page(
         if not current_user:
             raise HTTPException(status_code=401, detail="Not authenticated")
             
-        # Get user's teams
-        teams = team_manager.get_user_teams(current_user.id)
-        
-        # Get team members and projects for each team
-        team_details = []
-        for team in teams:
-            members = team_manager.get_team_members(team.id)
-            projects = team_manager.get_team_projects(team.id)
-            team_details.append({
-                "team": team,
-                "members": members,
-                "projects": projects
-            })
+        # Teams with member/project counts and the user's role, loaded in bulk
+        teams = team_manager.get_user_team_overview(current_user.id)
             
         return templates.TemplateResponse(
-            "teams/list.html",
+            "teams.html",
             {
                 "request": request,
-                "teams": team_details,
+                "teams": teams,
+                "is_my_teams": False,
                 "current_user": current_user
             }
         )
@@ -78,27 +68,15 @@ async def my_teams_page(
         if not current_user:
             raise HTTPException(status_code=401, detail="Not authenticated")
             
-        # Get user's teams
-        teams = team_manager.get_user_teams(current_user.id)
-        
-        # Get team details for each team
-        team_details = []
-        for team in teams:
-            members = team_manager.get_team_members(team.id)
-            projects = team_manager.get_team_projects(team.id)
-            permissions = team_manager.check_team_permissions(team.id, current_user.id)
-            team_details.append({
-                "team": team,
-                "members": members,
-                "projects": projects,
-                "permissions": permissions
-            })
+        # Teams with member/project counts, permissions and the user's role, loaded in bulk
+        teams = team_manager.get_user_team_overview(current_user.id)
             
         return templates.TemplateResponse(
-            "teams/my_teams.html",
+            "teams.html",
             {
                 "request": request,
-                "teams": team_details,
+                "teams": teams,
+                "is_my_teams": True,
                 "current_user": current_user
             }
         )
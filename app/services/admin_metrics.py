@@ -0,0 +1,133 @@
+"""
+Admin dashboard metrics for Promptlane.
+
+Totals are computed with COUNT queries rather than by loading entities.
+For tables whose planner estimate (``pg_class.reltuples``) exceeds
+``settings.METRICS.EXACT_COUNT_THRESHOLD`` the estimate itself is returned,
+since an exact COUNT(*) has to scan the whole table. Storage figures come
+from the latest ``storage_stats`` snapshot. Period-over-period
+changes compare rows created in the last N days with the N days before.
+
+Computed stats are cached in-process for ``settings.METRICS.CACHE_TTL``
+seconds so dashboard refreshes do not re-run the queries.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.db.database import db
+from app.services.storage_stats import StorageAccounting
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Minimal thread-safe TTL cache for computed values."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._values: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+        value = compute()
+        with self._lock:
+            self._values[key] = (now, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+_cache = TTLCache(settings.METRICS.CACHE_TTL)
+
+
+class AdminMetrics:
+    """Counts, estimates and period deltas for the admin dashboard."""
+
+    def __init__(self, db_session: Optional[Session] = None):
+        self._db = db_session or db.get_session()
+
+    def estimated_rows(self, model: Type[Any]) -> int:
+        """Planner row estimate for a model's table, or -1 when unknown."""
+        estimate = self._db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": model.__tablename__}
+        ).scalar()
+        return int(estimate) if estimate is not None else -1
+
+    def total(self, model: Type[Any]) -> int:
+        """Row count of a table; estimated when the table is very large."""
+        try:
+            estimate = self.estimated_rows(model)
+            if estimate >= settings.METRICS.EXACT_COUNT_THRESHOLD:
+                return estimate
+        except Exception as e:
+            logger.warning(f"Could not read row estimate for {model.__tablename__}: {str(e)}")
+            self._db.rollback()
+        return self._db.query(func.count(model.id)).scalar() or 0
+
+    def created_between(self, model: Type[Any], start: datetime, end: datetime) -> int:
+        """Number of rows created in [start, end)."""
+        return self._db.query(func.count(model.id))\
+            .filter(model.created_at >= start, model.created_at < end)\
+            .scalar() or 0
+
+    def period_change(self, model: Type[Any], days: int = 30, now: Optional[datetime] = None) -> int:
+        """Percentage change of rows created in the last `days` versus the period before."""
+        now = now or datetime.utcnow()
+        current_start = now - timedelta(days=days)
+        current = self.created_between(model, current_start, now)
+        previous = self.created_between(model, current_start - timedelta(days=days), current_start)
+        if previous == 0:
+            return 100 if current else 0
+        return round((current - previous) * 100 / previous)
+
+    def active_users(self, days: int = 7) -> int:
+        """Distinct users with recorded activity in the last `days` days."""
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        return self._db.query(func.count(func.distinct(models.Activity.user_id)))\
+            .filter(models.Activity.timestamp >= cutoff)\
+            .scalar() or 0
+
+    def dashboard_stats(self, period_days: int = 30) -> Dict[str, Any]:
+        """All dashboard figures, cached for a short TTL."""
+        return _cache.get_or_compute(
+            f"dashboard:{period_days}",
+            lambda: self._compute_dashboard_stats(period_days)
+        )
+
+    def _compute_dashboard_stats(self, period_days: int) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "total_users": self.total(models.User),
+            "active_users": self.active_users(days=7),
+            "total_teams": self.total(models.Team),
+            "total_projects": self.total(models.Project),
+            "total_prompts": self.total(models.Prompt),
+            "user_change": self.period_change(models.User, period_days, now),
+            "project_change": self.period_change(models.Project, period_days, now),
+            "prompt_change": self.period_change(models.Prompt, period_days, now),
+            **StorageAccounting(self._db).usage(),
+            "period_days": period_days,
+            "generated_at": now.isoformat()
+        }
+
+
+def clear_metrics_cache() -> None:
+    """Drop cached metrics, e.g. after bulk imports."""
+    _cache.clear()
@@ -0,0 +1,219 @@
+"""
+Authorization service for Promptlane.
+
+A user's effective access is derived from two sources:
+
+- team membership: the member's ``TeamRole`` applies to the team and to
+  every project of that team (team creators count as owners);
+- project ownership: the creator of a project owns it.
+
+``AccessControlIndex`` captures all of that for one user with two small
+queries, after which every permission check is a dictionary lookup. Indexes
+are cached per process for ``settings.SECURITY.ACCESS_CACHE_TTL`` seconds and
+invalidated whenever ``TeamManager`` changes a membership. Invalidations are
+also published on the ``access`` event channel, so with the ``postgres``
+events backend every worker process drops its stale entries at once; with
+the ``memory`` backend other processes still wait for the TTL. An index
+that was being loaded while an invalidation happened is not cached.
+
+For list and search queries use ``accessible_projects_filter`` (or
+``AccessControlIndex.projects_filter``) so the database filters projects
+instead of Python filtering rows one by one.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import Project, Team, TeamMember, TeamRole
+from app.services.events import event_broker
+
+logger = logging.getLogger(__name__)
+
+
+class AccessLevel(IntEnum):
+    """Effective access levels, ordered so they can be compared."""
+    NONE = 0
+    VIEWER = 1
+    EDITOR = 2
+    ADMIN = 3
+    OWNER = 4
+
+
+ROLE_LEVELS: Dict[TeamRole, AccessLevel] = {
+    TeamRole.VIEWER: AccessLevel.VIEWER,
+    TeamRole.EDITOR: AccessLevel.EDITOR,
+    TeamRole.ADMIN: AccessLevel.ADMIN,
+    TeamRole.OWNER: AccessLevel.OWNER,
+}
+
+
+def _roles_at_least(level: AccessLevel) -> Tuple[TeamRole, ...]:
+    return tuple(role for role, role_level in ROLE_LEVELS.items() if role_level >= level)
+
+
+class AccessControlIndex:
+    """Precomputed team and project access of a single user."""
+
+    def __init__(self, user_id: uuid.UUID, team_levels: Dict[uuid.UUID, AccessLevel]):
+        self.user_id = user_id
+        self.team_levels = team_levels
+        self.created_at = time.monotonic()
+
+    @classmethod
+    def load(cls, session: Session, user_id: uuid.UUID) -> "AccessControlIndex":
+        """Build the index for a user from the database."""
+        team_levels: Dict[uuid.UUID, AccessLevel] = {}
+        memberships = session.query(TeamMember.team_id, TeamMember.role)\
+            .filter(TeamMember.user_id == user_id)\
+            .all()
+        for team_id, role in memberships:
+            team_levels[team_id] = max(team_levels.get(team_id, AccessLevel.NONE), ROLE_LEVELS[role])
+        for (team_id,) in session.query(Team.id).filter(Team.created_by == user_id).all():
+            team_levels[team_id] = AccessLevel.OWNER
+        return cls(user_id, team_levels)
+
+    def team_level(self, team_id: Optional[uuid.UUID]) -> AccessLevel:
+        """Get the user's access level on a team."""
+        if team_id is None:
+            return AccessLevel.NONE
+        return self.team_levels.get(team_id, AccessLevel.NONE)
+
+    def project_level(self, project: Any) -> AccessLevel:
+        """Get the user's access level on a project (needs `created_by` and `team_id`)."""
+        if project is None:
+            return AccessLevel.NONE
+        if project.created_by == self.user_id:
+            return AccessLevel.OWNER
+        return self.team_level(project.team_id)
+
+    def has_team_access(self, team_id: uuid.UUID, level: AccessLevel = AccessLevel.VIEWER) -> bool:
+        return self.team_level(team_id) >= level
+
+    def can_view_project(self, project: Any) -> bool:
+        return self.project_level(project) >= AccessLevel.VIEWER
+
+    def can_edit_project(self, project: Any) -> bool:
+        return self.project_level(project) >= AccessLevel.EDITOR
+
+    def can_manage_project(self, project: Any) -> bool:
+        return self.project_level(project) >= AccessLevel.ADMIN
+
+    def projects_filter(self, level: AccessLevel = AccessLevel.VIEWER):
+        """SQL filter for projects the user can access at `level`, using the known team ids."""
+        team_ids = [team_id for team_id, team_level in self.team_levels.items() if team_level >= level]
+        if not team_ids:
+            return Project.created_by == self.user_id
+        return or_(Project.created_by == self.user_id, Project.team_id.in_(team_ids))
+
+
+def accessible_projects_filter(user_id: uuid.UUID, level: AccessLevel = AccessLevel.VIEWER):
+    """
+    SQL filter for projects a user can access at `level`.
+
+    Expressed with subqueries so it can be used in any query that selects
+    or joins ``Project`` without loading the user's memberships first.
+    """
+    member_teams = select(TeamMember.team_id).where(
+        TeamMember.user_id == user_id,
+        TeamMember.role.in_(_roles_at_least(level))
+    )
+    created_teams = select(Team.id).where(Team.created_by == user_id)
+    return or_(
+        Project.created_by == user_id,
+        Project.team_id.in_(member_teams),
+        Project.team_id.in_(created_teams)
+    )
+
+
+ACCESS_CHANNEL = "access"
+
+
+class AccessIndexCache:
+    """Thread-safe TTL cache of access indexes keyed by user id."""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = settings.SECURITY.ACCESS_CACHE_TTL if ttl is None else ttl
+        self._entries: Dict[uuid.UUID, AccessControlIndex] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; indexes loaded across one are not stored
+        self._generation = 0
+
+    def get(self, session: Session, user_id: uuid.UUID) -> AccessControlIndex:
+        """Get a user's index, loading it if missing or expired."""
+        with self._lock:
+            index = self._entries.get(user_id)
+            generation = self._generation
+        if index is not None and time.monotonic() - index.created_at < self.ttl:
+            return index
+        index = AccessControlIndex.load(session, user_id)
+        if self.ttl > 0:
+            with self._lock:
+                if self._generation == generation:
+                    self._entries[user_id] = index
+        return index
+
+    def invalidate_users(self, user_ids: Iterable[uuid.UUID]) -> None:
+        user_ids = list(user_ids)
+        self._drop(None, user_ids)
+        self._broadcast(None, user_ids)
+
+    def invalidate_team(self, team_id: uuid.UUID, user_ids: Iterable[uuid.UUID] = ()) -> None:
+        """Drop cached indexes of `user_ids` and of every cached user that knows the team."""
+        user_ids = list(user_ids)
+        self._drop(team_id, user_ids)
+        self._broadcast(team_id, user_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _drop(self, team_id: Optional[uuid.UUID], user_ids: Iterable[uuid.UUID]) -> None:
+        with self._lock:
+            self._generation += 1
+            stale: Set[uuid.UUID] = set(user_ids)
+            if team_id is not None:
+                stale.update(
+                    user_id for user_id, index in self._entries.items() if team_id in index.team_levels
+                )
+            for user_id in stale:
+                self._entries.pop(user_id, None)
+
+    def _broadcast(self, team_id: Optional[uuid.UUID], user_ids: List[uuid.UUID]) -> None:
+        """Tell the other worker processes to drop the same entries."""
+        event_broker.publish([ACCESS_CHANNEL], "access.invalidated", {
+            "team_id": str(team_id) if team_id else None,
+            "user_ids": [str(user_id) for user_id in user_ids]
+        })
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Apply an invalidation published by any process, this one included."""
+        data = event.get("data") or {}
+        try:
+            team_id = uuid.UUID(data["team_id"]) if data.get("team_id") else None
+            user_ids = [uuid.UUID(user_id) for user_id in data.get("user_ids") or ()]
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed access invalidation: {str(e)}")
+            return
+        self._drop(team_id, user_ids)
+
+
+# Process-wide cache
+access_cache = AccessIndexCache()
+event_broker.add_listener(ACCESS_CHANNEL, access_cache.handle_event)
+
+
+def get_access_index(user_id: uuid.UUID, db_session: Optional[Session] = None) -> AccessControlIndex:
+    """Get the (cached) access index of a user."""
+    if db_session is None:
+        from app.db.database import db
+        db_session = db.get_session()
+    return access_cache.get(db_session, user_id)
@@ -0,0 +1,261 @@
+"""
+Set-based deletion of projects, teams and users.
+
+Deletes never load the rows they remove. Small projects and teams are
+removed with a single ``DELETE`` and the foreign keys' ``ON DELETE CASCADE``
+take their prompts, comments, replies and memberships with them. Above
+``settings.JOBS.DELETE_INLINE_MAX_ROWS`` dependent rows the delete runs as
+a background job that removes comments and prompts in committed batches,
+reporting progress, before deleting the project or team itself.
+
+Users are always deleted by a job: their memberships go first, then their
+activities are deleted (or, when anonymizing, re-attributed to a shared
+placeholder user) and the ``created_by``/``updated_by`` columns that point
+at them are cleared or re-attributed, in short batches. Every batch is
+idempotent, so a job interrupted by a crash simply continues when it runs
+again.
+
+Text blob reference counts are not adjusted by these deletes;
+``manage.py db gc-blobs`` recounts them.
+"""
+
+import logging
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import Activity, BackgroundJob, Base, Comment, Project, Prompt, Reply, Team, TeamMember, User
+from app.services.authorization import access_cache
+from app.services.jobs import enqueue, job_handler
+from app.services.project_export import team_project_ids
+
+logger = logging.getLogger(__name__)
+
+DELETE_PROJECT = "delete_project"
+DELETE_TEAM = "delete_team"
+DELETE_USER = "delete_user"
+
+# What happens to a deleted user's activities and authorship
+USER_DELETE_MODES = ("delete", "anonymize")
+
+
+def estimate_rows(session: Session, project_ids: Iterable[uuid.UUID]) -> Dict[str, int]:
+    """Prompts, comments and replies that deleting the projects removes."""
+    project_ids = list(project_ids)
+    if not project_ids:
+        return {"prompts": 0, "comments": 0, "replies": 0}
+    prompts = select(Prompt.id).where(Prompt.project_id.in_(project_ids))
+    comments = select(Comment.id).where(Comment.prompt_id.in_(prompts))
+    counts = session.execute(select(
+        select(func.count()).select_from(prompts.subquery()).scalar_subquery(),
+        select(func.count()).select_from(comments.subquery()).scalar_subquery(),
+        select(func.count(Reply.id)).where(Reply.comment_id.in_(comments)).scalar_subquery()
+    )).one()
+    return {"prompts": counts[0], "comments": counts[1], "replies": counts[2]}
+
+
+def _delete_batches(session: Session, model: Any, ids_query, batch_size: int) -> Iterable[int]:
+    """Delete rows whose id is in `ids_query`, `batch_size` at a time, yielding rows deleted per batch."""
+    while True:
+        batch = ids_query.limit(batch_size).scalar_subquery()
+        deleted = session.execute(
+            delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+        if not deleted:
+            return
+        yield deleted
+
+
+def _update_batches(session: Session, column: Any, old: Any, new: Any, batch_size: int) -> Iterable[int]:
+    """Change `column` from `old` to `new`, `batch_size` rows at a time, yielding rows updated per batch."""
+    table = column.table
+    key = list(table.primary_key.columns)[0]
+    while True:
+        batch = select(key).where(column == old).limit(batch_size).scalar_subquery()
+        updated = session.execute(
+            update(table).where(key.in_(batch)).values({column.name: new})
+        ).rowcount
+        session.commit()
+        if not updated:
+            return
+        yield updated
+
+
+def delete_projects_batched(
+    session: Session,
+    project_ids: Iterable[uuid.UUID],
+    batch_size: Optional[int] = None,
+    report: Optional[Callable[..., None]] = None
+) -> Dict[str, int]:
+    """Delete projects in committed batches: comments (with their replies), prompts, then the projects."""
+    project_ids = list(project_ids)
+    batch_size = batch_size or settings.JOBS.DELETE_BATCH_SIZE
+    estimate = estimate_rows(session, project_ids)
+    total = estimate["comments"] + estimate["prompts"]
+    stats = {"projects": 0, "prompts": 0, "comments": 0}
+
+    def progress(stage: str) -> None:
+        if report:
+            report(stats["comments"] + stats["prompts"], total, stage=stage, **stats)
+
+    for project_id in project_ids:
+        prompts = select(Prompt.id).where(Prompt.project_id == project_id)
+        comments = select(Comment.id).where(Comment.prompt_id.in_(prompts))
+        for deleted in _delete_batches(session, Comment, comments, batch_size):
+            stats["comments"] += deleted
+            progress("comments")
+        # Newest versions first, so no batch deletes a version whose children remain
+        for deleted in _delete_batches(session, Prompt, prompts.order_by(Prompt.version.desc()), batch_size):
+            stats["prompts"] += deleted
+            progress("prompts")
+        stats["projects"] += session.execute(
+            delete(Project).where(Project.id == project_id).execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+        progress("projects")
+    return stats
+
+
+def delete_projects_now(session: Session, project_ids: Iterable[uuid.UUID]) -> int:
+    """Delete projects with one statement, relying on ON DELETE CASCADE."""
+    project_ids = list(project_ids)
+    deleted = session.execute(
+        delete(Project).where(Project.id.in_(project_ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    return deleted
+
+
+def delete_team_now(session: Session, team_id: uuid.UUID) -> int:
+    """Delete a team with one statement; projects and memberships cascade in the database."""
+    deleted = session.execute(
+        delete(Team).where(Team.id == team_id).execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    return deleted
+
+
+@job_handler(DELETE_PROJECT)
+def delete_project_job(session: Session, params: Dict[str, Any], report: Callable[..., None]) -> Dict[str, int]:
+    return delete_projects_batched(session, [uuid.UUID(params["project_id"])], report=report)
+
+
+@job_handler(DELETE_TEAM)
+def delete_team_job(session: Session, params: Dict[str, Any], report: Callable[..., None]) -> Dict[str, int]:
+    team_id = uuid.UUID(params["team_id"])
+    stats = delete_projects_batched(session, team_project_ids(session, team_id), report=report)
+    stats["teams"] = delete_team_now(session, team_id)
+    access_cache.invalidate_team(team_id)
+    return stats
+
+
+def deleted_user_id(session: Session) -> uuid.UUID:
+    """The placeholder user anonymized activities and authorship are re-attributed to."""
+    username = settings.JOBS.DELETED_USER_NAME
+    session.execute(
+        insert(User.__table__).values(
+            id=uuid.uuid4(),
+            username=username,
+            email=f"{username}@invalid",
+            hashed_password="!",  # matches no password
+            is_active=False,
+            is_admin=False,
+            status='disabled'
+        ).on_conflict_do_nothing(index_elements=["username"])
+    )
+    session.commit()
+    return session.execute(select(User.id).where(User.username == username)).scalar_one()
+
+
+def _authorship_columns() -> Iterable[Any]:
+    """Every created_by/updated_by column referencing users."""
+    for table in Base.metadata.sorted_tables:
+        for name in ("created_by", "updated_by"):
+            if name in table.c:
+                yield table.c[name]
+
+
+def delete_user_batched(
+    session: Session,
+    user_id: uuid.UUID,
+    mode: str = "delete",
+    batch_size: Optional[int] = None,
+    report: Optional[Callable[..., None]] = None
+) -> Dict[str, int]:
+    """
+    Delete a user in short committed batches: memberships, activities
+    (deleted or re-attributed, depending on `mode`), authorship columns,
+    then the user row.
+    """
+    if mode not in USER_DELETE_MODES:
+        raise ValueError(f"Unknown user delete mode '{mode}'")
+    batch_size = batch_size or settings.JOBS.DELETE_BATCH_SIZE
+    replacement = deleted_user_id(session) if mode == "anonymize" else None
+    total = session.execute(select(func.count(Activity.id)).where(Activity.user_id == user_id)).scalar()
+    stats = {"memberships": 0, "activities": 0, "authorship": 0, "users": 0}
+
+    def progress(stage: str) -> None:
+        if report:
+            report(stats["activities"], total, stage=stage, **stats)
+
+    stats["memberships"] = session.execute(
+        delete(TeamMember).where(TeamMember.user_id == user_id).execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    access_cache.invalidate_users([user_id])
+    progress("memberships")
+
+    if replacement:
+        activities = _update_batches(session, Activity.__table__.c.user_id, user_id, replacement, batch_size)
+    else:
+        activities = _delete_batches(session, Activity, select(Activity.id).where(Activity.user_id == user_id), batch_size)
+    for changed in activities:
+        stats["activities"] += changed
+        progress("activities")
+
+    for column in _authorship_columns():
+        for changed in _update_batches(session, column, user_id, replacement, batch_size):
+            stats["authorship"] += changed
+            progress("authorship")
+
+    stats["users"] = session.execute(
+        delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+    ).rowcount
+    session.commit()
+    progress("users")
+    return stats
+
+
+@job_handler(DELETE_USER)
+def delete_user_job(session: Session, params: Dict[str, Any], report: Callable[..., None]) -> Dict[str, int]:
+    return delete_user_batched(session, uuid.UUID(params["user_id"]), params.get("mode", "delete"), report=report)
+
+
+def schedule_or_delete(
+    session: Session,
+    kind: str,
+    target_id: uuid.UUID,
+    deleted_by: Optional[uuid.UUID] = None
+) -> Optional[BackgroundJob]:
+    """
+    Delete a project or team right away when it is small, otherwise start a
+    background job. Returns the job, or None when the delete is already done.
+    """
+    project_ids = [target_id] if kind == DELETE_PROJECT else team_project_ids(session, target_id)
+    rows = sum(estimate_rows(session, project_ids).values())
+    if rows <= settings.JOBS.DELETE_INLINE_MAX_ROWS:
+        if kind == DELETE_PROJECT:
+            delete_projects_now(session, project_ids)
+        else:
+            delete_team_now(session, target_id)
+        return None
+
+    param = "project_id" if kind == DELETE_PROJECT else "team_id"
+    job = enqueue(session, kind, {param: str(target_id), "rows": rows}, created_by=deleted_by)
+    logger.info(f"Running {kind} for {target_id} ({rows} rows) in background job {job.id}")
+    return job
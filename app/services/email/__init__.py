@@ -8,17 +8,18 @@ This module handles sending various types of emails to users, including:
 """
 
 import logging
-import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
 from datetime import datetime, timedelta
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from pydantic import EmailStr
-from typing import List, Optional
+from fastapi_mail import FastMail, ConnectionConfig
+from typing import Optional
 
 from app.services.template import render_template, render_text_template
 from app.config import settings
+from .exceptions import EmailAuthenticationError, EmailConnectionError
+from .providers.base import EmailMessage
+from .providers.smtp import SMTPProvider
+from .service import EmailService
 
 # Email configuration
 email_config = ConnectionConfig(
@@ -39,6 +40,56 @@ fastmail = FastMail(email_config)
 
 logger = logging.getLogger(__name__)
 
+_email_service: Optional[EmailService] = None
+_email_service_lock = threading.Lock()
+
+
+def get_email_service() -> EmailService:
+    """
+    Process-wide EmailService configured from ``settings.EMAIL``.
+
+    Its providers keep their connections (the SMTP pool) for the life of the
+    process. Outside production it saves messages to EMAIL_DEV_DIR.
+    """
+    global _email_service
+    with _email_service_lock:
+        if _email_service is None:
+            providers = {
+                "smtp": {
+                    "host": settings.EMAIL.HOST,
+                    "port": settings.EMAIL.PORT,
+                    "username": settings.EMAIL.USER,
+                    "password": settings.EMAIL.PASSWORD,
+                    "use_credentials": settings.EMAIL.USE_CREDENTIALS,
+                    "use_tls": settings.EMAIL.TLS,
+                    "use_ssl": settings.EMAIL.SSL,
+                    "default_sender": settings.EMAIL.FROM,
+                    "pool_size": settings.EMAIL.SMTP_POOL_SIZE,
+                    "max_idle": settings.EMAIL.SMTP_MAX_IDLE,
+                    "max_messages": settings.EMAIL.SMTP_MAX_MESSAGES,
+                    "timeout": settings.EMAIL.SMTP_TIMEOUT
+                }
+            }
+            if settings.EMAIL.AWS_ACCESS_KEY:
+                providers["aws_ses"] = {
+                    "region": settings.EMAIL.AWS_REGION,
+                    "access_key": settings.EMAIL.AWS_ACCESS_KEY,
+                    "secret_key": settings.EMAIL.AWS_SECRET_KEY,
+                    "default_sender": settings.EMAIL.FROM
+                }
+            _email_service = EmailService({
+                "default_provider": settings.EMAIL.PROVIDER,
+                "dev_mode": os.getenv("ENVIRONMENT", "development").lower() != "production",
+                "dev_save_path": settings.EMAIL.DEV_DIR,
+                "providers": providers
+            })
+        return _email_service
+
+
+def get_smtp_provider() -> SMTPProvider:
+    """The shared SMTP provider, so messages reuse its pooled, authenticated connections."""
+    return get_email_service().providers["smtp"]
+
 
 def send_email(recipient: str, subject: str, html_content: str, text_content: str) -> bool:
     """
@@ -81,33 +132,21 @@ def send_email(recipient: str, subject: str, html_content: str, text_content: st
     
     # In production, send the actual email
     try:
-        logger.info(f"Production mode: Preparing to send email to {recipient} via SMTP")
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = settings.EMAIL.FROM
-        message["To"] = recipient
-        
-        # Add plain text and HTML versions
-        message.attach(MIMEText(text_content, "plain"))
-        message.attach(MIMEText(html_content, "html"))
-        
-        # Log SMTP connection details (without password)
-        logger.info(f"Connecting to SMTP server: {settings.EMAIL.HOST}:{settings.EMAIL.PORT} with user {settings.EMAIL.USER}")
-        
-        # Connect to SMTP server
-        with smtplib.SMTP(settings.EMAIL.HOST, settings.EMAIL.PORT) as server:
-            server.starttls()
-            server.login(settings.EMAIL.USER, settings.EMAIL.PASSWORD)
-            server.sendmail(settings.EMAIL.FROM, recipient, message.as_string())
-        
+        logger.info(f"Production mode: Sending email to {recipient} via SMTP")
+        result = get_smtp_provider().deliver(EmailMessage(
+            recipient=recipient,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content
+        ))
         logger.info(f"Email successfully sent to {recipient}")
-        return True
+        return result
     except Exception as e:
         logger.exception(f"Failed to send email to {recipient}: {str(e)}")
         # Log more details about the failure
-        if 'Authentication' in str(e):
+        if isinstance(e, EmailAuthenticationError):
             logger.error("SMTP authentication error - check EMAIL_USER and EMAIL_PASSWORD")
-        elif 'Connection refused' in str(e):
+        elif isinstance(e, EmailConnectionError):
             logger.error(f"SMTP connection error - check if {settings.EMAIL.HOST}:{settings.EMAIL.PORT} is accessible")
         return False
 
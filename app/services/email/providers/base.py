@@ -2,7 +2,7 @@
 Base email provider interface for Promptlane.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, TypeVar, Generic
+from typing import Dict, Any, List, Optional, TypeVar, Generic
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -23,6 +23,13 @@ class EmailMessage:
     metadata: Optional[Dict[str, Any]] = None
     created_at: datetime = datetime.utcnow()
 
+@dataclass
+class EmailResult:
+    """Outcome of sending one message of a batch"""
+    recipient: str
+    sent: bool
+    error: Optional[str] = None
+
 class BaseEmailProvider(ABC, Generic[T]):
     """
     Abstract base class for email providers.
@@ -79,4 +86,26 @@ class BaseEmailProvider(ABC, Generic[T]):
         Raises:
             EmailQuotaError: If there was an error getting quota information
         """
-        pass 
\ No newline at end of file
+        pass
+    
+    async def send_batch(self, messages: List[EmailMessage]) -> List[Any]:
+        """
+        Send several messages.
+        
+        Providers that can send concurrently or over shared connections
+        override this; the default sends one message after another.
+        
+        Returns:
+            List[Any]: Per message, True/False or the exception raised
+        """
+        results: List[Any] = []
+        for message in messages:
+            try:
+                results.append(await self.send_email(message))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    def close(self) -> None:
+        """Release connections or clients held by the provider."""
+        pass
@@ -1,10 +1,16 @@
 """
 SMTP email provider implementation
 """
+import asyncio
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 import os
 
 from ..exceptions import (
@@ -15,83 +21,240 @@ from ..exceptions import (
 )
 from .base import BaseEmailProvider, EmailMessage
 
+# Errors after which a connection is discarded and the message is sent again on a fresh one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP sessions reused across messages.
+
+    Connections are opened (and STARTTLS/login done) on first use, at most
+    `size` at a time, and kept for further messages. A connection idle for
+    more than `max_idle` seconds is checked with NOOP before reuse, and one
+    that has sent `max_messages` messages is closed, as many servers limit
+    messages per session.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        size: int = 4,
+        max_idle: float = 60,
+        max_messages: int = 100,
+        timeout: float = 30
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.size = size
+        self.max_idle = max_idle
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Dict[str, Any]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session."""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                server.starttls()
+        if self.username:
+            server.login(self.username, self.password or "")
+        self.opened += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _healthy(self, entry: Dict[str, Any]) -> bool:
+        if time.monotonic() - entry["used_at"] < self.max_idle:
+            return True
+        try:
+            return entry["server"].noop()[0] == 250
+        except Exception:
+            return False
+
+    @contextmanager
+    def connection(self) -> Iterator[Dict[str, Any]]:
+        """
+        Borrow a connection entry (``{"server", "sent", "used_at"}``).
+
+        The connection goes back to the pool when the block succeeds and is
+        closed when it raises.
+        """
+        self._slots.acquire()
+        entry = None
+        try:
+            while entry is None:
+                try:
+                    entry = self._idle.get_nowait()
+                except queue.Empty:
+                    entry = {"server": self.connect(), "sent": 0}
+                    break
+                if not self._healthy(entry):
+                    self._close(entry["server"])
+                    entry = None
+            try:
+                yield entry
+            except Exception:
+                self._close(entry["server"])
+                raise
+            entry["used_at"] = time.monotonic()
+            if entry["sent"] >= self.max_messages:
+                self._close(entry["server"])
+            else:
+                self._idle.put(entry)
+        finally:
+            self._slots.release()
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send a message, reconnecting once if a pooled connection turns out to be dead."""
+        for attempt in (1, 2):
+            try:
+                with self.connection() as entry:
+                    entry["server"].send_message(msg)
+                    entry["sent"] += 1
+                return
+            except RECONNECT_ERRORS:
+                if attempt == 2:
+                    raise
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._close(self._idle.get_nowait()["server"])
+            except queue.Empty:
+                return
+
+
 class SMTPProvider(BaseEmailProvider):
-    """SMTP email provider implementation"""
-    
+    """
+    SMTP email provider implementation.
+
+    Messages go through a pool of authenticated connections; the blocking
+    smtplib calls run on a thread pool of the same size, so ``send_email``
+    does not block the event loop.
+    """
+
     def __init__(self, config: Dict[str, Any]):
         try:
             self.host = config.get("host", os.getenv("SMTP_HOST"))
             if not self.host:
                 raise EmailConfigurationError("SMTP host not configured")
-            
+
             self.port = int(config.get("port", os.getenv("SMTP_PORT", "587")))
+            self.use_credentials = config.get("use_credentials", True)
             self.username = config.get("username", os.getenv("SMTP_USERNAME"))
-            if not self.username:
+            if self.use_credentials and not self.username:
                 raise EmailConfigurationError("SMTP username not configured")
-            
+
             self.password = config.get("password", os.getenv("SMTP_PASSWORD"))
-            if not self.password:
+            if self.use_credentials and not self.password:
                 raise EmailConfigurationError("SMTP password not configured")
-            
+
             self.use_tls = config.get("use_tls", True)
+            self.use_ssl = config.get("use_ssl", False)
             self.default_sender = config.get("default_sender", os.getenv("SMTP_DEFAULT_SENDER"))
             if not self.default_sender:
                 raise EmailConfigurationError("SMTP default sender not configured")
+
+            pool_size = int(config.get("pool_size", 4))
+            self.pool = SMTPConnectionPool(
+                self.host,
+                self.port,
+                username=self.username if self.use_credentials else None,
+                password=self.password if self.use_credentials else None,
+                use_tls=self.use_tls,
+                use_ssl=self.use_ssl,
+                size=pool_size,
+                max_idle=float(config.get("max_idle", 60)),
+                max_messages=int(config.get("max_messages", 100)),
+                timeout=float(config.get("timeout", 30))
+            )
+            self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="smtp")
         except ValueError as e:
             raise EmailConfigurationError(f"Invalid SMTP configuration: {str(e)}")
-    
-    async def send_email(self, message: EmailMessage) -> bool:
-        """Send email using SMTP"""
+
+    def build_message(self, message: EmailMessage) -> MIMEMultipart:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = message.subject
+        msg["From"] = message.sender or self.default_sender
+        msg["To"] = message.recipient
+
+        if message.reply_to:
+            msg["Reply-To"] = message.reply_to
+        if message.cc:
+            msg["Cc"] = message.cc
+        if message.bcc:
+            msg["Bcc"] = message.bcc
+
+        msg.attach(MIMEText(message.text_content, "plain"))
+        msg.attach(MIMEText(message.html_content, "html"))
+        return msg
+
+    def deliver(self, message: EmailMessage) -> bool:
+        """Send email over a pooled connection, blocking the calling thread"""
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = message.subject
-            msg["From"] = message.sender or self.default_sender
-            msg["To"] = message.recipient
-            
-            if message.reply_to:
-                msg["Reply-To"] = message.reply_to
-            if message.cc:
-                msg["Cc"] = message.cc
-            if message.bcc:
-                msg["Bcc"] = message.bcc
-            
-            msg.attach(MIMEText(message.text_content, "plain"))
-            msg.attach(MIMEText(message.html_content, "html"))
-            
-            with smtplib.SMTP(self.host, self.port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
-            
+            self.pool.send(self.build_message(message))
             return True
         except smtplib.SMTPAuthenticationError as e:
             raise EmailAuthenticationError("smtp", f"Authentication failed: {str(e)}")
-        except smtplib.SMTPConnectError as e:
+        except RECONNECT_ERRORS as e:
             raise EmailConnectionError("smtp", f"Connection failed: {str(e)}")
         except smtplib.SMTPException as e:
             raise EmailSendError("smtp", message.recipient, str(e))
         except Exception as e:
             raise EmailSendError("smtp", message.recipient, f"Unexpected error: {str(e)}")
-    
+
+    async def send_email(self, message: EmailMessage) -> bool:
+        """Send email using SMTP"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.deliver, message)
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[Any]:
+        """Send messages concurrently over the pool's connections; failures are returned, not raised"""
+        return await asyncio.gather(*(self.send_email(message) for message in messages), return_exceptions=True)
+
+    def _validate(self) -> bool:
+        with self.pool.connection():
+            pass
+        return True
+
     async def validate_credentials(self) -> bool:
         """Validate SMTP credentials"""
         try:
-            with smtplib.SMTP(self.host, self.port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.username, self.password)
-            return True
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._validate)
         except smtplib.SMTPAuthenticationError:
             raise EmailAuthenticationError("smtp", "Invalid credentials")
         except smtplib.SMTPConnectError:
             raise EmailConnectionError("smtp", "Could not connect to SMTP server")
         except Exception as e:
             raise EmailConnectionError("smtp", f"Unexpected error: {str(e)}")
-    
+
     async def get_quota(self) -> Dict[str, Any]:
         """SMTP doesn't typically provide quota information"""
         return {
             "provider": "smtp",
             "quota_available": True
-        } 
\ No newline at end of file
+        }
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        self.pool.close()
@@ -1,7 +1,7 @@
 """
 Email service for managing multiple email providers.
 """
-from typing import Dict, Any, Optional, TypeVar, Generic
+from typing import Dict, Any, List, Optional, TypeVar, Generic
 import os
 import asyncio
 import time
@@ -17,7 +17,7 @@ from .exceptions import (
     EmailSendError,
     EmailQuotaError
 )
-from .providers.base import BaseEmailProvider, EmailMessage
+from .providers.base import BaseEmailProvider, EmailMessage, EmailResult
 from .providers.smtp import SMTPProvider
 from .providers.aws_ses import AWSSESProvider
 from app.services.template import render_template
@@ -196,6 +196,80 @@ class EmailService:
                     continue
                 raise
     
+    async def send_batch(
+        self,
+        messages: List[EmailMessage],
+        provider: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate: Optional[float] = None
+    ) -> List[EmailResult]:
+        """
+        Send a batch of messages (an invitation wave, for example).
+        
+        At most `concurrency` messages are in flight at once and no more
+        than `rate` are sent per second; SMTP sends them over its pooled
+        connections. Returns one result per message, in order; failures are
+        reported in the results, not raised.
+        """
+        provider_name = provider or self.default_provider
+        if provider_name not in self.providers:
+            logger.error(f"Email provider {provider_name} not configured")
+            return [EmailResult(m.recipient, False, f"Provider {provider_name} not configured") for m in messages]
+        
+        if self.dev_mode:
+            results = []
+            for message in messages:
+                try:
+                    await self._save_email_to_file(message)
+                    results.append(EmailResult(message.recipient, True))
+                except Exception as e:
+                    results.append(EmailResult(message.recipient, False, str(e)))
+            return results
+        
+        chunk_size = max(1, min(concurrency or len(messages) or 1, int(rate) if rate else len(messages) or 1))
+        start_time = time.time()
+        results = []
+        for offset in range(0, len(messages), chunk_size):
+            chunk = messages[offset:offset + chunk_size]
+            chunk_started = time.monotonic()
+            outcomes = await self.providers[provider_name].send_batch(chunk)
+            for message, outcome in zip(chunk, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Failed to send email to {message.recipient} using {provider_name}: {str(outcome)}")
+                    results.append(EmailResult(message.recipient, False, str(outcome)))
+                else:
+                    results.append(EmailResult(message.recipient, bool(outcome), None if outcome else "Not sent"))
+            if rate:
+                # Spread chunks so the batch stays under `rate` messages per second
+                await asyncio.sleep(max(0.0, len(chunk) / rate - (time.monotonic() - chunk_started)))
+        logger.info(
+            f"Sent {sum(r.sent for r in results)}/{len(messages)} emails using {provider_name} "
+            f"(took {time.time() - start_time:.2f}s)"
+        )
+        return results
+    
+    async def sending_limits(self, provider: Optional[str] = None, rate: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Effective send rate (messages per second) and remaining daily quota.
+        
+        Providers that report a quota (``get_quota`` for SES) can lower the
+        configured `rate`; ``remaining`` is None when there is no daily cap.
+        """
+        provider_name = provider or self.default_provider
+        quota = await self.get_provider_quota(provider_name)
+        remaining = None
+        max_rate = quota.get("max_send_rate")
+        if max_rate:
+            rate = min(rate, max_rate) if rate else max_rate
+        if quota.get("max_24_hour_send", -1) >= 0:
+            remaining = max(0, int(quota["max_24_hour_send"] - quota.get("sent_last_24_hours", 0)))
+        return {"provider": provider_name, "rate": rate or None, "remaining": remaining}
+    
+    def close(self) -> None:
+        """Release provider connections."""
+        for provider in self.providers.values():
+            provider.close()
+    
     async def send_template_email(
         self,
         template_name: str,
@@ -2,9 +2,12 @@
 Test utilities for the email service.
 """
 import pytest
-from typing import Dict, Any
+import socketserver
+import threading
+from typing import Dict, Any, List
 from app.services.email.service import EmailService
 from app.services.email.providers.base import EmailMessage
+from app.services.email.providers.smtp import SMTPProvider
 
 @pytest.fixture
 def email_service():
@@ -90,4 +93,136 @@ async def test_get_provider_quota(email_service):
     """Test getting provider quota."""
     quota = await email_service.get_provider_quota("smtp")
     assert isinstance(quota, dict)
-    assert "error" not in quota 
\ No newline at end of file
+    assert "error" not in quota
+
+
+class DebuggingSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts every message and records it on the server."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost debugging server")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data.append(chunk)
+                with server.lock:
+                    server.messages.append(b"".join(data).decode())
+                    server.served_on_connection += 1
+                self.reply("250 Message accepted")
+                if server.drop_after and server.served_on_connection >= server.drop_after:
+                    # Simulate the server closing an idle session
+                    server.served_on_connection = 0
+                    return
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class DebuggingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_after: int = 0):
+        super().__init__(("127.0.0.1", 0), DebuggingSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages: List[str] = []
+        self.drop_after = drop_after
+        self.served_on_connection = 0
+
+
+@pytest.fixture
+def smtp_server():
+    """Local stand-in SMTP server running on a background thread."""
+    server = DebuggingSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _smtp_provider(server: DebuggingSMTPServer, **config) -> SMTPProvider:
+    return SMTPProvider({
+        "host": "127.0.0.1",
+        "port": server.server_address[1],
+        "use_credentials": False,
+        "use_tls": False,
+        "default_sender": "noreply@example.com",
+        **config
+    })
+
+
+def _messages(count: int) -> List[EmailMessage]:
+    return [
+        EmailMessage(
+            recipient=f"user{index}@example.com",
+            subject=f"Invitation {index}",
+            html_content="<p>Welcome</p>",
+            text_content="Welcome"
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_smtp_provider_reuses_connection(smtp_server):
+    """Test that consecutive messages share one authenticated SMTP session."""
+    provider = _smtp_provider(smtp_server, pool_size=1)
+    for message in _messages(3):
+        assert await provider.send_email(message) is True
+    provider.close()
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_provider_reconnects_after_disconnect(smtp_server):
+    """Test that a message is resent on a new connection when the pooled one was closed."""
+    smtp_server.drop_after = 1
+    provider = _smtp_provider(smtp_server, pool_size=1)
+    for message in _messages(2):
+        assert await provider.send_email(message) is True
+    provider.close()
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_smtp_provider_batch_uses_pool(smtp_server):
+    """Test that a batch is spread over at most pool_size connections."""
+    provider = _smtp_provider(smtp_server, pool_size=2)
+    results = await provider.send_batch(_messages(10))
+    provider.close()
+    assert results == [True] * 10
+    assert len(smtp_server.messages) == 10
+    assert smtp_server.connections <= 2
+
+
+@pytest.mark.asyncio
+async def test_send_batch(email_service):
+    """Test sending a batch through the service."""
+    results = await email_service.send_batch(_messages(3), concurrency=2, rate=100)
+    assert [result.sent for result in results] == [True, True, True]
+    assert [result.recipient for result in results] == [f"user{index}@example.com" for index in range(3)]
@@ -0,0 +1,310 @@
+"""
+Live update events for Promptlane.
+
+Managers publish small JSON events (a comment was added, a version was
+activated, ...) to named channels such as ``prompt:<id>`` and
+``project:<id>``. The server-sent-events endpoints subscribe to a channel
+and stream whatever arrives to the browser, which then fetches the changed
+data incrementally instead of reloading the page.
+
+Fan-out to subscribers always happens in-process. The configured backend
+(``settings.EVENTS.BACKEND``) decides how an event reaches every worker:
+
+- ``memory``: events only reach subscribers of the publishing process.
+  Suitable for development and single-worker deployments.
+- ``postgres``: events are sent with ``pg_notify`` by a background sender
+  thread and every process runs a ``LISTEN`` thread that feeds its local
+  subscribers, so any number of workers see the same events.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import select
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Type
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Notifications waiting for the Postgres sender thread, and sent per transaction
+NOTIFY_QUEUE_SIZE = 10000
+NOTIFY_BATCH_SIZE = 100
+
+
+def prompt_channel(prompt_id: Any) -> str:
+    """Channel carrying events for a single prompt."""
+    return f"prompt:{prompt_id}"
+
+
+def project_channel(project_id: Any) -> str:
+    """Channel carrying events for every prompt of a project."""
+    return f"project:{project_id}"
+
+
+def format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    """Format a server-sent-events message."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscription:
+    """A subscriber's bounded event queue, bound to the loop that created it."""
+
+    def __init__(self, channel: str, maxsize: int):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        # Events dropped because the client fell behind; it should resync.
+        self.dropped = 0
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Queue an event; safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop is already closed
+            pass
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, returning None on timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBackend:
+    """Deliver events to subscribers of the current process only."""
+
+    def __init__(self, broker: "EventBroker"):
+        self.broker = broker
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        self.broker.dispatch(channel, event)
+
+
+class PostgresBackend:
+    """
+    Deliver events to every process through Postgres LISTEN/NOTIFY.
+
+    ``publish`` only queues the notification; a sender thread sends queued
+    notifications in one transaction per batch, so publishing never waits
+    for the database on the caller's thread (often the event loop).
+    """
+
+    def __init__(self, broker: "EventBroker", pg_channel: Optional[str] = None):
+        self.broker = broker
+        self.pg_channel = pg_channel or settings.EVENTS.PG_CHANNEL
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._outbox: queue.Queue = queue.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        self._sender: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._start_sender()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._sender_lock:
+            sender, self._sender = self._sender, None
+        if sender:
+            # Sent after everything queued before it
+            self._outbox.put(None)
+            sender.join(timeout=5)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        # Processes that never start the broker (CLI, job workers) still publish
+        self._start_sender()
+        payload = json.dumps({"channel": channel, "event": event}, default=str)
+        try:
+            self._outbox.put_nowait(payload)
+        except queue.Full:
+            logger.warning(f"Event notification queue is full, dropping {event.get('type')} event for {channel}")
+
+    def _start_sender(self) -> None:
+        with self._sender_lock:
+            if self._sender and self._sender.is_alive():
+                return
+            self._sender = threading.Thread(target=self._send, name="events-sender", daemon=True)
+            self._sender.start()
+
+    def _send(self) -> None:
+        from sqlalchemy import text
+        from app.db.database import db
+
+        statement = text("SELECT pg_notify(:pg_channel, :payload)")
+        while True:
+            payloads = [self._outbox.get()]
+            while len(payloads) < NOTIFY_BATCH_SIZE:
+                try:
+                    payloads.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in payloads
+            payloads = [payload for payload in payloads if payload is not None]
+            if payloads:
+                try:
+                    with db.engine.begin() as connection:
+                        connection.execute(
+                            statement, [{"pg_channel": self.pg_channel, "payload": payload} for payload in payloads]
+                        )
+                except Exception as e:
+                    logger.error(f"Error sending {len(payloads)} event notifications: {str(e)}")
+            if stopping:
+                return
+
+    def _listen(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(str(settings.DATABASE.URL))
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.pg_channel}"')
+                logger.info(f"Listening for events on Postgres channel {self.pg_channel}")
+
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self._handle(connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"Event listener error, reconnecting: {str(e)}")
+                self._stopping.wait(settings.DATABASE.RETRY_DELAY or 1)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _handle(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.broker.dispatch(message["channel"], message["event"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed event notification: {str(e)}")
+
+
+BACKENDS: Dict[str, Type] = {
+    "memory": InMemoryBackend,
+    "postgres": PostgresBackend,
+}
+
+
+class EventBroker:
+    """Publish events to channels and fan them out to local subscribers."""
+
+    def __init__(self, backend: Optional[str] = None):
+        backend = (backend or settings.EVENTS.BACKEND).lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown events backend '{backend}'. Available: {', '.join(BACKENDS)}")
+        self.backend = BACKENDS[backend](self)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.backend.start()
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+    def publish(self, channels: Iterable[str], event_type: str, data: Dict[str, Any]) -> None:
+        """Publish an event to each channel. Failures are logged, never raised."""
+        event = {
+            "type": event_type,
+            "data": data,
+            "published_at": datetime.utcnow().isoformat()
+        }
+        for channel in channels:
+            try:
+                self.backend.publish(channel, event)
+            except Exception as e:
+                logger.error(f"Error publishing {event_type} event to {channel}: {str(e)}")
+
+    def add_listener(self, channel: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Call `callback` with every event of a channel that reaches this
+        process, on the thread that dispatches it; it must be quick and
+        must not raise.
+        """
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(callback)
+
+    def dispatch(self, channel: str, event: Dict[str, Any]) -> None:
+        """Hand an event to every local listener and subscriber of a channel."""
+        with self._lock:
+            listeners = list(self._listeners.get(channel, ()))
+            subscribers = list(self._subscribers.get(channel, ()))
+        for listener in listeners:
+            try:
+                listener(dict(event, channel=channel))
+            except Exception as e:
+                logger.error(f"Event listener for {channel} failed: {str(e)}")
+        for subscription in subscribers:
+            subscription.deliver(dict(event, channel=channel))
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        """Subscribe to a channel for the duration of the context."""
+        subscription = Subscription(channel, settings.EVENTS.SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    async def stream(self, request, channel: str) -> AsyncIterator[str]:
+        """Yield server-sent-events messages for a channel until the client disconnects."""
+        async with self.subscribe(channel) as subscription:
+            yield f"retry: {settings.EVENTS.RETRY_INTERVAL}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(settings.EVENTS.HEARTBEAT_INTERVAL)
+                if subscription.dropped:
+                    yield format_sse("resync", {"dropped": subscription.dropped})
+                    subscription.dropped = 0
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event["type"], event)
+
+
+# Process-wide broker used by managers and the SSE endpoints
+event_broker = EventBroker()
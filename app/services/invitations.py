@@ -0,0 +1,284 @@
+"""
+Bulk user invitations.
+
+``create_invitations`` validates a list of invitees against existing users
+with one query, creates all invited users and their ``InvitationDelivery``
+rows in one transaction and queues a ``send_invitations`` job. The job
+renders one message per recipient from the compiled invitation templates
+and sends them in rounds of ``EMAIL_INVITE_BATCH_SIZE`` through
+``EmailService.send_batch``, limited to ``EMAIL_SEND_CONCURRENCY`` messages
+in flight and ``EMAIL_SEND_RATE`` per second (lowered to the provider's
+``max_send_rate`` for SES). When the provider's daily quota runs out the
+rest of the batch is deferred to a follow-up job. Each delivery records
+whether its email was sent and why not.
+"""
+
+import asyncio
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import Activity, ActivityType, BackgroundJob, InvitationDelivery, User
+from app.services.email import get_email_service
+from app.services.email.providers.base import EmailMessage
+from app.services.jobs import enqueue, job_handler
+from app.services.template import get_compiled_template
+
+logger = logging.getLogger(__name__)
+
+SEND_INVITATIONS = "send_invitations"
+
+DELIVERY_PENDING = "pending"
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
+
+# How long to wait before sending the rest of a batch once the daily quota is used up
+QUOTA_RETRY_AFTER = timedelta(hours=1)
+
+
+def create_invitations(
+    session: Session,
+    invites: Iterable[Dict[str, Any]],
+    invited_by: Optional[uuid.UUID] = None,
+    inviter_name: str = "An administrator",
+    expiry_hours: int = 48,
+    personal_message: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create invited users for `invites` (dicts with ``username``, ``email`` and
+    optionally ``is_admin`` and ``personal_message``) and queue their emails.
+
+    Invitees whose username or email is taken, or repeated in the list, are
+    rejected; the others are created together. Returns the batch id, the
+    send job and the rejected invitees with a reason.
+    """
+    invites = list(invites)
+    rejected: List[Dict[str, Any]] = []
+    usernames = {invite.get("username") for invite in invites if invite.get("username")}
+    emails = {invite.get("email") for invite in invites if invite.get("email")}
+    taken_usernames, taken_emails = set(), set()
+    if usernames or emails:
+        for username, email in session.execute(
+            select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))
+        ):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    batch_id = uuid.uuid4()
+    expiry = datetime.utcnow() + timedelta(hours=expiry_hours)
+    users, deliveries = [], []
+    for invite in invites:
+        username, email = invite.get("username"), invite.get("email")
+        if not username or not email:
+            reason = "username and email are required"
+        elif username in taken_usernames:
+            reason = "Username already exists"
+        elif email in taken_emails:
+            reason = "Email already exists"
+        else:
+            reason = None
+        if reason:
+            rejected.append({"username": username, "email": email, "error": reason})
+            continue
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+        user = User(
+            id=uuid.uuid4(),
+            username=username,
+            email=email,
+            hashed_password="!",  # set when the invitation is completed
+            is_admin=bool(invite.get("is_admin", False)),
+            status='invited',
+            invitation_token=secrets.token_urlsafe(32),
+            invitation_expiry=expiry,
+            created_by=invited_by
+        )
+        users.append(user)
+        deliveries.append(InvitationDelivery(
+            id=uuid.uuid4(),
+            batch_id=batch_id,
+            user_id=user.id,
+            email=email,
+            status=DELIVERY_PENDING,
+            personal_message=invite.get("personal_message") or personal_message,
+            created_by=invited_by
+        ))
+
+    if not users:
+        return {"batch_id": None, "job": None, "invited": 0, "rejected": rejected}
+
+    session.add_all(users)
+    session.flush()
+    session.add_all(deliveries)
+    if invited_by:
+        session.add(Activity(
+            id=uuid.uuid4(),
+            user_id=invited_by,
+            activity_type=ActivityType.INVITE_USERS,
+            details={"batch_id": str(batch_id), "invited": len(users), "rejected": len(rejected)},
+            created_at=datetime.utcnow()
+        ))
+    session.commit()
+
+    job = enqueue(session, SEND_INVITATIONS, {
+        "batch_id": str(batch_id),
+        "inviter_name": inviter_name,
+        "expiry_hours": expiry_hours
+    }, created_by=invited_by)
+    logger.info(f"Created {len(users)} invitations in batch {batch_id} ({len(rejected)} rejected), job {job.id}")
+    return {"batch_id": batch_id, "job": job, "invited": len(users), "rejected": rejected}
+
+
+def batch_status(session: Session, batch_id: uuid.UUID) -> Dict[str, Any]:
+    """Delivery counts and per-recipient status of a bulk invite."""
+    rows = session.execute(
+        select(InvitationDelivery, User.username)
+        .join(User, User.id == InvitationDelivery.user_id)
+        .where(InvitationDelivery.batch_id == batch_id)
+        .order_by(InvitationDelivery.email)
+    ).all()
+    counts: Dict[str, int] = {}
+    recipients = []
+    for delivery, username in rows:
+        counts[delivery.status] = counts.get(delivery.status, 0) + 1
+        recipients.append({
+            "username": username,
+            "email": delivery.email,
+            "status": delivery.status,
+            "attempts": delivery.attempts,
+            "provider": delivery.provider,
+            "error": delivery.error,
+            "sent_at": delivery.sent_at.isoformat() if delivery.sent_at else None
+        })
+    return {"batch_id": str(batch_id), "counts": counts, "recipients": recipients}
+
+
+def resend_failed(session: Session, batch_id: uuid.UUID, resent_by: Optional[uuid.UUID] = None) -> Optional[Any]:
+    """
+    Queue the failed deliveries of a batch again; returns the job or None when nothing failed.
+
+    The resent invitations get a new token and expiry, and keep the inviter
+    name and expiry period of the batch's original send job.
+    """
+    failed = session.execute(
+        select(InvitationDelivery.id, InvitationDelivery.user_id)
+        .where(InvitationDelivery.batch_id == batch_id, InvitationDelivery.status == DELIVERY_FAILED)
+    ).all()
+    if not failed:
+        return None
+
+    original = session.execute(
+        select(BackgroundJob.params)
+        .where(BackgroundJob.kind == SEND_INVITATIONS, BackgroundJob.params["batch_id"].astext == str(batch_id))
+        .order_by(BackgroundJob.created_at)
+        .limit(1)
+    ).scalar()
+    params = {
+        "batch_id": str(batch_id),
+        "inviter_name": (original or {}).get("inviter_name", "An administrator"),
+        "expiry_hours": (original or {}).get("expiry_hours", 48)
+    }
+
+    # The old links may have expired while the emails were failing
+    expiry = datetime.utcnow() + timedelta(hours=params["expiry_hours"])
+    for _, user_id in failed:
+        session.query(User)\
+            .filter(User.id == user_id, User.status == 'invited')\
+            .update({"invitation_token": secrets.token_urlsafe(32), "invitation_expiry": expiry}, synchronize_session=False)
+    session.query(InvitationDelivery)\
+        .filter(InvitationDelivery.id.in_([delivery_id for delivery_id, _ in failed]))\
+        .update({"status": DELIVERY_PENDING, "error": None}, synchronize_session=False)
+    session.commit()
+    return enqueue(session, SEND_INVITATIONS, params, created_by=resent_by)
+
+
+def _invitation_url(token: str) -> str:
+    return f"{settings.APP.SITE_URL}/accept-invitation?token={token}"
+
+
+def build_messages(
+    rows: List[Tuple[InvitationDelivery, User]],
+    inviter_name: str
+) -> List[EmailMessage]:
+    """Render one invitation per recipient from the compiled invitation templates."""
+    template = get_compiled_template("invitation")
+    subject = f"Invitation to join {settings.APP.NAME}"
+    shared = {"inviter_name": inviter_name, "current_year": datetime.utcnow().year}
+
+    messages = []
+    for delivery, user in rows:
+        context = dict(
+            shared,
+            recipient_name=user.username,
+            account_type="administrator" if user.is_admin else "standard user",
+            invitation_url=_invitation_url(user.invitation_token),
+            expiry_date=user.invitation_expiry.strftime("%B %d, %Y at %I:%M %p UTC"),
+            personal_message=delivery.personal_message
+        )
+        messages.append(EmailMessage(
+            recipient=delivery.email,
+            subject=subject,
+            html_content=template.html.render(**context),
+            text_content=template.text.render(**context),
+            metadata={"delivery_id": str(delivery.id)}
+        ))
+    return messages
+
+
+@job_handler(SEND_INVITATIONS)
+def send_invitations_job(session: Session, params: Dict[str, Any], report: Callable[..., None]) -> Dict[str, Any]:
+    batch_id = uuid.UUID(params["batch_id"])
+    inviter_name = params.get("inviter_name", "An administrator")
+    service = get_email_service()
+    limits = asyncio.run(service.sending_limits(rate=settings.EMAIL.SEND_RATE or None))
+    remaining = limits["remaining"]
+
+    pending = select(func.count()).where(
+        InvitationDelivery.batch_id == batch_id, InvitationDelivery.status == DELIVERY_PENDING
+    )
+    total = session.execute(pending).scalar()
+    stats = {"sent": 0, "failed": 0, "deferred": 0}
+    while True:
+        size = settings.EMAIL.INVITE_BATCH_SIZE if remaining is None else min(settings.EMAIL.INVITE_BATCH_SIZE, remaining)
+        if size <= 0:
+            stats["deferred"] = session.execute(pending).scalar()
+            if stats["deferred"]:
+                enqueue(session, SEND_INVITATIONS, dict(params), run_after=datetime.utcnow() + QUOTA_RETRY_AFTER)
+                logger.warning(f"Daily email quota used up; {stats['deferred']} invitations of batch {batch_id} deferred")
+            break
+
+        rows = session.execute(
+            select(InvitationDelivery, User)
+            .join(User, User.id == InvitationDelivery.user_id)
+            .where(InvitationDelivery.batch_id == batch_id, InvitationDelivery.status == DELIVERY_PENDING)
+            .order_by(InvitationDelivery.id)
+            .limit(size)
+        ).all()
+        if not rows:
+            break
+
+        results = asyncio.run(service.send_batch(
+            build_messages(rows, inviter_name),
+            concurrency=settings.EMAIL.SEND_CONCURRENCY,
+            rate=limits["rate"]
+        ))
+        now = datetime.utcnow()
+        for (delivery, _), result in zip(rows, results):
+            delivery.attempts += 1
+            delivery.provider = limits["provider"]
+            delivery.status = DELIVERY_SENT if result.sent else DELIVERY_FAILED
+            delivery.error = result.error
+            delivery.sent_at = now if result.sent else None
+            stats["sent" if result.sent else "failed"] += 1
+        if remaining is not None:
+            remaining -= len(rows)
+        session.commit()
+        report(stats["sent"] + stats["failed"], total, **stats)
+    return stats
@@ -0,0 +1,456 @@
+"""
+Background jobs for Promptlane.
+
+Work too large for a request (deleting a big team, for example) is
+recorded as a ``BackgroundJob`` row and executed outside the request by the
+handler registered for its ``kind``. The ``background_jobs`` table is the
+queue: workers claim pending jobs with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so any number of worker threads and processes can share it and
+queued work survives restarts.
+
+Workers run inside the web application (``JOBS_WORKER_THREADS`` threads,
+unless ``JOBS_RUN_IN_PROCESS`` is off) and standalone with
+``manage.py jobs worker``. Handlers receive their own session, the job's
+params and a ``report`` callback that stores progress on the job row, so
+clients can poll ``GET /api/jobs/{id}``; what a handler returns becomes the
+job's ``result``.
+
+A failing job is retried up to ``max_attempts`` times with exponential
+backoff. ``JOBS_KIND_CONCURRENCY`` caps how many jobs of a kind run at once
+across all workers. Handlers must be safe to run again: a job left
+``running`` by a process that died is put back to ``pending`` once its
+worker has not touched it for ``JOBS_STALE_AFTER_SECONDS``. A heartbeat
+keeps the jobs of live workers fresh whether or not their handlers report
+progress, and every write of a running job is conditional on the worker
+still holding it, so a worker whose job was requeued stops at its next
+``report`` and never overwrites the new run.
+"""
+
+import importlib
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Modules whose handlers must be registered before jobs can run
+HANDLER_MODULES = (
+    "app.services.deletion",
+    "app.services.storage_stats",
+    "app.services.invitations",
+)
+
+Handler = Callable[[Session, Dict[str, Any], Callable[..., None]], Optional[Dict[str, Any]]]
+
+
+class JobOwnershipLost(Exception):
+    """The running job was requeued and claimed by another worker."""
+
+_handlers: Dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of `kind`."""
+    def register(func: Handler) -> Handler:
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def enqueue(
+    session: Session,
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+    created_by: Optional[uuid.UUID] = None,
+    max_attempts: Optional[int] = None,
+    run_after: Optional[datetime] = None
+) -> BackgroundJob:
+    """Record a new pending job and wake this process's workers."""
+    job = BackgroundJob(
+        id=uuid.uuid4(),
+        kind=kind,
+        status=JOB_PENDING,
+        params=params or {},
+        progress={},
+        max_attempts=max_attempts or settings.JOBS.MAX_ATTEMPTS,
+        run_after=run_after,
+        created_by=created_by,
+        updated_by=created_by
+    )
+    session.add(job)
+    session.commit()
+    logger.info(f"Queued {kind} job {job.id}")
+    job_worker.wake()
+    return job
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt of a job that failed `attempts` times."""
+    return timedelta(seconds=settings.JOBS.RETRY_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def _saturated_kinds(session: Session) -> List[str]:
+    """Kinds already running as many jobs as JOBS_KIND_CONCURRENCY allows."""
+    limits = settings.JOBS.KIND_CONCURRENCY
+    if not limits:
+        return []
+    running = session.execute(
+        select(BackgroundJob.kind, func.count())
+        .where(BackgroundJob.status == JOB_RUNNING, BackgroundJob.kind.in_(list(limits)))
+        .group_by(BackgroundJob.kind)
+    ).all()
+    return [kind for kind, count in running if count >= limits[kind]]
+
+
+def claim_job(session: Session, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[BackgroundJob]:
+    """
+    Claim the oldest runnable pending job, or return None.
+
+    The row is locked with SKIP LOCKED, so concurrent workers never claim the
+    same job and never wait for each other.
+    """
+    now = datetime.utcnow()
+    query = select(BackgroundJob)\
+        .where(
+            BackgroundJob.status == JOB_PENDING,
+            or_(BackgroundJob.run_after.is_(None), BackgroundJob.run_after <= now)
+        )\
+        .order_by(BackgroundJob.created_at)\
+        .limit(1)\
+        .with_for_update(skip_locked=True)
+    if kinds:
+        query = query.where(BackgroundJob.kind.in_(kinds))
+    saturated = _saturated_kinds(session)
+    if saturated:
+        query = query.where(BackgroundJob.kind.notin_(saturated))
+
+    job = session.execute(query).scalar_one_or_none()
+    if job is None:
+        session.rollback()
+        return None
+
+    limit = settings.JOBS.KIND_CONCURRENCY.get(job.kind)
+    if limit:
+        # Serialize claims of a limited kind so the running count below is exact
+        session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"background_jobs:{job.kind}"})
+        running = session.execute(
+            select(func.count()).where(BackgroundJob.status == JOB_RUNNING, BackgroundJob.kind == job.kind)
+        ).scalar()
+        if running >= limit:
+            session.rollback()
+            return None
+
+    job.status = JOB_RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.started_at = now
+    job.updated_at = now
+    job.error = None
+    session.commit()
+    return job
+
+
+def _update_owned(session: Session, job_id: uuid.UUID, worker_id: str, **values: Any) -> bool:
+    """Update a running job only while `worker_id` holds it; commits and returns whether it did."""
+    updated = session.execute(
+        update(BackgroundJob)
+        .where(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == JOB_RUNNING,
+            BackgroundJob.locked_by == worker_id
+        )
+        .values(**values)
+    ).rowcount
+    session.commit()
+    return bool(updated)
+
+
+class JobHeartbeat:
+    """
+    Thread touching a running job's ``updated_at`` so it is not requeued as
+    stale while its handler works between progress reports.
+
+    It uses its own session and stops once the job has changed hands;
+    ``lost`` tells the job's worker to give up.
+    """
+
+    def __init__(self, job_id: uuid.UUID, worker_id: str, interval: Optional[float] = None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        # Several beats fit in the stale window, so one slow beat does not requeue the job
+        self.interval = interval or max(settings.JOBS.STALE_AFTER_SECONDS / 3, 1)
+        self.lost = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self) -> "JobHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stopping.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        from app.db.database import db
+
+        while not self._stopping.wait(self.interval):
+            session = db.get_session()
+            try:
+                if not _update_owned(session, self.job_id, self.worker_id, updated_at=datetime.utcnow()):
+                    self.lost.set()
+                    return
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Heartbeat of job {self.job_id} failed: {str(e)}")
+            finally:
+                db.close_session(session)
+
+
+def run_job(session: Session, job: BackgroundJob) -> None:
+    """Execute a claimed job, recording progress, result or error; failures are retried with backoff."""
+    handler = _handlers.get(job.kind)
+    job_id, worker_id, attempts = job.id, job.locked_by, job.attempts
+
+    with JobHeartbeat(job_id, worker_id) as heartbeat:
+        def report(done: int, total: Optional[int] = None, **details: Any) -> None:
+            """Store progress; commits the session, so call it between units of work."""
+            if heartbeat.lost.is_set() or not _update_owned(
+                session, job_id, worker_id,
+                progress=dict(details, done=done, total=total),
+                updated_at=datetime.utcnow()
+            ):
+                raise JobOwnershipLost(f"Job {job_id} was requeued while running on {worker_id}")
+
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job.kind}'")
+            result = handler(session, dict(job.params or {}), report)
+            values = {"status": JOB_SUCCEEDED, "result": result or {}, "finished_at": datetime.utcnow()}
+        except JobOwnershipLost as e:
+            session.rollback()
+            logger.warning(f"Abandoned {job.kind} job {job_id}: {str(e)}")
+            values = None
+        except Exception as e:
+            session.rollback()
+            values = {"error": str(e)}
+            if handler is not None and attempts < job.max_attempts:
+                values.update(status=JOB_PENDING, run_after=datetime.utcnow() + retry_delay(attempts))
+                logger.warning(
+                    f"Job {job_id} ({job.kind}) failed on attempt {attempts}/{job.max_attempts}, "
+                    f"retrying after {values['run_after']}: {str(e)}"
+                )
+            else:
+                logger.exception(f"Job {job_id} ({job.kind}) failed: {str(e)}")
+                values.update(status=JOB_FAILED, finished_at=datetime.utcnow())
+
+    if values is not None:
+        values.update(locked_by=None, updated_at=datetime.utcnow())
+        if not _update_owned(session, job_id, worker_id, **values):
+            logger.warning(f"Job {job_id} was requeued while running on {worker_id}; its outcome is discarded")
+    session.refresh(job)
+
+
+def requeue_stale(session: Session) -> List[uuid.UUID]:
+    """Return running jobs whose worker stopped touching them to pending."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.JOBS.STALE_AFTER_SECONDS)
+    job_ids = session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.status == JOB_RUNNING, BackgroundJob.updated_at < cutoff)
+        .values(status=JOB_PENDING, locked_by=None, updated_at=datetime.utcnow())
+        .returning(BackgroundJob.id)
+    ).scalars().all()
+    session.commit()
+    for job_id in job_ids:
+        logger.warning(f"Requeued interrupted job {job_id}")
+    return job_ids
+
+
+def retry_job(session: Session, job: BackgroundJob) -> bool:
+    """Queue a failed or cancelled job again with a fresh set of attempts."""
+    if job.status not in (JOB_FAILED, JOB_CANCELLED):
+        return False
+    job.status = JOB_PENDING
+    job.max_attempts = job.attempts + settings.JOBS.MAX_ATTEMPTS
+    job.run_after = None
+    job.finished_at = None
+    session.commit()
+    job_worker.wake()
+    return True
+
+
+def cancel_job(session: Session, job: BackgroundJob) -> bool:
+    """Cancel a job that has not started yet."""
+    cancelled = session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job.id, BackgroundJob.status == JOB_PENDING)
+        .values(status=JOB_CANCELLED, finished_at=datetime.utcnow())
+    ).rowcount
+    session.commit()
+    session.refresh(job)
+    return bool(cancelled)
+
+
+def list_jobs(
+    session: Session,
+    created_by: Optional[uuid.UUID] = None,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = 50
+) -> List[BackgroundJob]:
+    """Most recent jobs, optionally filtered."""
+    query = select(BackgroundJob).order_by(BackgroundJob.created_at.desc()).limit(limit)
+    if created_by:
+        query = query.where(BackgroundJob.created_by == created_by)
+    if status:
+        query = query.where(BackgroundJob.status == status)
+    if kind:
+        query = query.where(BackgroundJob.kind == kind)
+    return session.execute(query).scalars().all()
+
+
+def queue_summary(session: Session) -> Dict[str, Dict[str, int]]:
+    """Job counts by kind and status."""
+    summary: Dict[str, Dict[str, int]] = {}
+    for kind, status, count in session.execute(
+        select(BackgroundJob.kind, BackgroundJob.status, func.count())
+        .group_by(BackgroundJob.kind, BackgroundJob.status)
+    ):
+        summary.setdefault(kind, {})[status] = count
+    return summary
+
+
+class JobWorker:
+    """Threads claiming and running queued jobs until stopped."""
+
+    def __init__(self, threads: Optional[int] = None, kinds: Optional[List[str]] = None):
+        self.threads = settings.JOBS.WORKER_THREADS if threads is None else threads
+        self.kinds = kinds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self.threads <= 0 or any(thread.is_alive() for thread in self._threads):
+            return
+        load_handlers()
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._run, args=(index,), name=f"job-worker-{index}", daemon=True)
+            for index in range(self.threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def start_in_process(self) -> None:
+        """Startup hook of the web application."""
+        if settings.JOBS.RUN_IN_PROCESS:
+            self.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def wake(self) -> None:
+        """Check the queue now instead of at the next poll."""
+        self._wakeup.set()
+
+    def run_forever(self) -> None:
+        """Run the worker threads in the foreground until interrupted."""
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                self._stopping.wait(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping job worker...")
+        finally:
+            self.stop()
+
+    def run_once(self) -> Tuple[int, int]:
+        """Run queued jobs in this thread until none is runnable; returns (succeeded, not succeeded)."""
+        from app.db.database import db
+
+        load_handlers()
+        succeeded = unsucceeded = 0
+        session = db.get_session()
+        try:
+            requeue_stale(session)
+            while True:
+                job = claim_job(session, self.worker_id, self.kinds)
+                if job is None:
+                    return succeeded, unsucceeded
+                run_job(session, job)
+                if job.status == JOB_SUCCEEDED:
+                    succeeded += 1
+                else:
+                    unsucceeded += 1
+        finally:
+            db.close_session(session)
+
+    def _run(self, index: int) -> None:
+        from app.db.database import db
+
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            session = db.get_session()
+            try:
+                if index == 0:
+                    requeue_stale(session)
+                job = claim_job(session, f"{self.worker_id}:{index}", self.kinds)
+                if job is not None:
+                    run_job(session, job)
+                    continue
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Job worker error: {str(e)}")
+            finally:
+                db.close_session(session)
+            self._wakeup.wait(settings.JOBS.POLL_INTERVAL)
+
+
+def job_status(job: BackgroundJob) -> Dict[str, Any]:
+    """JSON-serializable state of a job."""
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+# Process-wide worker started with the web application
+job_worker = JobWorker()
@@ -0,0 +1,371 @@
+"""
+Streaming export and restore of project bundles.
+
+An export is an NDJSON stream in the bundle format of
+``app.services.prompt_import``, so the same importer loads it back:
+
+- a ``bundle`` header record,
+- per project: the project record, one record per prompt family with all
+  versions (texts, notes, activation, timestamps and authors), then
+  ``comment`` and ``reply`` records.
+
+Rows are read with server-side cursors (``yield_per``), one family is held
+in memory at a time and output is produced line by line, so exporting a
+large team takes constant memory whether it is written to a file or
+streamed as an HTTP response. Bundles are gzip-compressed NDJSON, or a tar
+archive holding ``manifest.json`` and ``bundle.ndjson``.
+
+Authors are exported by username and mapped back to users of the same name
+on restore, falling back to the restoring user. Comments are only restored
+onto prompts the same restore inserted, so restoring a bundle twice does not
+duplicate the discussion of prompts that already exist.
+"""
+
+import gzip
+import io
+import json
+import logging
+import tarfile
+import tempfile
+import uuid
+import zlib
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models import Comment, Project, Prompt, Reply, Team, User
+from app.services.prompt_import import PromptImporter, read_bundle
+from app.services.version_storage import STORAGE_DELTA, apply_payload, version_texts
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+EXPORT_FORMATS = ("ndjson.gz", "tar")
+BUNDLE_MEMBER = "bundle.ndjson"
+MANIFEST_MEMBER = "manifest.json"
+
+# Rows fetched per round trip from server-side cursors
+YIELD_PER = 500
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _stream(session: Session, query) -> Iterator[Any]:
+    return session.execute(query.execution_options(yield_per=YIELD_PER))
+
+
+def _families(session: Session, project: Project) -> Iterator[Dict[str, Any]]:
+    """Prompt family records of a project, one family in memory at a time."""
+    members = select(Prompt.id.label("id"), Prompt.id.label("root_id"))\
+        .where(Prompt.project_id == project.id, Prompt.parent_id.is_(None))\
+        .cte("export_families", recursive=True)
+    child = aliased(Prompt)
+    members = members.union_all(
+        select(child.id, members.c.root_id).join(members, child.parent_id == members.c.id)
+    )
+    query = select(
+        members.c.root_id,
+        Prompt.id,
+        Prompt.parent_id,
+        Prompt.key,
+        Prompt.name,
+        Prompt.description,
+        Prompt.version,
+        Prompt.is_active,
+        Prompt.version_notes,
+        Prompt.created_at,
+        Prompt.storage_format,
+        Prompt.text_delta,
+        Prompt.system_prompt.label("system_prompt"),
+        Prompt.user_prompt.label("user_prompt"),
+        User.username.label("created_by")
+    ).join(members, members.c.id == Prompt.id)\
+        .outerjoin(User, User.id == Prompt.created_by)\
+        .order_by(members.c.root_id, Prompt.version, Prompt.created_at)
+
+    root_id, family, texts = None, None, {}
+    for row in _stream(session, query):
+        if row.root_id != root_id:
+            if family:
+                yield family
+            root_id, texts = row.root_id, {}
+            family = {
+                "project": project.key,
+                "key": row.key,
+                "name": row.name,
+                "description": row.description,
+                "versions": []
+            }
+
+        # Delta versions are rebuilt from their parent, which precedes them
+        if row.storage_format != STORAGE_DELTA:
+            texts[row.id] = (row.system_prompt, row.user_prompt)
+        elif row.parent_id in texts:
+            texts[row.id] = apply_payload(texts[row.parent_id], row.text_delta)
+        else:
+            texts[row.id] = version_texts(session.get(Prompt, row.id))
+
+        family["versions"].append({
+            "key": row.key,
+            "name": row.name,
+            "description": row.description,
+            "system_prompt": texts[row.id][0],
+            "user_prompt": texts[row.id][1],
+            "version_notes": row.version_notes,
+            "is_active": bool(row.is_active),
+            "created_at": _iso(row.created_at),
+            "created_by": row.created_by
+        })
+    if family:
+        yield family
+
+
+def _comments(session: Session, project: Project) -> Iterator[Dict[str, Any]]:
+    comments = select(
+        Comment.id, Comment.content, Comment.is_pinned, Comment.is_edited, Comment.created_at,
+        Prompt.key.label("prompt"), User.username.label("author")
+    ).join(Prompt, Prompt.id == Comment.prompt_id)\
+        .outerjoin(User, User.id == Comment.created_by)\
+        .where(Prompt.project_id == project.id)\
+        .order_by(Comment.created_at, Comment.id)
+    for row in _stream(session, comments):
+        yield {
+            "type": "comment",
+            "project": project.key,
+            "prompt": row.prompt,
+            "ref": str(row.id),
+            "content": row.content,
+            "is_pinned": bool(row.is_pinned),
+            "is_edited": bool(row.is_edited),
+            "created_at": _iso(row.created_at),
+            "author": row.author
+        }
+
+    replies = select(
+        Reply.id, Reply.comment_id, Reply.content, Reply.is_edited, Reply.created_at,
+        User.username.label("author")
+    ).join(Comment, Comment.id == Reply.comment_id)\
+        .join(Prompt, Prompt.id == Comment.prompt_id)\
+        .outerjoin(User, User.id == Reply.created_by)\
+        .where(Prompt.project_id == project.id)\
+        .order_by(Reply.created_at, Reply.id)
+    for row in _stream(session, replies):
+        yield {
+            "type": "reply",
+            "project": project.key,
+            "comment": str(row.comment_id),
+            "content": row.content,
+            "is_edited": bool(row.is_edited),
+            "created_at": _iso(row.created_at),
+            "author": row.author
+        }
+
+
+def export_records(session: Session, project_ids: List[uuid.UUID]) -> Iterator[Dict[str, Any]]:
+    """All bundle records of the given projects, header first."""
+    projects = session.query(Project.id, Project.key, Project.name, Project.description, Team.name.label("team"))\
+        .outerjoin(Team, Team.id == Project.team_id)\
+        .filter(Project.id.in_(project_ids))\
+        .order_by(Project.key)\
+        .all()
+    yield {
+        "type": "bundle",
+        "version": BUNDLE_VERSION,
+        "exported_at": datetime.utcnow().isoformat(),
+        "projects": [project.key for project in projects]
+    }
+    for project in projects:
+        yield {"key": project.key, "name": project.name, "description": project.description, "team": project.team}
+        yield from _families(session, project)
+        yield from _comments(session, project)
+
+
+def team_project_ids(session: Session, team_id: uuid.UUID) -> List[uuid.UUID]:
+    return [project_id for (project_id,) in session.query(Project.id).filter(Project.team_id == team_id).all()]
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, default=str, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def ndjson_lines(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    for record in records:
+        yield _line(record)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6, min_chunk: int = 64 * 1024) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally, yielding compressed chunks of at least `min_chunk` bytes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += compressor.compress(chunk)
+        if len(buffer) >= min_chunk:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += compressor.flush()
+    yield bytes(buffer)
+
+
+def stream_export(project_ids: List[uuid.UUID]) -> Iterator[bytes]:
+    """Gzipped NDJSON of the projects, for a streaming HTTP response; uses its own session."""
+    from app.db.database import db
+
+    # Chunks are produced on whichever threadpool thread is free, so the
+    # thread's scoped session would be shared with other requests
+    session = db.new_session()
+    try:
+        yield from gzip_chunks(ndjson_lines(export_records(session, project_ids)))
+    finally:
+        session.rollback()
+        db.close_session(session)
+
+
+def write_export(session: Session, project_ids: List[uuid.UUID], output: IO[bytes], fmt: str = "ndjson.gz") -> int:
+    """Write an export bundle to a binary file and return the number of records."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Available: {', '.join(EXPORT_FORMATS)}")
+
+    count = 0
+    if fmt == "ndjson.gz":
+        with gzip.GzipFile(fileobj=output, mode="wb") as stream:
+            for line in ndjson_lines(export_records(session, project_ids)):
+                stream.write(line)
+                count += 1
+        return count
+
+    # tar members need their size up front, so the NDJSON is spooled to disk first
+    header = None
+    with tempfile.TemporaryFile() as spool:
+        for record in export_records(session, project_ids):
+            if header is None:
+                header = record
+            spool.write(_line(record))
+            count += 1
+        size = spool.tell()
+        spool.seek(0)
+        with tarfile.open(fileobj=output, mode="w|gz") as archive:
+            manifest = json.dumps(dict(header, records=count), indent=2).encode("utf-8")
+            info = tarfile.TarInfo(MANIFEST_MEMBER)
+            info.size = len(manifest)
+            archive.addfile(info, io.BytesIO(manifest))
+            info = tarfile.TarInfo(BUNDLE_MEMBER)
+            info.size = size
+            archive.addfile(info, spool)
+    return count
+
+
+def open_bundle(path: str) -> IO[str]:
+    """Open an exported (tar, gzip) or plain NDJSON bundle as a text stream."""
+    if tarfile.is_tarfile(path):
+        archive = tarfile.open(path, mode="r:*")
+        member = archive.extractfile(BUNDLE_MEMBER)
+        if member is None:
+            raise ValueError(f"Archive has no {BUNDLE_MEMBER}")
+        return io.TextIOWrapper(member, encoding="utf-8")
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8-sig")
+
+
+class BundleRestorer(PromptImporter):
+    """Importer that also restores the comments and replies of an export bundle."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats.update(comments=0, replies=0)
+        self._discussion: List[Tuple[str, str, Dict[str, Any]]] = []
+        # Exported comment ids to restored ones
+        self._comment_ids: Dict[str, uuid.UUID] = {}
+        # (project id, prompt key) of every version this run inserted, to its id
+        self._restored_prompts: Dict[Tuple[uuid.UUID, str], uuid.UUID] = {}
+
+    def add(self, location: str, kind: str, data: Dict[str, Any]) -> None:
+        if kind in ("comment", "reply"):
+            self._discussion.append((location, kind, data))
+            if len(self._discussion) >= self.batch_size:
+                self.flush()
+        else:
+            super().add(location, kind, data)
+
+    def flush(self) -> None:
+        # Prompts first, so comments can reference them
+        super().flush()
+        if self._discussion:
+            batch, self._discussion = self._discussion, []
+            self._restore_discussion(batch)
+
+    def _count(self, accepted: List[Any], rows: List[Dict[str, Any]]) -> None:
+        super()._count(accepted, rows)
+        # Only prompts inserted here take comments; existing ones were rejected by the import
+        self._restored_prompts.update(((row["project_id"], row["key"]), row["id"]) for row in rows)
+
+    def _restore_discussion(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        comments, replies = [], []
+        for location, kind, data in batch:
+            project_id = self._projects.get(data.get("project"))
+            content = data.get("content")
+            if not isinstance(content, str) or not content:
+                self._error(location, data.get("project"), data.get("prompt"), f"{kind.capitalize()} content is required")
+                continue
+            try:
+                created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else datetime.utcnow()
+            except (TypeError, ValueError) as e:
+                self._error(location, data.get("project"), data.get("prompt"), str(e))
+                continue
+            row = {
+                "id": uuid.uuid4(),
+                "content": content,
+                "is_edited": bool(data.get("is_edited")),
+                "created_by": self.user_id_for(data.get("author")),
+                "updated_by": self.user_id,
+                "created_at": created_at,
+                "updated_at": created_at
+            }
+            if kind == "comment":
+                prompt_id = self._restored_prompts.get((project_id, data.get("prompt")))
+                if prompt_id is None:
+                    self._error(location, data.get("project"), data.get("prompt"), "Comment on a prompt that was not restored")
+                    continue
+                self._comment_ids[str(data.get("ref"))] = row["id"]
+                comments.append(dict(row, prompt_id=prompt_id, is_pinned=bool(data.get("is_pinned"))))
+            else:
+                comment_id = self._comment_ids.get(str(data.get("comment")))
+                if comment_id is None:
+                    self._error(location, data.get("project"), None, "Reply to a comment that was not restored")
+                    continue
+                replies.append(dict(row, comment_id=comment_id))
+
+        if not self.dry_run:
+            try:
+                if comments:
+                    self.session.execute(insert(Comment.__table__), comments)
+                if replies:
+                    self.session.execute(insert(Reply.__table__), replies)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Restoring comments failed: {str(e)}")
+                for location, kind, data in batch:
+                    self._error(location, data.get("project"), data.get("prompt"), f"Batch failed: {e}")
+                return
+        self.stats["comments"] += len(comments)
+        self.stats["replies"] += len(replies)
+
+
+def restore_bundle(
+    session: Session,
+    stream: IO[str],
+    user_id: uuid.UUID,
+    team_id: Optional[uuid.UUID] = None,
+    batch_size: int = 1000,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Load an export bundle: projects, prompt families, comments and replies."""
+    restorer = BundleRestorer(session, user_id, batch_size=batch_size, dry_run=dry_run, team_id=team_id)
+    return restorer.run(read_bundle(stream, "ndjson"))
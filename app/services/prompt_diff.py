@@ -0,0 +1,172 @@
+"""
+Prompt version diffs for Promptlane.
+
+Diffs are computed on the server with ``difflib`` at two granularities:
+
+- ``line``: hunks of changed lines with surrounding context, plus a unified
+  diff that the browser renders with diff2html;
+- ``word``: the whole text as a sequence of equal/insert/delete segments,
+  suited for inline highlighting of small edits.
+
+A diff depends only on the two versions involved, so results are kept in a
+process-wide LRU keyed by the version pair. ``updated_at`` is part of the key
+because a version can still be edited in place, which then simply misses the
+cache instead of serving a stale diff.
+"""
+
+import difflib
+import re
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.lru import LRUCache
+
+GRANULARITIES = ("line", "word")
+
+DIFF_FIELDS = ("name", "system_prompt", "user_prompt")
+
+# Words, runs of whitespace and single punctuation characters
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
+
+def _normalize(text: Optional[str]) -> str:
+    return (text or "").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _line_diff(old: str, new: str, context: int, label: str) -> Dict[str, Any]:
+    old_lines = old.split("\n") if old else []
+    new_lines = new.split("\n") if new else []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    hunks = []
+    added = removed = 0
+    for group in matcher.get_grouped_opcodes(context):
+        changes = []
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                changes.extend({"op": "equal", "text": line} for line in old_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                changes.extend({"op": "delete", "text": line} for line in old_lines[i1:i2])
+                removed += i2 - i1
+            if tag in ("replace", "insert"):
+                changes.extend({"op": "insert", "text": line} for line in new_lines[j1:j2])
+                added += j2 - j1
+        first, last = group[0], group[-1]
+        old_count, new_count = last[2] - first[1], last[4] - first[3]
+        # Same numbering as unified diff headers: empty ranges start before line 1
+        hunks.append({
+            "old_start": first[1] + 1 if old_count else first[1],
+            "old_lines": old_count,
+            "new_start": first[3] + 1 if new_count else first[3],
+            "new_lines": new_count,
+            "changes": changes
+        })
+
+    unified = "\n".join(difflib.unified_diff(
+        old_lines, new_lines, fromfile=f"a/{label}", tofile=f"b/{label}", n=context, lineterm=""
+    ))
+    return {
+        "hunks": hunks,
+        "unified": f"diff --git a/{label} b/{label}\n{unified}\n" if unified else "",
+        "stats": {"added": added, "removed": removed}
+    }
+
+
+def _word_diff(old: str, new: str) -> Dict[str, Any]:
+    old_tokens = _TOKEN_RE.findall(old)
+    new_tokens = _TOKEN_RE.findall(new)
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+
+    segments: List[Dict[str, str]] = []
+    added = removed = 0
+
+    def emit(op: str, tokens: List[str]) -> None:
+        if not tokens:
+            return
+        if segments and segments[-1]["op"] == op:
+            segments[-1]["text"] += "".join(tokens)
+        else:
+            segments.append({"op": op, "text": "".join(tokens)})
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            emit("equal", old_tokens[i1:i2])
+            continue
+        if tag in ("replace", "delete"):
+            emit("delete", old_tokens[i1:i2])
+            removed += sum(1 for token in old_tokens[i1:i2] if not token.isspace())
+        if tag in ("replace", "insert"):
+            emit("insert", new_tokens[j1:j2])
+            added += sum(1 for token in new_tokens[j1:j2] if not token.isspace())
+    return {"segments": segments, "stats": {"added": added, "removed": removed}}
+
+
+def diff_texts(
+    old: Optional[str],
+    new: Optional[str],
+    granularity: str = "line",
+    context: int = 3,
+    label: str = "text"
+) -> Dict[str, Any]:
+    """Diff two texts at line or word granularity."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown diff granularity '{granularity}'. Available: {', '.join(GRANULARITIES)}")
+    old, new = _normalize(old), _normalize(new)
+
+    # Word diffs of very long texts are quadratic; fall back to lines
+    if granularity == "word" and max(len(old), len(new)) > settings.VERSIONS.DIFF_MAX_CHARS:
+        granularity = "line"
+
+    if granularity == "line":
+        result = _line_diff(old, new, context, label)
+    else:
+        result = _word_diff(old, new)
+    result.update(granularity=granularity, identical=old == new)
+    return result
+
+
+def version_metadata(version: Any) -> Dict[str, Any]:
+    """Identifying fields of a version, without its text."""
+    return {
+        "id": str(version.id),
+        "version": version.version,
+        "is_active": bool(version.is_active),
+        "created_at": version.created_at.isoformat() if version.created_at else None,
+        "updated_at": version.updated_at.isoformat() if version.updated_at else None
+    }
+
+
+# Process-wide cache
+diff_cache = LRUCache(settings.VERSIONS.DIFF_CACHE_SIZE)
+
+
+def diff_versions(base: Any, target: Any, granularity: str = "line", context: int = 3) -> Dict[str, Any]:
+    """
+    Diff the name, system prompt and user prompt of two versions.
+
+    Only ``id`` and ``updated_at`` are read before the cache lookup, so
+    versions loaded with their text deferred are not materialized on a hit.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown diff granularity '{granularity}'. Available: {', '.join(GRANULARITIES)}")
+    key = (base.id, base.updated_at, target.id, target.updated_at, granularity, context)
+
+    def compute() -> Dict[str, Any]:
+        return {
+            "base": version_metadata(base),
+            "target": version_metadata(target),
+            "granularity": granularity,
+            "fields": {
+                field: diff_texts(
+                    getattr(base, field),
+                    getattr(target, field),
+                    granularity=granularity,
+                    context=context,
+                    label=field
+                )
+                for field in DIFF_FIELDS
+            }
+        }
+
+    return diff_cache.get_or_compute(key, compute)
@@ -0,0 +1,445 @@
+"""
+Bulk import of projects, prompts and version histories.
+
+A bundle lists projects and the prompt families in them. It can be a JSON
+document, newline-delimited JSON (one record per line, suited for large
+libraries) or YAML::
+
+    {"projects": [{"key": "support", "name": "Support", "prompts": [
+        {"key": "triage", "name": "Triage", "user_prompt": "Classify: {{ticket}}"},
+        {"key": "reply", "name": "Reply", "versions": [
+            {"user_prompt": "Answer {{question}}"},
+            {"user_prompt": "Answer {{question}} politely", "version_notes": "Tone"}
+        ]}
+    ]}]}
+
+In NDJSON each line is a project (optionally with nested ``prompts``) or a
+prompt with a ``project`` field holding the project key. Projects that do
+not exist yet are created; a prompt with ``versions`` becomes a version
+family whose last version (or the one marked ``is_active``) is active.
+Versions may carry their own ``key``, ``created_at`` and ``created_by``
+(a username), as written by project exports.
+
+Prompts are imported in batches. Each batch checks its keys against
+existing prompts with one query, writes blobs and prompt rows with
+multi-row INSERTs, logs one summary activity and commits, so a failing
+batch never affects the others. Invalid rows are skipped and reported with
+their location in the bundle.
+"""
+
+import json
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+from sqlalchemy import insert, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Activity, ActivityType, Project, Prompt, TextBlob, User, content_fingerprint, text_hash
+from app.services.events import event_broker, project_channel
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "ndjson", "yaml")
+
+# Per-row errors kept in the result; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+
+Record = Tuple[str, str, Dict[str, Any]]
+
+# NDJSON records tagged with a "type" (written by project exports)
+RECORD_TYPES = ("bundle", "comment", "reply")
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """Guess the bundle format from a file name or content type, defaulting to JSON."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if name.endswith((".yaml", ".yml")) or "yaml" in content_type:
+        return "yaml"
+    return "json"
+
+
+def _projects_records(projects: Any, path: str) -> Iterator[Record]:
+    if not isinstance(projects, list):
+        raise ValueError(f"{path} must be a list of projects")
+    for index, project in enumerate(projects):
+        yield from _project_records(project, f"{path}[{index}]")
+
+
+def _project_records(project: Any, location: str) -> Iterator[Record]:
+    if not isinstance(project, dict):
+        yield location, "project", {}
+        return
+    prompts = project.get("prompts") or []
+    yield location, "project", {k: v for k, v in project.items() if k != "prompts"}
+    for index, prompt in enumerate(prompts if isinstance(prompts, list) else []):
+        record = dict(prompt, project=project.get("key")) if isinstance(prompt, dict) else {}
+        yield f"{location}.prompts[{index}]", "prompt", record
+
+
+def read_bundle(stream: IO[str], fmt: str = "json") -> Iterator[Record]:
+    """
+    Yield ``(location, kind, data)`` records from a bundle.
+
+    NDJSON is read line by line; JSON and YAML documents are loaded whole.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown bundle format '{fmt}'. Available: {', '.join(FORMATS)}")
+
+    if fmt == "ndjson":
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            location = f"line {number}"
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield location, "invalid", {"error": f"Invalid JSON: {e}"}
+                continue
+            if isinstance(record, dict) and record.get("type") in RECORD_TYPES:
+                yield location, record["type"], record
+            elif isinstance(record, dict) and "project" in record:
+                yield location, "prompt", record
+            else:
+                yield from _project_records(record, location)
+        return
+
+    if fmt == "yaml":
+        try:
+            document = yaml.safe_load(stream)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}")
+    else:
+        document = json.load(stream)
+
+    if isinstance(document, dict):
+        document = document.get("projects", [])
+    yield from _projects_records(document, "projects")
+
+
+def _length(column) -> int:
+    return column.type.length
+
+
+class PromptImporter:
+    """Import bundle records into the database in batches."""
+
+    def __init__(
+        self,
+        session: Session,
+        user_id: uuid.UUID,
+        access: Any = None,
+        batch_size: int = 1000,
+        dry_run: bool = False,
+        team_id: Optional[uuid.UUID] = None
+    ):
+        self.session = session
+        self.user_id = user_id
+        # Access index of the importing user; existing projects must be editable
+        self.access = access
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        # Team that new projects are created in
+        self.team_id = team_id
+        self._projects: Dict[str, Any] = {}
+        self._users: Dict[str, uuid.UUID] = {}
+        self._seen_keys = set()
+        self._batch: List[Tuple[str, Dict[str, Any]]] = []
+        self.stats = {"projects_created": 0, "prompts": 0, "versions": 0, "batches": 0, "errors_total": 0}
+        self.errors: List[Dict[str, Any]] = []
+
+    def run(self, records: Iterable[Record]) -> Dict[str, Any]:
+        """Import all records and return counts and per-row errors."""
+        for location, kind, data in records:
+            self.add(location, kind, data)
+        self.flush()
+        return dict(self.stats, errors=self.errors, dry_run=self.dry_run)
+
+    def add(self, location: str, kind: str, data: Dict[str, Any]) -> None:
+        """Handle one record; prompts are queued and imported once a batch is full."""
+        if kind == "invalid":
+            self._error(location, None, None, data["error"])
+        elif kind == "project":
+            self._import_project(location, data)
+        elif kind == "prompt":
+            self._batch.append((location, data))
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Import the queued prompts."""
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self._import_batch(batch)
+
+    def user_id_for(self, username: Optional[str]) -> uuid.UUID:
+        """Id of a user by username, falling back to the importing user."""
+        if not username:
+            return self.user_id
+        if username not in self._users:
+            user_id = self.session.query(User.id).filter(User.username == username).scalar()
+            self._users[username] = user_id or self.user_id
+        return self._users[username]
+
+    def _error(self, location: str, project: Optional[str], key: Optional[str], message: str) -> None:
+        self.stats["errors_total"] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"location": location, "project": project, "key": key, "error": message})
+
+    def _import_project(self, location: str, data: Dict[str, Any]) -> None:
+        key, name = data.get("key"), data.get("name")
+        if not isinstance(key, str) or not key or len(key) > _length(Project.key):
+            self._error(location, key, None, f"Project key must be 1-{_length(Project.key)} characters")
+            return
+        if key in self._projects:
+            return
+
+        project = self.session.query(Project).filter(Project.key == key).first()
+        if project is not None:
+            if self.access is not None and not self.access.can_edit_project(project):
+                self._projects[key] = f"Not authorized to import into project '{key}'"
+            else:
+                self._projects[key] = project.id
+            return
+
+        name = name or key
+        if not isinstance(name, str) or len(name) > _length(Project.name):
+            self._projects[key] = f"Project name must be at most {_length(Project.name)} characters"
+            return
+        project_id = uuid.uuid4()
+        if not self.dry_run:
+            self.session.add(Project(
+                id=project_id,
+                key=key,
+                name=name,
+                description=data.get("description"),
+                team_id=self.team_id,
+                created_by=self.user_id,
+                updated_by=self.user_id
+            ))
+            self.session.commit()
+        self._projects[key] = project_id
+        self.stats["projects_created"] += 1
+
+    def _versions(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Normalize a prompt record to its list of versions, oldest first."""
+        versions = data.get("versions")
+        if versions is None:
+            versions = [data]
+        if not isinstance(versions, list) or not versions:
+            raise ValueError("versions must be a non-empty list")
+
+        normalized = []
+        for number, version in enumerate(versions, start=1):
+            if not isinstance(version, dict):
+                raise ValueError(f"Version {number} must be an object")
+            name = version.get("name") or data.get("name") or data["key"]
+            description = version.get("description", data.get("description"))
+            system_prompt, user_prompt = version.get("system_prompt"), version.get("user_prompt")
+            if not isinstance(user_prompt, str):
+                raise ValueError(f"Version {number}: user_prompt is required")
+            if system_prompt is not None and not isinstance(system_prompt, str):
+                raise ValueError(f"Version {number}: system_prompt must be a string")
+            if not isinstance(name, str) or len(name) > _length(Prompt.name):
+                raise ValueError(f"Version {number}: name must be at most {_length(Prompt.name)} characters")
+            if description is not None and len(str(description)) > _length(Prompt.description):
+                raise ValueError(f"Version {number}: description must be at most {_length(Prompt.description)} characters")
+            created_at = version.get("created_at")
+            key = version.get("key")
+            if key is not None and (not isinstance(key, str) or not key):
+                raise ValueError(f"Version {number}: key must be a non-empty string")
+            normalized.append({
+                "key": key,
+                "name": name,
+                "description": description,
+                "system_prompt": system_prompt,
+                "user_prompt": user_prompt,
+                "version_notes": version.get("version_notes"),
+                "is_active": bool(version.get("is_active")),
+                "created_at": datetime.fromisoformat(created_at) if created_at else None,
+                "created_by": version.get("created_by")
+            })
+        if not any(version["is_active"] for version in normalized):
+            normalized[-1]["is_active"] = True
+        elif sum(version["is_active"] for version in normalized) > 1:
+            raise ValueError("Only one version can be active")
+        return normalized
+
+    def _import_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Validate rows and derive the key of every version
+        families = []
+        for location, data in batch:
+            project_key, key = data.get("project"), data.get("key")
+            project_id = self._projects.get(project_key)
+            if project_id is None:
+                self._error(location, project_key, key, f"Unknown project '{project_key}'")
+                continue
+            if isinstance(project_id, str):
+                self._error(location, project_key, key, project_id)
+                continue
+            if not isinstance(key, str) or not key:
+                self._error(location, project_key, key, "Prompt key is required")
+                continue
+            try:
+                versions = self._versions(data)
+            except (KeyError, TypeError, ValueError) as e:
+                self._error(location, project_key, key, str(e))
+                continue
+            keys = [
+                version["key"] or (key if number == 1 else f"{key}_v{number}")
+                for number, version in enumerate(versions, start=1)
+            ]
+            too_long = next((k for k in keys if len(k) > _length(Prompt.key)), None)
+            if too_long:
+                self._error(location, project_key, key, f"Prompt key '{too_long}' exceeds {_length(Prompt.key)} characters")
+                continue
+            if len(set(keys)) < len(keys):
+                self._error(location, project_key, key, "Version keys must be unique")
+                continue
+            duplicate = next((k for k in keys if (project_id, k) in self._seen_keys), None)
+            if duplicate:
+                self._error(location, project_key, key, f"Duplicate prompt key '{duplicate}' in bundle")
+                continue
+            self._seen_keys.update((project_id, k) for k in keys)
+            families.append((location, project_key, project_id, keys, versions))
+
+        # uq_prompt_project_key, checked for the whole batch at once
+        pairs = [(project_id, k) for _, _, project_id, keys, _ in families for k in keys]
+        existing = set()
+        if pairs:
+            existing = set(
+                self.session.query(Prompt.project_id, Prompt.key)
+                .filter(tuple_(Prompt.project_id, Prompt.key).in_(pairs))
+                .all()
+            )
+        accepted = []
+        for family in families:
+            location, project_key, project_id, keys, _ = family
+            taken = next((k for k in keys if (project_id, k) in existing), None)
+            if taken:
+                self._error(location, project_key, keys[0], f"Prompt key '{taken}' already exists in project")
+            else:
+                accepted.append(family)
+        if not accepted:
+            return
+
+        now = datetime.utcnow()
+        blobs: Dict[str, str] = {}
+        references = Counter()
+        rows = []
+        for _, _, project_id, keys, versions in accepted:
+            parent_id = None
+            for number, (key, version) in enumerate(zip(keys, versions), start=1):
+                hashes = {}
+                for field in ("system_prompt", "user_prompt"):
+                    content = version[field]
+                    hashes[field] = text_hash(content)
+                    if content is not None:
+                        blobs[hashes[field]] = content
+                        references[hashes[field]] += 1
+                prompt_id = uuid.uuid4()
+                rows.append({
+                    "id": prompt_id,
+                    "project_id": project_id,
+                    "key": key,
+                    "name": version["name"],
+                    "description": version["description"],
+                    "system_prompt": None,
+                    "user_prompt": "",
+                    "system_prompt_hash": hashes["system_prompt"],
+                    "user_prompt_hash": hashes["user_prompt"],
+                    "content_hash": content_fingerprint(version["name"], hashes["system_prompt"], hashes["user_prompt"]),
+                    "storage_format": "full",
+                    "is_active": version["is_active"],
+                    "version": number,
+                    "version_notes": version["version_notes"],
+                    "parent_id": parent_id,
+                    "created_by": self.user_id_for(version["created_by"]),
+                    "updated_by": self.user_id,
+                    "created_at": version["created_at"] or now,
+                    "updated_at": now
+                })
+                parent_id = prompt_id
+
+        if self.dry_run:
+            self._count(accepted, rows)
+            return
+
+        try:
+            # One statement per table; sorted blob hashes keep lock order stable across writers
+            blob_table = TextBlob.__table__
+            statement = pg_insert(blob_table)
+            self.session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["hash"],
+                    set_={"ref_count": blob_table.c.ref_count + statement.excluded.ref_count}
+                ),
+                [
+                    {
+                        "hash": blob_hash,
+                        "content": blobs[blob_hash],
+                        "size": len(blobs[blob_hash].encode("utf-8")),
+                        "ref_count": references[blob_hash],
+                        "created_at": now
+                    }
+                    for blob_hash in sorted(blobs)
+                ]
+            )
+            self.session.execute(insert(Prompt.__table__), rows)
+            self.session.add(Activity(
+                id=uuid.uuid4(),
+                user_id=self.user_id,
+                activity_type=ActivityType.IMPORT_PROMPTS,
+                details={
+                    "batch": self.stats["batches"] + 1,
+                    "prompts": len(accepted),
+                    "versions": len(rows),
+                    "project_ids": sorted({str(family[2]) for family in accepted})
+                },
+                created_at=now
+            ))
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Prompt import batch failed: {str(e)}")
+            for location, project_key, _, keys, _ in accepted:
+                self._error(location, project_key, keys[0], f"Batch failed: {e}")
+            return
+
+        self._count(accepted, rows)
+        per_project = Counter(str(family[2]) for family in accepted)
+        for project_id, count in per_project.items():
+            event_broker.publish([project_channel(project_id)], "prompt.imported", {
+                "project_id": project_id,
+                "count": count
+            })
+
+    def _count(self, accepted: List[Any], rows: List[Dict[str, Any]]) -> None:
+        self.stats["batches"] += 1
+        self.stats["prompts"] += len(accepted)
+        self.stats["versions"] += len(rows)
+        logger.info(f"Imported batch {self.stats['batches']}: {len(accepted)} prompts, {len(rows)} versions")
+
+
+def import_bundle(
+    session: Session,
+    stream: IO[str],
+    user_id: uuid.UUID,
+    fmt: str = "json",
+    access: Any = None,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    team_id: Optional[uuid.UUID] = None
+) -> Dict[str, Any]:
+    """Read a bundle from a text stream and import it."""
+    importer = PromptImporter(
+        session, user_id, access=access, batch_size=batch_size, dry_run=dry_run, team_id=team_id
+    )
+    return importer.run(read_bundle(stream, fmt))
@@ -0,0 +1,401 @@
+"""
+Storage accounting for Promptlane.
+
+A refresh measures where the database space goes and stores the result as a
+snapshot in ``storage_stats``:
+
+- ``database``: ``pg_database_size`` of the current database;
+- ``table``: ``pg_total_relation_size`` (heap, indexes and TOAST) and the
+  planner row estimate of every model table;
+- ``project``, ``prompt`` and ``family``: summed text lengths of prompt
+  versions (full texts, or delta payloads for delta-encoded versions),
+  comments, replies and (for projects) activity details, keeping the
+  ``settings.STORAGE.STATS_TOP_N`` largest of each.
+
+Text sizes are ``octet_length`` of the values, i.e. the logical size before
+compression and before blob deduplication; they are meant for ranking
+tenants, not for billing.
+
+Refreshes run from ``manage.py db refresh-storage-stats`` or periodically in
+the web process (``settings.STORAGE.STATS_REFRESH_INTERVAL``). A transaction
+level advisory lock makes concurrent refreshes from several workers skip
+instead of doing the same work twice.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import String, Text, cast, func, literal, select, text
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.db import models
+from app.db.database import db
+from app.services.jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock
+REFRESH_LOCK_KEY = 0x5707A6E
+
+REFRESH_STORAGE_STATS = "refresh_storage_stats"
+
+
+def format_bytes(size: Optional[int]) -> str:
+    """Human readable byte size, e.g. ``1.2 GB``."""
+    if size is None:
+        return "unknown"
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            return f"{int(value)} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _text_bytes(*columns) -> Any:
+    """Sum of octet lengths of nullable text columns."""
+    total = literal(0)
+    for column in columns:
+        total = total + func.coalesce(func.octet_length(column), 0)
+    return total
+
+
+class StorageAccounting:
+    """Measure storage usage and read the stored snapshot."""
+
+    def __init__(self, db_session: Optional[Session] = None):
+        self._db = db_session or db.get_session()
+
+    # Measurements
+
+    def database_size(self) -> int:
+        return int(self._db.execute(text("SELECT pg_database_size(current_database())")).scalar() or 0)
+
+    def table_sizes(self) -> List[Dict[str, Any]]:
+        """Total relation size and row estimate of every model table."""
+        table_names = sorted(models.Base.metadata.tables.keys())
+        rows = self._db.execute(
+            text(
+                "SELECT c.relname, pg_total_relation_size(c.oid), pg_relation_size(c.oid), c.reltuples "
+                "FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind = 'r' AND n.nspname = current_schema() AND c.relname = ANY(:tables)"
+            ),
+            {"tables": table_names}
+        ).all()
+        return [
+            {
+                "key": name,
+                "label": name,
+                "row_count": max(int(reltuples), 0),
+                "total_bytes": int(total_bytes),
+                "details": {"heap_bytes": int(heap_bytes), "other_bytes": int(total_bytes) - int(heap_bytes)}
+            }
+            for name, total_bytes, heap_bytes, reltuples in rows
+        ]
+
+    def _per_prompt(self):
+        """Subquery of text bytes per prompt version, including its comments and replies."""
+        Prompt, Comment, Reply = models.Prompt, models.Comment, models.Reply
+        comments = self._db.query(
+            Comment.prompt_id.label("prompt_id"),
+            func.count(Comment.id).label("comment_count"),
+            func.sum(_text_bytes(Comment.content)).label("comment_bytes")
+        ).group_by(Comment.prompt_id).subquery()
+        replies = self._db.query(
+            Comment.prompt_id.label("prompt_id"),
+            func.count(Reply.id).label("reply_count"),
+            func.sum(_text_bytes(Reply.content)).label("reply_bytes")
+        ).join(Reply, Reply.comment_id == Comment.id).group_by(Comment.prompt_id).subquery()
+
+        prompt_bytes = _text_bytes(
+            Prompt.system_prompt, Prompt.user_prompt, Prompt.description, Prompt.version_notes,
+            cast(Prompt.text_delta, Text)
+        )
+        discussion_bytes = func.coalesce(comments.c.comment_bytes, 0) + func.coalesce(replies.c.reply_bytes, 0)
+        return self._db.query(
+            Prompt.id.label("id"),
+            Prompt.project_id.label("project_id"),
+            Prompt.parent_id.label("parent_id"),
+            Prompt.name.label("name"),
+            Prompt.version.label("version"),
+            prompt_bytes.label("prompt_bytes"),
+            discussion_bytes.label("discussion_bytes"),
+            (func.coalesce(comments.c.comment_count, 0) + func.coalesce(replies.c.reply_count, 0)).label("discussion_count"),
+            (prompt_bytes + discussion_bytes).label("total_bytes")
+        ).outerjoin(comments, comments.c.prompt_id == Prompt.id)\
+            .outerjoin(replies, replies.c.prompt_id == Prompt.id)\
+            .subquery()
+
+    def _family_roots(self):
+        """Recursive subquery mapping every prompt version to the root of its family."""
+        Prompt = models.Prompt
+        roots = select(Prompt.id.label("id"), Prompt.id.label("root_id"))\
+            .where(Prompt.parent_id.is_(None))\
+            .cte("family_roots", recursive=True)
+        child = aliased(Prompt)
+        return roots.union_all(
+            select(child.id, roots.c.root_id).join(roots, child.parent_id == roots.c.id)
+        )
+
+    def largest_prompts(self, limit: int) -> List[Dict[str, Any]]:
+        per_prompt = self._per_prompt()
+        rows = self._db.query(per_prompt)\
+            .order_by(per_prompt.c.total_bytes.desc(), per_prompt.c.id)\
+            .limit(limit)\
+            .all()
+        return [
+            {
+                "key": str(row.id),
+                "label": f"{row.name} (v{row.version})",
+                "project_id": row.project_id,
+                "row_count": 1 + row.discussion_count,
+                "text_bytes": int(row.total_bytes),
+                "total_bytes": int(row.total_bytes),
+                "details": {"prompt_bytes": int(row.prompt_bytes), "discussion_bytes": int(row.discussion_bytes)}
+            }
+            for row in rows
+        ]
+
+    def largest_families(self, limit: int) -> List[Dict[str, Any]]:
+        per_prompt = self._per_prompt()
+        roots = self._family_roots()
+        root_prompt = aliased(models.Prompt)
+        total = func.sum(per_prompt.c.total_bytes)
+        rows = self._db.query(
+            roots.c.root_id,
+            root_prompt.name,
+            root_prompt.project_id,
+            func.count(per_prompt.c.id).label("version_count"),
+            func.sum(per_prompt.c.prompt_bytes).label("prompt_bytes"),
+            func.sum(per_prompt.c.discussion_bytes).label("discussion_bytes"),
+            total.label("total_bytes")
+        ).join(per_prompt, per_prompt.c.id == roots.c.id)\
+            .join(root_prompt, root_prompt.id == roots.c.root_id)\
+            .group_by(roots.c.root_id, root_prompt.name, root_prompt.project_id)\
+            .order_by(total.desc(), roots.c.root_id)\
+            .limit(limit)\
+            .all()
+        return [
+            {
+                "key": str(row.root_id),
+                "label": row.name,
+                "project_id": row.project_id,
+                "row_count": row.version_count,
+                "text_bytes": int(row.total_bytes),
+                "total_bytes": int(row.total_bytes),
+                "details": {
+                    "version_count": row.version_count,
+                    "prompt_bytes": int(row.prompt_bytes),
+                    "discussion_bytes": int(row.discussion_bytes)
+                }
+            }
+            for row in rows
+        ]
+
+    def largest_projects(self, limit: int) -> List[Dict[str, Any]]:
+        Project, Activity = models.Project, models.Activity
+        per_prompt = self._per_prompt()
+        prompts = self._db.query(
+            per_prompt.c.project_id.label("project_id"),
+            func.count(per_prompt.c.id).label("prompt_count"),
+            func.sum(per_prompt.c.prompt_bytes).label("prompt_bytes"),
+            func.sum(per_prompt.c.discussion_bytes).label("discussion_bytes")
+        ).group_by(per_prompt.c.project_id).subquery()
+        activity_project = Activity.details["project_id"].astext
+        activities = self._db.query(
+            activity_project.label("project_id"),
+            func.count(Activity.id).label("activity_count"),
+            func.sum(func.pg_column_size(Activity.details)).label("activity_bytes")
+        ).filter(activity_project.isnot(None)).group_by(activity_project).subquery()
+
+        prompt_bytes = func.coalesce(prompts.c.prompt_bytes, 0)
+        discussion_bytes = func.coalesce(prompts.c.discussion_bytes, 0)
+        activity_bytes = func.coalesce(activities.c.activity_bytes, 0)
+        total = prompt_bytes + discussion_bytes + activity_bytes
+        rows = self._db.query(
+            Project.id,
+            Project.name,
+            func.coalesce(prompts.c.prompt_count, 0).label("prompt_count"),
+            func.coalesce(activities.c.activity_count, 0).label("activity_count"),
+            prompt_bytes.label("prompt_bytes"),
+            discussion_bytes.label("discussion_bytes"),
+            activity_bytes.label("activity_bytes"),
+            total.label("total_bytes")
+        ).outerjoin(prompts, prompts.c.project_id == Project.id)\
+            .outerjoin(activities, activities.c.project_id == cast(Project.id, String))\
+            .order_by(total.desc(), Project.id)\
+            .limit(limit)\
+            .all()
+        return [
+            {
+                "key": str(row.id),
+                "label": row.name,
+                "project_id": row.id,
+                "row_count": row.prompt_count,
+                "text_bytes": int(row.total_bytes),
+                "total_bytes": int(row.total_bytes),
+                "details": {
+                    "prompt_count": row.prompt_count,
+                    "activity_count": row.activity_count,
+                    "prompt_bytes": int(row.prompt_bytes),
+                    "discussion_bytes": int(row.discussion_bytes),
+                    "activity_bytes": int(row.activity_bytes)
+                }
+            }
+            for row in rows
+        ]
+
+    # Snapshot
+
+    def refresh(self, limit: Optional[int] = None) -> bool:
+        """
+        Measure storage and replace the stored snapshot.
+
+        Returns False when another process is already refreshing.
+        """
+        limit = limit or settings.STORAGE.STATS_TOP_N
+        try:
+            locked = self._db.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+            ).scalar()
+            if not locked:
+                self._db.rollback()
+                logger.info("Storage stats refresh already running elsewhere, skipping")
+                return False
+
+            refreshed_at = datetime.utcnow()
+            database_bytes = self.database_size()
+            measured = {
+                "database": [{
+                    "key": "database",
+                    "label": "database",
+                    "total_bytes": database_bytes,
+                    "details": {"quota_bytes": settings.STORAGE.DATABASE_QUOTA}
+                }],
+                "table": self.table_sizes(),
+                "project": self.largest_projects(limit),
+                "prompt": self.largest_prompts(limit),
+                "family": self.largest_families(limit),
+            }
+
+            self._db.query(models.StorageStat).delete(synchronize_session=False)
+            self._db.add_all(
+                models.StorageStat(scope=scope, refreshed_at=refreshed_at, **values)
+                for scope, rows in measured.items()
+                for values in rows
+            )
+            self._db.commit()
+            logger.info(f"Storage stats refreshed: {format_bytes(database_bytes)} in use")
+            return True
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def last_refreshed_at(self) -> Optional[datetime]:
+        return self._db.query(func.max(models.StorageStat.refreshed_at)).scalar()
+
+    def snapshot(self, scope: str, limit: Optional[int] = None) -> List[models.StorageStat]:
+        """Stored rows of a scope, largest first."""
+        query = self._db.query(models.StorageStat)\
+            .filter(models.StorageStat.scope == scope)\
+            .order_by(models.StorageStat.total_bytes.desc(), models.StorageStat.key)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def usage(self) -> Dict[str, Any]:
+        """Used and available space for the admin dashboard."""
+        database = self.snapshot("database", limit=1)
+        used = database[0].total_bytes if database else self.database_size()
+        quota = settings.STORAGE.DATABASE_QUOTA
+        return {
+            "used_storage_bytes": used,
+            "used_storage": format_bytes(used),
+            "total_storage": format_bytes(quota) if quota else "unlimited",
+            "storage_usage": round(used * 100 / quota) if quota else 0,
+            "storage_refreshed_at": database[0].refreshed_at.isoformat() if database else None
+        }
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """Stored snapshot as a storage report."""
+        project_names = {}
+
+        def serialize(stat: models.StorageStat) -> Dict[str, Any]:
+            return {
+                "id": stat.key,
+                "name": stat.label,
+                "project_id": str(stat.project_id) if stat.project_id else None,
+                "project_name": project_names.get(stat.project_id),
+                "rows": stat.row_count,
+                "text_bytes": stat.text_bytes,
+                "total_bytes": stat.total_bytes,
+                "size": format_bytes(stat.total_bytes),
+                "details": stat.details or {}
+            }
+
+        sections = {scope: self.snapshot(scope, limit) for scope in ("table", "project", "prompt", "family")}
+        project_ids = {stat.project_id for stats in sections.values() for stat in stats if stat.project_id}
+        if project_ids:
+            project_names.update(
+                self._db.query(models.Project.id, models.Project.name)
+                .filter(models.Project.id.in_(project_ids))
+                .all()
+            )
+
+        refreshed_at = self.last_refreshed_at()
+        return {
+            "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+            "usage": self.usage(),
+            "tables": [serialize(stat) for stat in sections["table"]],
+            "largest_projects": [serialize(stat) for stat in sections["project"]],
+            "largest_prompts": [serialize(stat) for stat in sections["prompt"]],
+            "largest_families": [serialize(stat) for stat in sections["family"]]
+        }
+
+
+class StorageStatsRefresher:
+    """Background thread refreshing the snapshot once it is older than the interval."""
+
+    def __init__(self, interval: Optional[int] = None):
+        self.interval = settings.STORAGE.STATS_REFRESH_INTERVAL if interval is None else interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            session = db.get_session()
+            try:
+                accounting = StorageAccounting(session)
+                refreshed_at = accounting.last_refreshed_at()
+                if refreshed_at is None or datetime.utcnow() - refreshed_at >= timedelta(seconds=self.interval):
+                    accounting.refresh()
+            except Exception as e:
+                logger.error(f"Storage stats refresh failed: {str(e)}")
+            finally:
+                db.close_session(session)
+            self._stopping.wait(self.interval)
+
+
+@job_handler(REFRESH_STORAGE_STATS)
+def refresh_storage_stats_job(session: Session, params: Dict[str, Any], report) -> Dict[str, Any]:
+    return {"refreshed": StorageAccounting(session).refresh()}
+
+
+# Process-wide refresher started with the web application
+storage_stats_refresher = StorageStatsRefresher()
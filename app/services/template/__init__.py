@@ -0,0 +1,338 @@
+"""
+Template rendering service for Promptlane.
+
+This module provides template rendering functionality for email content,
+with support for both HTML and text templates. It uses Jinja2 as the
+templating engine and includes helper functions for common email templates.
+
+Templates are compiled once per process and kept in memory, together with
+their configuration (see ``config.py``); ``precompile_templates`` does this
+for every email template at startup. Compiled code is also written to a
+Jinja bytecode cache (``TEMPLATES_BYTECODE_CACHE_DIR``) so a new worker
+skips compilation too. The text version of an email comes from its ``.txt``
+template, or else from a text template derived once from the HTML source,
+so no HTML is converted per message.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from jinja2 import (
+    BaseLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateNotFound,
+    select_autoescape,
+)
+from jinja2 import TemplateError as Jinja2TemplateError
+from jinja2 import TemplateSyntaxError as Jinja2TemplateSyntaxError
+
+from app.config import settings
+from .config import TEMPLATE_CONFIGS, TemplateConfig
+
+logger = logging.getLogger(__name__)
+
+class TemplateError(Exception):
+    """Base exception for template-related errors."""
+    def __init__(self, message: str, template_name: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+        self.message = message
+        self.template_name = template_name
+        self.context = context
+        super().__init__(self.message)
+
+class TemplateNotFoundError(TemplateError):
+    """Raised when a template file cannot be found."""
+    def __init__(self, template_name: str, search_paths: Optional[list[str]] = None):
+        message = f"Template '{template_name}' not found"
+        if search_paths:
+            message += f" in paths: {', '.join(search_paths)}"
+        super().__init__(message, template_name=template_name)
+
+class TemplateSyntaxError(TemplateError):
+    """Raised when there's a syntax error in the template."""
+    def __init__(self, template_name: str, line_number: int, message: str):
+        super().__init__(
+            f"Syntax error in template '{template_name}' at line {line_number}: {message}",
+            template_name=template_name
+        )
+
+class TemplateContextError(TemplateError):
+    """Raised when there's an error with the template context."""
+    def __init__(self, template_name: str, missing_variables: list[str]):
+        self.missing_variables = missing_variables
+        super().__init__(
+            f"Missing required variables in template '{template_name}': {', '.join(missing_variables)}",
+            template_name=template_name
+        )
+
+class TemplateRenderError(TemplateError):
+    """Raised when there's an error rendering a template."""
+    def __init__(self, template_name: str, error: str, context: Optional[Dict[str, Any]] = None):
+        super().__init__(
+            f"Error rendering template '{template_name}': {error}",
+            template_name=template_name,
+            context=context
+        )
+
+class TemplateSecurityError(TemplateError):
+    """Raised when there's a security-related error in template rendering."""
+    def __init__(self, template_name: str, message: str):
+        super().__init__(
+            f"Security error in template '{template_name}': {message}",
+            template_name=template_name
+        )
+
+# HTML to text conversion, applied to template sources rather than rendered emails.
+# Jinja tags are swapped for placeholders first so the HTML rules never touch them.
+_JINJA_TAG = re.compile(r"{{.*?}}|{%.*?%}|{#.*?#}", re.S)
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+_HTML_TO_TEXT: Tuple[Tuple[re.Pattern, str], ...] = tuple(
+    (re.compile(pattern, re.S | re.I), replacement) for pattern, replacement in (
+        (r"<!DOCTYPE[^>]*>|<(head|style|script)\b.*?</\1>", ""),
+        (r'<a\b[^>]*?href="([^"]*)"[^>]*>(.*?)</a>', r"\2: \1"),
+        (r"<br\s*/?>", "\n"),
+        (r"<h1\b[^>]*>", "\n\n# "),
+        (r"<h2\b[^>]*>", "\n\n## "),
+        (r"<h3\b[^>]*>", "\n\n### "),
+        (r"<li\b[^>]*>", "- "),
+        (r"</li>", "\n"),
+        (r"</?(p|div|h[1-6]|ul|ol|table|tr)\b[^>]*>", "\n\n"),
+        (r"<[^>]+>", ""),
+    )
+)
+_LINE_PADDING = re.compile(r"^[ \t]+|[ \t]+$", re.M)
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def html_to_text_source(source: str) -> str:
+    """Turn the source of an HTML template into the source of a plain text template."""
+    tags: list[str] = []
+
+    def hide(match: re.Match) -> str:
+        tags.append(match.group(0))
+        return f"\x00{len(tags) - 1}\x00"
+
+    text = _JINJA_TAG.sub(hide, source)
+    for pattern, replacement in _HTML_TO_TEXT:
+        text = pattern.sub(replacement, text)
+    text = _BLANK_LINES.sub("\n\n", _LINE_PADDING.sub("", text))
+    return _PLACEHOLDER.sub(lambda match: tags[int(match.group(1))], text)
+
+
+class HtmlToTextLoader(BaseLoader):
+    """Serves every template of the wrapped loader converted to plain text."""
+
+    def __init__(self, loader: BaseLoader):
+        self.loader = loader
+
+    def get_source(self, environment: Environment, template: str) -> Tuple[str, Optional[str], Optional[Callable[[], bool]]]:
+        source, filename, uptodate = self.loader.get_source(environment, template)
+        return html_to_text_source(source), filename, uptodate
+
+    def list_templates(self) -> list[str]:
+        return self.loader.list_templates()
+
+
+def make_bytecode_cache(pattern: str) -> Optional[FileSystemBytecodeCache]:
+    """A bytecode cache in TEMPLATES_BYTECODE_CACHE_DIR, or None when it is disabled or unusable."""
+    directory = settings.TEMPLATES.BYTECODE_CACHE_DIR
+    if not directory:
+        return None
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled, cannot create {directory}: {e}")
+        return None
+    return FileSystemBytecodeCache(directory, pattern)
+
+
+# Set up Jinja2 environment for email templates
+templates_path = Path(__file__).parent.parent.parent / "templates"
+env = Environment(
+    loader=FileSystemLoader(templates_path),
+    autoescape=select_autoescape(['html', 'xml']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=settings.TEMPLATES.AUTO_RELOAD,
+    bytecode_cache=make_bytecode_cache("__jinja2_email_%s.cache")
+)
+# Plain text versions derived from the HTML templates
+text_env = Environment(
+    loader=HtmlToTextLoader(env.loader),
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=settings.TEMPLATES.AUTO_RELOAD,
+    bytecode_cache=make_bytecode_cache("__jinja2_email_text_%s.cache")
+)
+env.globals["settings"] = text_env.globals["settings"] = settings
+
+
+@dataclass
+class CompiledTemplate:
+    """An email template ready to render: HTML and text versions plus its variable rules."""
+    name: str
+    html: Template
+    text: Template
+    text_is_derived: bool
+    required_variables: Tuple[str, ...] = ()
+    default_variables: Optional[Dict[str, Any]] = None
+
+    def is_up_to_date(self) -> bool:
+        return self.html.is_up_to_date and self.text.is_up_to_date
+
+
+_compiled: Dict[str, CompiledTemplate] = {}
+_compiled_lock = threading.Lock()
+
+
+def _get_template_type(template_name: str) -> str:
+    """Configured template type for a name like 'invitation', 'invitation.html' or 'email/invitation.html'."""
+    stem = template_name.rsplit("/", 1)[-1].split(".", 1)[0]
+    return stem if stem in TEMPLATE_CONFIGS else "generic"
+
+
+def _compile(template_name: str) -> CompiledTemplate:
+    config: Optional[TemplateConfig] = TEMPLATE_CONFIGS.get(_get_template_type(template_name))
+    html_path = config.html_path if config else template_name
+    html = env.get_template(html_path)
+    text_path = config.text_path if config else None
+    if text_path and text_path in env.loader.list_templates():
+        text, derived = env.get_template(text_path), False
+    else:
+        text, derived = text_env.get_template(html_path), True
+    return CompiledTemplate(
+        name=template_name,
+        html=html,
+        text=text,
+        text_is_derived=derived,
+        required_variables=tuple(config.required_variables or ()) if config else (),
+        default_variables=dict(config.default_variables or {}) if config else None
+    )
+
+
+def get_compiled_template(template_name: str) -> CompiledTemplate:
+    """
+    The compiled HTML and text templates for `template_name`, compiling
+    them on first use. With TEMPLATES_AUTO_RELOAD, edited files are
+    recompiled.
+
+    Raises:
+        TemplateNotFoundError: If the template file cannot be found
+        TemplateSyntaxError: If there's a syntax error in the template
+    """
+    compiled = _compiled.get(template_name)
+    if compiled is not None and (not settings.TEMPLATES.AUTO_RELOAD or compiled.is_up_to_date()):
+        return compiled
+    try:
+        compiled = _compile(template_name)
+    except TemplateNotFound as e:
+        search_paths = [str(path) for path in env.loader.searchpath]
+        raise TemplateNotFoundError(template_name, search_paths) from e
+    except Jinja2TemplateSyntaxError as e:
+        raise TemplateSyntaxError(template_name, e.lineno, str(e)) from e
+    with _compiled_lock:
+        _compiled[template_name] = compiled
+    return compiled
+
+
+def precompile_templates(stop_on_error: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Compile every email template (startup hook).
+
+    Returns each template's error, or None when it compiled. Errors are
+    logged, so a broken template fails when it is used rather than at startup.
+    """
+    names = list(TEMPLATE_CONFIGS) + [
+        name for name in env.loader.list_templates()
+        if name.startswith("email/") and name.endswith(".html") and name != "email/base.html"
+    ]
+    results: Dict[str, Optional[str]] = {}
+    for name in names:
+        try:
+            get_compiled_template(name)
+            results[name] = None
+        except TemplateError as e:
+            results[name] = e.message
+            logger.error(f"Could not precompile email template {name}: {e.message}")
+            if stop_on_error:
+                break
+    logger.info(f"Precompiled {sum(error is None for error in results.values())} email templates")
+    return results
+
+
+def _prepare_context(compiled: CompiledTemplate, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Check required variables and fill in defaults."""
+    missing = [var for var in compiled.required_variables if var not in context]
+    if missing:
+        raise TemplateContextError(compiled.name, missing)
+    if compiled.default_variables:
+        context = dict(compiled.default_variables, **context)
+    # Add current year to context for copyright notices
+    if 'current_year' not in context:
+        context['current_year'] = datetime.utcnow().year
+    return context
+
+
+def _render(template_name: str, context: Dict[str, Any], text: bool) -> str:
+    compiled = get_compiled_template(template_name)
+    context = _prepare_context(compiled, context)
+    try:
+        if not text:
+            return compiled.html.render(**context)
+        rendered = compiled.text.render(**context)
+        return _BLANK_LINES.sub("\n\n", rendered).strip() if compiled.text_is_derived else rendered
+    except Jinja2TemplateError as e:
+        raise TemplateRenderError(template_name, str(e), context) from e
+    except Exception as e:
+        logger.error(f"Unexpected error rendering template {template_name}: {str(e)}")
+        raise TemplateRenderError(template_name, f"Unexpected error: {str(e)}", context) from e
+
+
+def render_template(template_name: str, **context) -> str:
+    """
+    Render a template with the given context.
+
+    Args:
+        template_name: Name of the template (e.g., 'invitation', 'email/password_reset.html')
+        **context: Variables to pass to the template
+
+    Returns:
+        str: Rendered template as a string
+
+    Raises:
+        TemplateNotFoundError: If the template file cannot be found
+        TemplateSyntaxError: If there's a syntax error in the template
+        TemplateContextError: If required variables are missing
+        TemplateRenderError: If there's an error rendering the template
+    """
+    return _render(template_name, context, text=False)
+
+def render_text_template(template_name: str, **context) -> str:
+    """
+    Render a text version of an email template.
+
+    Uses the template's ``.txt`` version when it has one, otherwise a text
+    template derived once from the HTML template.
+
+    Args:
+        template_name: Name of the template (e.g., 'invitation', 'email/password_reset.html')
+        **context: Variables to pass to the template
+
+    Returns:
+        str: Rendered text template as a string
+
+    Raises:
+        TemplateNotFoundError: If neither the text template nor HTML template can be found
+        TemplateSyntaxError: If there's a syntax error in the template
+        TemplateContextError: If required variables are missing
+        TemplateRenderError: If there's an error rendering the template
+    """
+    return _render(template_name, context, text=True)
@@ -20,8 +20,8 @@ TEMPLATE_CONFIGS: Dict[str, TemplateConfig] = {
     "invitation": TemplateConfig(
         name="invitation",
         description="Invitation email template",
-        html_path="emails/invitation.html",
-        text_path="emails/invitation.txt",
+        html_path="email/invitation.html",
+        text_path="email/invitation.txt",
         required_variables=[
             "recipient_name",
             "inviter_name",
@@ -36,8 +36,8 @@ TEMPLATE_CONFIGS: Dict[str, TemplateConfig] = {
     "password_reset": TemplateConfig(
         name="password_reset",
         description="Password reset email template",
-        html_path="emails/password_reset.html",
-        text_path="emails/password_reset.txt",
+        html_path="email/password_reset.html",
+        text_path="email/password_reset.txt",
         required_variables=[
             "recipient_name",
             "reset_url"
@@ -46,8 +46,8 @@ TEMPLATE_CONFIGS: Dict[str, TemplateConfig] = {
     "notification": TemplateConfig(
         name="notification",
         description="Notification email template",
-        html_path="emails/notification.html",
-        text_path="emails/notification.txt",
+        html_path="email/notification.html",
+        text_path="email/notification.txt",
         required_variables=[
             "recipient_name",
             "notification_title",
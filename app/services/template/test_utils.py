@@ -148,4 +148,15 @@ def test_template_type_detection():
     assert _get_template_type("invitation.html") == "invitation"
     assert _get_template_type("password_reset.html") == "password_reset"
     assert _get_template_type("notification.html") == "notification"
-    assert _get_template_type("other.html") == "generic" 
\ No newline at end of file
+    assert _get_template_type("other.html") == "generic"
+
+
+def test_html_to_text_source_keeps_template_tags():
+    """Test that deriving a text template converts HTML but leaves Jinja tags intact."""
+    from app.services.template import html_to_text_source
+
+    source = '<style>p { color: red; }</style><p>Hello {{ recipient_name }},</p><a href="{{ url }}">Join</a>'
+    result = html_to_text_source(source)
+    assert "Hello {{ recipient_name }}," in result
+    assert "Join: {{ url }}" in result
+    assert "<" not in result and "color" not in result
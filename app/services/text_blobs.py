@@ -0,0 +1,121 @@
+"""
+Content-addressed prompt texts.
+
+Every full prompt version references its ``system_prompt`` and
+``user_prompt`` by SHA-256 in ``text_blobs``, so clones across projects and
+rollbacks to an earlier text share one stored copy. Texts are written
+through ``Prompt`` as usual; a ``before_flush`` hook (see
+``app.db.models.prompt``) moves them into blobs and adjusts ``ref_count``.
+Queries that read the texts of many prompts add ``text_loading()`` so the
+blobs arrive with the rows.
+
+Reference counts can drift when prompts are removed outside the ORM (for
+example by ``ON DELETE CASCADE`` when a project is deleted), so garbage
+collection first recounts references and only then removes blobs nothing
+points to.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, func, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.db.models import Prompt, TextBlob
+
+logger = logging.getLogger(__name__)
+
+
+def text_loading() -> Tuple[Any, ...]:
+    """
+    Loader options fetching the text blobs of queried prompts along with
+    them, with one ``SELECT ... IN`` per text field. The prompts hold their
+    blobs, so reading ``system_prompt`` / ``user_prompt`` runs no query.
+    """
+    return selectinload(Prompt.system_prompt_blob), selectinload(Prompt.user_prompt_blob)
+
+
+def migrate_prompt_texts(session: Session, batch_size: int = 500) -> Iterator[int]:
+    """
+    Move texts of prompts that still store them inline into blobs, and
+    fingerprint versions that have no ``content_hash`` yet.
+
+    Works in committed batches and yields the number of prompts migrated
+    per batch, so it can run on a live database and be resumed.
+    """
+    while True:
+        prompts = session.query(Prompt)\
+            .filter(or_(
+                and_(
+                    Prompt.storage_format == 'full',
+                    or_(
+                        and_(Prompt.user_prompt_hash.is_(None), Prompt._user_prompt.isnot(None)),
+                        and_(Prompt.system_prompt_hash.is_(None), Prompt._system_prompt.isnot(None))
+                    )
+                ),
+                Prompt.content_hash.is_(None)
+            ))\
+            .order_by(Prompt.id)\
+            .limit(batch_size)\
+            .with_for_update(skip_locked=True)\
+            .all()
+        if not prompts:
+            return
+        for prompt in prompts:
+            # The flush hook converts inline texts and fingerprints modified prompts
+            flag_modified(prompt, "_user_prompt")
+        session.commit()
+        session.expunge_all()
+        yield len(prompts)
+
+
+def recount_references(session: Session) -> int:
+    """Set every blob's ref_count to its actual number of references."""
+    blobs = TextBlob.__table__
+    references = select(func.count()).where(
+        or_(Prompt.system_prompt_hash == blobs.c.hash, Prompt.user_prompt_hash == blobs.c.hash)
+    ).scalar_subquery()
+    # A prompt whose system and user prompt are identical holds two references
+    both = select(func.count()).where(
+        Prompt.system_prompt_hash == blobs.c.hash, Prompt.user_prompt_hash == blobs.c.hash
+    ).scalar_subquery()
+    result = session.execute(
+        update(blobs)
+        .values(ref_count=references + both)
+        .where(blobs.c.ref_count != references + both)
+    )
+    return result.rowcount
+
+
+def collect_garbage(session: Session, recount: bool = True, dry_run: bool = False) -> Dict[str, int]:
+    """Delete blobs no prompt references."""
+    stats = {"recounted": 0, "deleted": 0, "freed_bytes": 0}
+    if recount:
+        stats["recounted"] = recount_references(session)
+
+    blobs = TextBlob.__table__
+    referenced = exists().where(
+        or_(Prompt.system_prompt_hash == blobs.c.hash, Prompt.user_prompt_hash == blobs.c.hash)
+    )
+    orphaned = and_(blobs.c.ref_count <= 0, ~referenced)
+    stats["deleted"], stats["freed_bytes"] = session.execute(
+        select(func.count(), func.coalesce(func.sum(blobs.c.size), 0)).where(orphaned)
+    ).one()
+    if not dry_run:
+        session.execute(delete(blobs).where(orphaned))
+        session.commit()
+    else:
+        session.rollback()
+    logger.info(f"Text blob GC: {stats}")
+    return stats
+
+
+def dedup_summary(session: Session) -> Dict[str, Optional[int]]:
+    """Stored versus referenced text volume."""
+    blobs, references = session.query(
+        func.count(TextBlob.hash),
+        func.coalesce(func.sum(TextBlob.size * TextBlob.ref_count), 0)
+    ).one()
+    stored = session.query(func.coalesce(func.sum(TextBlob.size), 0)).scalar()
+    return {"blobs": blobs, "stored_bytes": stored, "referenced_bytes": references}
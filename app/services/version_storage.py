@@ -0,0 +1,251 @@
+"""
+Delta storage of prompt version texts.
+
+With ``settings.VERSIONS.STORAGE_MODE = "delta"`` a version that is no
+longer active stores its ``system_prompt`` and ``user_prompt`` as a compact
+delta against its parent version instead of a full copy. Full snapshots are
+kept for:
+
+- the first version of a family,
+- every ``SNAPSHOT_INTERVAL``-th version, which bounds reconstruction chains,
+- the active version, so the prompt that is actually used, searched and
+  edited is always stored as plain text.
+
+Reading ``Prompt.system_prompt`` / ``Prompt.user_prompt`` reconstructs
+delta versions transparently: the ancestor chain up to the nearest full
+version is fetched with one recursive query and the deltas are applied in
+order. Reconstructed texts are kept in a process-wide LRU keyed by version
+id and ``content_hash``, so when another process rewrites a version its
+stale entry here is simply missed. A delta version never changes in place,
+because ``PromptManager`` expands the children of a version back to full
+text before that version's text is edited or deleted.
+
+A delta is a list of operations over tokens of the parent text (words, or
+lines for very long texts): ``[start, end]`` copies parent tokens, a string
+is inserted literally.
+"""
+
+import json
+import logging
+import re
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.db.models import Prompt
+from app.utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+STORAGE_FULL = "full"
+STORAGE_DELTA = "delta"
+STORAGE_MODES = (STORAGE_FULL, STORAGE_DELTA)
+
+TEXT_FIELDS = ("system_prompt", "user_prompt")
+
+# A word with its trailing whitespace, or leading whitespace
+_WORD_RE = re.compile(r"\S+\s*|\s+")
+
+# Deltas must be at most this fraction of the full texts to be worth storing
+MAX_DELTA_RATIO = 0.8
+
+Texts = Tuple[Optional[str], str]
+
+# Reconstructed texts of delta versions, keyed by (version id, content hash)
+materialized_versions = LRUCache(settings.VERSIONS.MATERIALIZED_CACHE_SIZE)
+
+
+def _tokenize(text: str, unit: str) -> List[str]:
+    return text.splitlines(keepends=True) if unit == "line" else _WORD_RE.findall(text)
+
+
+def encode_delta(base: Optional[str], text: Optional[str], unit: str = "word") -> Optional[List[Any]]:
+    """Encode `text` as copy/insert operations over the tokens of `base`."""
+    if text is None:
+        return None
+    base_tokens = _tokenize(base or "", unit)
+    tokens = _tokenize(text, unit)
+    ops: List[Any] = []
+    matcher = SequenceMatcher(None, base_tokens, tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            literal = "".join(tokens[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += literal
+            else:
+                ops.append(literal)
+    return ops
+
+
+def apply_delta(base: Optional[str], ops: Optional[List[Any]], unit: str = "word") -> Optional[str]:
+    """Rebuild a text from its parent text and delta operations."""
+    if ops is None:
+        return None
+    base_tokens = _tokenize(base or "", unit)
+    return "".join(op if isinstance(op, str) else "".join(base_tokens[op[0]:op[1]]) for op in ops)
+
+
+def make_delta(base: Texts, texts: Texts) -> Dict[str, Any]:
+    """Delta payload turning the parent's texts into a version's texts."""
+    longest = max(len(base[0] or ""), len(base[1] or ""), len(texts[0] or ""), len(texts[1] or ""))
+    unit = "line" if longest > settings.VERSIONS.DIFF_MAX_CHARS else "word"
+    payload: Dict[str, Any] = {"unit": unit}
+    for index, field in enumerate(TEXT_FIELDS):
+        payload[field] = encode_delta(base[index], texts[index], unit)
+    return payload
+
+
+def apply_payload(base: Texts, payload: Dict[str, Any]) -> Texts:
+    unit = payload.get("unit", "word")
+    return (
+        apply_delta(base[0], payload.get("system_prompt"), unit),
+        apply_delta(base[1], payload.get("user_prompt"), unit) or ""
+    )
+
+
+def version_texts(prompt: Prompt) -> Texts:
+    """The full texts of a version, reconstructing them if stored as a delta."""
+    if prompt.storage_format != STORAGE_DELTA:
+        return prompt.stored_text("system_prompt"), prompt.stored_text("user_prompt")
+
+    cached = materialized_versions.get((prompt.id, prompt.content_hash))
+    if cached is not None:
+        return cached
+
+    session = object_session(prompt)
+    if session is None:
+        raise RuntimeError(f"Prompt {prompt.id} is stored as a delta and not attached to a session")
+
+    # Ancestors from the parent up to (and including) the nearest full version
+    columns = (
+        Prompt.id.label("id"),
+        Prompt.parent_id.label("parent_id"),
+        Prompt.storage_format.label("storage_format"),
+        Prompt.system_prompt.label("system_prompt"),
+        Prompt.user_prompt.label("user_prompt"),
+        Prompt.text_delta.label("text_delta"),
+        Prompt.content_hash.label("content_hash")
+    )
+    chain = select(*columns).where(Prompt.id == prompt.parent_id).cte("delta_chain", recursive=True)
+    chain = chain.union_all(
+        select(*columns)
+        .join(chain, Prompt.id == chain.c.parent_id)
+        .where(chain.c.storage_format == STORAGE_DELTA)
+    )
+    rows = {row.id: row for row in session.execute(select(chain)).all()}
+
+    # Walk up until a cached or full version, then replay deltas downwards
+    pending = []
+    current_id = prompt.parent_id
+    base: Optional[Texts] = None
+    while base is None:
+        row = rows.get(current_id)
+        if row is None:
+            raise RuntimeError(f"Cannot reconstruct prompt {prompt.id}: version {current_id} is missing")
+        if row.storage_format != STORAGE_DELTA:
+            base = (row.system_prompt, row.user_prompt)
+            continue
+        base = materialized_versions.get((row.id, row.content_hash))
+        if base is None:
+            pending.append(row)
+            current_id = row.parent_id
+
+    for row in reversed(pending):
+        base = apply_payload(base, row.text_delta)
+        materialized_versions.put((row.id, row.content_hash), base)
+    texts = apply_payload(base, prompt.text_delta)
+    materialized_versions.put((prompt.id, prompt.content_hash), texts)
+    return texts
+
+
+def _stored_size(texts: Texts) -> int:
+    return sum(len(text.encode("utf-8")) for text in texts if text)
+
+
+class VersionStore:
+    """Decide how versions are stored and convert between full and delta storage."""
+
+    def __init__(self, mode: Optional[str] = None, snapshot_interval: Optional[int] = None):
+        self.mode = (mode or settings.VERSIONS.STORAGE_MODE).lower()
+        if self.mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown version storage mode '{self.mode}'. Available: {', '.join(STORAGE_MODES)}")
+        self.snapshot_interval = settings.VERSIONS.SNAPSHOT_INTERVAL if snapshot_interval is None else snapshot_interval
+
+    def is_snapshot(self, prompt: Prompt) -> bool:
+        """Whether a version must be stored in full."""
+        return (
+            self.mode == STORAGE_FULL
+            or prompt.parent_id is None
+            or bool(prompt.is_active)
+            or self.snapshot_interval <= 1
+            or (prompt.version - 1) % self.snapshot_interval == 0
+        )
+
+    def store_delta(self, prompt: Prompt, base: Texts, texts: Texts) -> bool:
+        """Store `texts` as a delta against `base` if that is smaller."""
+        payload = make_delta(base, texts)
+        if len(json.dumps(payload, separators=(",", ":"))) > MAX_DELTA_RATIO * _stored_size(texts):
+            return False
+        prompt._system_prompt = None
+        prompt._user_prompt = ""
+        prompt.system_prompt_hash = None
+        prompt.user_prompt_hash = None
+        prompt.text_delta = payload
+        prompt.storage_format = STORAGE_DELTA
+        materialized_versions.put((prompt.id, prompt.content_hash), texts)
+        return True
+
+    def store_full(self, prompt: Prompt, texts: Texts) -> None:
+        materialized_versions.pop((prompt.id, prompt.content_hash))
+        prompt.store_texts(*texts)
+
+    def compact(self, session: Session, prompt: Prompt) -> bool:
+        """Store a (newly inactive) version as a delta when the mode and snapshot rules allow it."""
+        if prompt.storage_format == STORAGE_DELTA or self.is_snapshot(prompt):
+            return False
+        parent = session.get(Prompt, prompt.parent_id)
+        if parent is None:
+            return False
+        return self.store_delta(prompt, version_texts(parent), version_texts(prompt))
+
+    def expand_children(self, session: Session, prompt_id: Any) -> int:
+        """Store the delta children of a version in full, before its text changes or it is deleted."""
+        children = session.query(Prompt)\
+            .filter(Prompt.parent_id == prompt_id, Prompt.storage_format == STORAGE_DELTA)\
+            .all()
+        for child in children:
+            child.expand_text()
+            materialized_versions.pop((child.id, child.content_hash))
+        return len(children)
+
+    def repack_family(self, session: Session, versions: Iterable[Prompt]) -> Dict[str, int]:
+        """Re-store every version of a family according to the current mode."""
+        versions = list(versions)
+        # Materialize everything before changing any row
+        texts = {version.id: version_texts(version) for version in versions}
+        stats = {"full": 0, "delta": 0, "bytes_before": 0, "bytes_after": 0}
+        for version in versions:
+            if version.storage_format != STORAGE_DELTA:
+                stats["bytes_before"] += _stored_size(texts[version.id])
+            elif version.text_delta:
+                stats["bytes_before"] += len(json.dumps(version.text_delta, separators=(",", ":")))
+
+            parent_texts = texts.get(version.parent_id)
+            if not self.is_snapshot(version) and parent_texts is not None \
+                    and self.store_delta(version, parent_texts, texts[version.id]):
+                stats["delta"] += 1
+                stats["bytes_after"] += len(json.dumps(version.text_delta, separators=(",", ":")))
+            else:
+                self.store_full(version, texts[version.id])
+                stats["full"] += 1
+                stats["bytes_after"] += _stored_size(texts[version.id])
+        return stats
+
+
+# Store configured from settings, used by PromptManager
+version_store = VersionStore()
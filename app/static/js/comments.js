@@ -3,8 +3,9 @@
  */
 document.addEventListener('DOMContentLoaded', function() {
     // Get project and prompt IDs from the page
+    const commentsList = document.getElementById('comments-list');
     const projectId = window.location.pathname.split('/')[2];
-    const promptId = window.location.pathname.split('/')[4];
+    const promptId = commentsList ? commentsList.dataset.promptId : window.location.pathname.split('/')[4];
     
     // Handle reply button clicks
     document.querySelectorAll('.reply-btn').forEach(button => {
@@ -148,4 +149,171 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     });
+    
+    // Poll for comments added since the page was rendered. The server hands
+    // out a `since` cursor, so each poll only returns what is new.
+    if (commentsList) {
+        const pollInterval = parseInt(commentsList.dataset.pollInterval || '15000', 10);
+        let sinceCursor = commentsList.dataset.sinceCursor || '';
+        let nextCursor = commentsList.dataset.nextCursor || '';
+        let polling = false;
+        const totalBadge = document.getElementById('comments-total');
+        const loadMoreButton = document.getElementById('load-more-comments');
+        
+        const renderComment = function(comment) {
+            const card = document.createElement('div');
+            card.id = `comment-${comment.id}`;
+            card.classList.add('comment-card', 'card', 'mb-3');
+            if (comment.is_pinned) {
+                card.classList.add('pinned');
+            }
+            card.innerHTML = `
+                <div class="card-body">
+                    <div class="d-flex align-items-center mb-2">
+                        <span class="comment-author fw-semibold"></span>
+                        <small class="text-muted ms-2 comment-date"></small>
+                    </div>
+                    <div class="comment-content"></div>
+                </div>
+            `;
+            const author = card.querySelector('.comment-author');
+            author.textContent = comment.created_by;
+            author.style.color = comment.user_color;
+            card.querySelector('.comment-date').textContent = new Date(comment.created_at).toLocaleString();
+            card.querySelector('.comment-content').textContent = comment.content;
+            return card;
+        };
+        
+        const pollNewComments = async function() {
+            if (polling || document.hidden) {
+                return;
+            }
+            polling = true;
+            try {
+                let hasMore = true;
+                while (hasMore) {
+                    const params = new URLSearchParams();
+                    if (sinceCursor) {
+                        params.set('since', sinceCursor);
+                    }
+                    const response = await fetch(`/api/prompts/${promptId}/comments/new?${params}`, {
+                        headers: { 'Accept': 'application/json' }
+                    });
+                    if (!response.ok) {
+                        break;
+                    }
+                    const data = await response.json();
+                    data.comments.forEach(comment => {
+                        if (!document.getElementById(`comment-${comment.id}`)) {
+                            const firstUnpinned = commentsList.querySelector('.comment-card:not(.pinned)');
+                            commentsList.insertBefore(renderComment(comment), firstUnpinned);
+                            addToTotal(1);
+                        }
+                    });
+                    if (data.since) {
+                        sinceCursor = data.since;
+                    }
+                    hasMore = data.has_more;
+                }
+            } catch (error) {
+                console.error('Error polling for new comments:', error);
+            } finally {
+                polling = false;
+            }
+        };
+        
+        const addToTotal = function(count) {
+            if (totalBadge) {
+                totalBadge.textContent = parseInt(totalBadge.textContent || '0', 10) + count;
+            }
+            const empty = document.getElementById('comments-empty');
+            if (empty) {
+                empty.remove();
+            }
+        };
+        
+        // Older comments are fetched a window at a time from the next cursor
+        const loadOlderComments = async function() {
+            if (!nextCursor) {
+                return;
+            }
+            loadMoreButton.disabled = true;
+            try {
+                const params = new URLSearchParams({ cursor: nextCursor });
+                const response = await fetch(`/api/prompts/${promptId}/comments?${params}`, {
+                    headers: { 'Accept': 'application/json' }
+                });
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                data.comments.forEach(comment => {
+                    if (!document.getElementById(`comment-${comment.id}`)) {
+                        commentsList.appendChild(renderComment(comment));
+                    }
+                });
+                nextCursor = data.next_cursor || '';
+            } catch (error) {
+                console.error('Error loading comments:', error);
+            } finally {
+                loadMoreButton.disabled = false;
+                loadMoreButton.style.display = nextCursor ? '' : 'none';
+            }
+        };
+        if (loadMoreButton) {
+            loadMoreButton.addEventListener('click', loadOlderComments);
+        }
+        
+        // With live events the server tells us when to fetch, so the timer
+        // only remains as a slow safety net.
+        const liveEvents = subscribeToPromptEvents({
+            'comment.created': pollNewComments,
+            'resync': pollNewComments
+        });
+        setInterval(pollNewComments, liveEvents ? pollInterval * 4 : pollInterval);
+        document.addEventListener('visibilitychange', function() {
+            if (!document.hidden) {
+                pollNewComments();
+            }
+        });
+    }
+    
+    // Let collaborators know when the prompt changed under them
+    subscribeToPromptEvents({
+        'prompt.version_created': showVersionNotice,
+        'prompt.version_activated': showVersionNotice
+    });
+    
+    function showVersionNotice() {
+        if (document.getElementById('version-change-notice')) {
+            return;
+        }
+        const notice = document.createElement('div');
+        notice.id = 'version-change-notice';
+        notice.classList.add('alert', 'alert-info', 'd-flex', 'justify-content-between', 'align-items-center');
+        notice.innerHTML = `
+            <span>This prompt has a new active version.</span>
+            <button type="button" class="btn btn-sm btn-primary">Reload</button>
+        `;
+        notice.querySelector('button').addEventListener('click', () => window.location.reload());
+        const container = document.getElementById('prompt-detail') || document.body;
+        container.insertBefore(notice, container.firstChild);
+    }
+    
+    // Share one EventSource per page between all subscribers; the page
+    // renders the stream URL of the prompt it shows
+    function subscribeToPromptEvents(handlers) {
+        const detail = document.getElementById('prompt-detail');
+        const eventsUrl = detail ? detail.dataset.eventsUrl : null;
+        if (!window.EventSource || !eventsUrl) {
+            return false;
+        }
+        if (!window.promptEventSource) {
+            window.promptEventSource = new EventSource(eventsUrl);
+        }
+        Object.entries(handlers).forEach(([eventType, handler]) => {
+            window.promptEventSource.addEventListener(eventType, handler);
+        });
+        return true;
+    }
 }); 
\ No newline at end of file
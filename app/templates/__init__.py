@@ -1,10 +1,20 @@
 """
 Template configuration and initialization
+
+Page templates are compiled through a Jinja bytecode cache in
+TEMPLATES_BYTECODE_CACHE_DIR, so a new worker loads compiled code instead
+of parsing templates again, and ``precompile_templates`` compiles them all
+at startup rather than on each page's first request.
 """
 from fastapi.templating import Jinja2Templates as BaseJinja2Templates
+from jinja2 import TemplateSyntaxError
 from app.config import settings
+from app.logger import get_logger
+from app.services.template import make_bytecode_cache
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+logger = get_logger(__name__)
 
 class Jinja2Templates(BaseJinja2Templates):
     """Custom Jinja2Templates class that always includes settings in the context"""
@@ -28,4 +38,36 @@ app_dir = os.path.dirname(current_dir)
 templates_dir = os.path.join(app_dir, "templates")
 
 # Initialize custom Jinja2Templates
-templates = Jinja2Templates(directory=templates_dir) 
\ No newline at end of file
+templates = Jinja2Templates(directory=templates_dir) 
+templates.env.bytecode_cache = make_bytecode_cache("__jinja2_pages_%s.cache")
+# Checking every template file for changes on each render is only useful while editing them
+templates.env.auto_reload = settings.TEMPLATES.AUTO_RELOAD
+
+
+def precompile_templates(stop_on_error: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Compile every page template, returning each template's syntax error or
+    None when it compiled. Email templates are compiled by
+    ``app.services.template``.
+    """
+    results: Dict[str, Optional[str]] = {}
+    for name in templates.env.list_templates(extensions=["html"]):
+        if name.startswith("email/"):
+            continue
+        try:
+            templates.env.get_template(name)
+            results[name] = None
+        except TemplateSyntaxError as e:
+            results[name] = f"line {e.lineno}: {e.message}"
+            if stop_on_error:
+                break
+    return results
+
+
+def warm_templates() -> None:
+    """Startup hook: compile all page templates before the first request."""
+    results = precompile_templates()
+    for name, error in results.items():
+        if error:
+            logger.error(f"Could not precompile template {name}: {error}")
+    logger.info(f"Precompiled {sum(error is None for error in results.values())} page templates")
@@ -4,6 +4,7 @@ from .format_date import format_date, format_datetime, format_relative_time
 from .serializers import serialize_json, deserialize_json, safe_json_dumps, JSONEncoder
 from .errors import api_error, validation_error, resource_not_found, resource_exists, permission_denied, internal_error, ErrorType
 from .extraction import extract_variables, apply_variables, generate_key_from_name, generate_uuid_str
+from .lru import LRUCache
 
 __all__ = [
     # Date formatting
@@ -17,5 +18,8 @@ __all__ = [
     "permission_denied", "internal_error", "ErrorType",
     
     # Template extraction and manipulation
-    "extract_variables", "apply_variables", "generate_key_from_name", "generate_uuid_str"
+    "extract_variables", "apply_variables", "generate_key_from_name", "generate_uuid_str",
+
+    # Caching
+    "LRUCache"
 ] 
\ No newline at end of file